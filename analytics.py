@@ -0,0 +1,64 @@
+# analytics.py
+# Result-set aggregates for the "Event Analytics" section. Aggregates are
+# memoized by the result set itself, so reruns that don't change the
+# results (chat, saves, ...) skip the work entirely.
+from collections import Counter
+
+from lru import LRUCache
+
+TOP_VENUES = 10
+MAX_MEMOIZED = 128
+
+_memo = LRUCache(MAX_MEMOIZED)
+
+
+def result_set_key(events):
+    # The frozen Events themselves: compared by value, so a changed date,
+    # venue or segment under the same id is a new key, and two result sets
+    # whose hashes collide are still told apart
+    return tuple(events)
+
+
+def compute_aggregates(events):
+    categories = Counter(event.segment for event in events if event.segment)
+    dates = Counter(event.local_date for event in events if event.local_date)
+    venues = Counter(event.venue for event in events if event.venue)
+    return {
+        "total": len(events),
+        "categories": dict(categories.most_common()),
+        "dates": dict(sorted(dates.items())),
+        "top_venues": dict(venues.most_common(TOP_VENUES)),
+    }
+
+
+def aggregates(events):
+    return _memo.get_or_compute(result_set_key(events), lambda: compute_aggregates(events))
+
+
+# ----------------------------
+# Chart data
+# ----------------------------
+def counts_frame(counts, label, value="Count"):
+    import pandas as pd  # only needed once there is something to chart
+
+    frame = pd.DataFrame({label: list(counts.keys()), value: list(counts.values())})
+    return frame.set_index(label)
+
+
+def category_figure(counts):
+    """Matplotlib version of the category chart; caller must close() it."""
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(6, 4))
+    ax.bar(list(counts.keys()), list(counts.values()), color='skyblue', edgecolor='navy')
+    ax.set_xlabel("Category", fontsize=10)
+    ax.set_ylabel("Number of Events", fontsize=10)
+    ax.set_title("Events by Category", fontsize=12)
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+    fig.tight_layout()
+    return fig
+
+
+def close_figure(fig):
+    import matplotlib.pyplot as plt
+    plt.close(fig)
@@ -0,0 +1,2 @@
+#!/bin/bash
+uvicorn eventure.api:app --host 0.0.0.0 --port ${API_PORT:-8000}
@@ -1,51 +1,29 @@
 import streamlit as st
-import requests
 import os
+import time
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
-import pandas as pd
-import matplotlib.pyplot as plt
-import sqlite3
-import urllib.parse
+import html
+import metrics
+from eventure import Services, Settings, build_params
+from provider_client import ProviderError
+from reminders import utc_today
 
 # ----------------------------
 # Load Environment Variables
 # ----------------------------
 load_dotenv()
-API_KEY = os.getenv("API_KEY")
-
-# ----------------------------
-# Database Connection
-# ----------------------------
-conn = sqlite3.connect("event_finder.db", check_same_thread=False)
-cursor = conn.cursor()
-
-# ----------------------------
-# Ensure tables exist
-# ----------------------------
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS users (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    username TEXT UNIQUE NOT NULL,
-    email TEXT UNIQUE NOT NULL,
-    password TEXT NOT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-)
-""")
-
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS saved_events (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    user_id INTEGER NOT NULL,
-    event_name TEXT,
-    event_date TEXT,
-    event_venue TEXT,
-    event_url TEXT,
-    saved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY(user_id) REFERENCES users(id)
-)
-""")
-conn.commit()
+# Result cards rendered per page ("Load more" adds another page)
+RESULTS_PAGE_SIZE = int(os.getenv("RESULTS_PAGE_SIZE", "10"))
+THUMBNAIL_WIDTH = 240
+# Chat messages kept (and rendered) per session
+MAX_CHAT_MESSAGES = 40
+# "native" (Vega-Lite, rendered in the browser) or "matplotlib"
+CHART_BACKEND = os.getenv("CHART_BACKEND", "native")
+# Serve Prometheus metrics on this port (e.g. 9100) when set
+METRICS_PORT = os.getenv("METRICS_PORT")
+
+rerun_started = time.perf_counter()
 
 # ----------------------------
 # Page Configuration
@@ -55,6 +33,23 @@ st.set_page_config(
     page_icon="🎟️",
     layout="wide"
 )
+
+# ----------------------------
+# Shared resources (one per server process)
+# ----------------------------
+# Database, caches, upstream client and services are built on the first
+# run only; every rerun after that reuses them.
+@st.cache_resource
+def get_services():
+    return Services(Settings.from_env())
+
+@st.cache_resource
+def start_metrics_server():
+    return metrics.serve(int(METRICS_PORT)) if METRICS_PORT else None
+
+start_metrics_server()
+services = get_services()
+
 # ----------------------------
 # Initialize session state
 # ----------------------------
@@ -66,6 +61,8 @@ if "search_results" not in st.session_state:
     st.session_state["search_results"] = []
 if "search_city" not in st.session_state:
     st.session_state["search_city"] = ""
+if "results_shown" not in st.session_state:
+    st.session_state["results_shown"] = RESULTS_PAGE_SIZE
 
 # ----------------------------
 # Helper function to load saved events
@@ -73,36 +70,44 @@ if "search_city" not in st.session_state:
 def load_saved_events():
     if st.session_state["user"]:
         user_id = st.session_state["user"][0]
-        cursor.execute("""
-            SELECT event_name, event_date, event_venue, event_url
-            FROM saved_events
-            WHERE user_id=?
-            ORDER BY saved_at DESC
-        """, (user_id,))
-        st.session_state["saved_events"] = cursor.fetchall()
+        st.session_state["saved_events"] = services.saved_events.list(user_id)
+        # Today's / tomorrow's saved events, found by SQL on the indexed event day
+        today = utc_today()
+        st.session_state["reminders"] = (today, services.saved_events.upcoming(user_id, today))
     else:
         st.session_state["saved_events"] = []
+        st.session_state["reminders"] = (None, [])
 
 # ----------------------------
 # Save event function
 # ----------------------------
-def save_event(user_id, name, date, venue, event_url):
-    cursor.execute("""
-        SELECT * FROM saved_events
-        WHERE user_id=? AND event_name=? AND event_date=?
-    """, (user_id, name, date))
-    existing = cursor.fetchone()
-    if existing:
+def save_event(user_id, name, date, venue, event_url, category=None, provider_event_id=None, city=None):
+    # Called from a card fragment: only that card reruns, and the Saved
+    # Events panel picks up the new list on the next full rerun
+    if not services.save_event(user_id, name, date, venue, event_url, category, provider_event_id, city):
         st.info("You already saved this event!")
     else:
-        cursor.execute("""
-            INSERT INTO saved_events (user_id, event_name, event_date, event_venue, event_url)
-            VALUES (?, ?, ?, ?, ?)
-        """, (user_id, name, date, venue, event_url))
-        conn.commit()
         load_saved_events()
         st.success("Event saved to your account!")
-        st.rerun()
+
+
+# ----------------------------
+# Session
+# ----------------------------
+# The token lives in server-side session state only, so no script in the
+# page can read it. Streamlit can't set an HttpOnly cookie, and one
+# written from JavaScript would hand any injected script a long-lived
+# bearer token; the price is that a reload or a new tab logs in again.
+# Websocket reconnects reattach to the same session and stay logged in.
+if "session_token" not in st.session_state:
+    # Older links carried the token in ?session=; it is dropped, never used
+    st.query_params.pop("session", None)
+    st.session_state["session_token"] = None
+# Checked against the in-process session cache: no password hash, no users query
+st.session_state["user"] = services.sessions.validate(st.session_state["session_token"])
+if st.session_state["user"] is None:
+    # Expired, or logged out from another process
+    st.session_state["session_token"] = None
 
 
 # ----------------------------
@@ -151,14 +156,9 @@ if not st.session_state["user"]:
         if st.button("Create Account"):
 
             if new_username and new_email and new_password:
-                try:
-                    cursor.execute(
-                        "INSERT INTO users (username, email, password) VALUES (?, ?, ?)",
-                        (new_username, new_email, new_password)
-                    )
-                    conn.commit()
+                if services.users.create(new_username, new_email, new_password):
                     st.success("Account created! Please login.")
-                except sqlite3.IntegrityError:
+                else:
                     st.error("Username or Email already exists.")
             else:
                 st.warning("Please fill all fields.")
@@ -175,13 +175,11 @@ if not st.session_state["user"]:
 
         if st.button("Login"):
 
-            cursor.execute(
-                "SELECT * FROM users WHERE username=? AND password=?",
-                (username, password)
-            )
-            user = cursor.fetchone()
+            user = services.users.authenticate(username, password)
 
             if user:
+                token = services.sessions.create(user)
+                st.session_state["session_token"] = token
                 st.session_state["user"] = user
                 load_saved_events()
                 st.success(f"Welcome {username}!")
@@ -218,130 +216,163 @@ elif date_option == "Custom Range":
     start_date = st.sidebar.date_input("Start Date", key="start_date")
     end_date = st.sidebar.date_input("End Date", key="end_date")
 
+offline_only = st.sidebar.checkbox("📦 Search offline index only", key="offline_only")
+
 search_button = st.sidebar.button("🚀 Search Events")
 
+if services.rate_limiter is not None:
+    st.sidebar.caption(f"📊 API requests left today: {services.rate_limiter.remaining_today():,}")
+
 # ----------------------------
 # Search Events Logic
 # ----------------------------
+def local_search():
+    return services.search.local(city, keyword, category, start_date, end_date)
+
+def stream_search(params, cache_key):
+    # Cards render as each provider's results arrive; the list is shared
+    # with session state so a rerun mid-stream keeps what has arrived.
+    shared = services.search.stream(params, cache_key)
+    collected = []
+    st.session_state["search_results"] = collected
+    try:
+        for event in shared:
+            collected.append(event)
+            yield event
+    except ProviderError:
+        if collected:
+            st.info("Some event sources did not respond in time; showing results from the others.")
+            return
+        collected.extend(local_search())
+        if collected:
+            st.info("The event service is not responding, showing events from the offline index.")
+        else:
+            st.error("The event service is not responding right now. Please try again shortly.")
+        yield from collected
+        return
+    # Swap in the immutable result every session shares
+    st.session_state["search_results"] = shared.result()
+
+event_stream = None
+
 if search_button:
     if not city:
         st.error("Please enter a city name.")
     else:
-        url = "https://app.ticketmaster.com/discovery/v2/events.json"
-        params = {
-            "apikey": API_KEY,
-            "city": city,
-            "size": 20
-        }
-        params["sort"] = "relevance,asc"
-        if keyword:
-            params["keyword"] = keyword
-        if category:
-            params["classificationName"] = category
-        if not category:
-            params["segmentName"] = "Music,Sports,Arts & Theatre"
-        if start_date and end_date:
-            params["startDateTime"] = f"{start_date.strftime('%Y-%m-%d')}T00:00:00Z"
-            params["endDateTime"] = f"{end_date.strftime('%Y-%m-%d')}T23:59:59Z"
-
-        with st.spinner("Fetching events..."):
-            response = requests.get(url, params=params)
-            data = response.json()
-            if "_embedded" in data:
-                st.session_state["search_results"] = data["_embedded"]["events"]
-                st.session_state["search_city"] = city
-            else:
-                st.session_state["search_results"] = []
+        params = build_params(city, keyword, category, start_date, end_date)
+        st.session_state["search_city"] = city
+        st.session_state["results_shown"] = RESULTS_PAGE_SIZE
+        cache_key = services.search.cache_key(params)
+        services.search.log(cache_key, params)
+        events = local_search() if offline_only else services.search.cached(cache_key)
+        if events is None:
+            event_stream = stream_search(params, cache_key)
+        else:
+            st.session_state["search_results"] = events
+            if not events:
                 st.warning("No events found for this search.")
 
 # ----------------------------
 # Display Search Results
 # ----------------------------
-if st.session_state["search_results"]:
-    events = st.session_state["search_results"]
-    map_data = []
-    category_count = {}
+@st.fragment
+def render_card(event):
+    # A fragment: clicking Save reruns this card only, not the whole list
+    name = event.name
+    date = event.local_date or "N/A"
+    event_url = event.url or "#"
+    venue = event.venue or "Venue Not Available"
+    user = st.session_state["user"]
+
+    with metrics.timed("render_card"), st.container():
+        col1, col2, col3 = st.columns([1, 3, 1])
+        with col1:
+            # Local thumbnail once cached (fetched in the background), remote image until then
+            image = services.thumbnails.url_for(event.image_url) or event.image_url
+            if image:
+                # Plain <img> so the browser loads thumbnails lazily as they scroll in
+                st.markdown(
+                    f"<img src='{html.escape(image, quote=True)}' loading='lazy' "
+                    f"width='{THUMBNAIL_WIDTH}' style='max-width:100%; height:auto;'>",
+                    unsafe_allow_html=True
+                )
+        with col2:
+            st.markdown(f"### {name}")
+            st.write(f"📅 **Date:** {date}")
+            st.write(f"📍 **Venue:** {venue}")
+            st.markdown(f"[🎟️ View Event]({event_url})")
+        with col3:
+            # Keyed by event id, so keys survive paging and re-sorting
+            if st.button("⭐ Save", key=f"save_{event.id}"):
+                if user:
+                    save_event(
+                        user[0],
+                        name,
+                        date,
+                        venue,
+                        event_url,
+                        category=event.segment,
+                        provider_event_id=event.id,
+                        city=st.session_state["search_city"]
+                    )
+                else:
+                    st.warning("Please log in to save events.")
+        st.markdown("---")
+
+def show_more_results():
+    st.session_state["results_shown"] += RESULTS_PAGE_SIZE
+
+if event_stream is not None or st.session_state["search_results"]:
+    events = event_stream if event_stream is not None else st.session_state["search_results"]
     st.success(f"Events near {st.session_state.get('search_city', '').title()}")
 
-    for idx, event in enumerate(events):
-        name = event.get("name", "No Name")
-        date = event.get("dates", {}).get("start", {}).get("localDate", "N/A")
-        event_url = event.get("url", "#")
-        image = event.get("images")[0]["url"] if "images" in event else None
-        venue = "Venue Not Available"
-
-        if "_embedded" in event:
-            venue_info = event["_embedded"]["venues"][0]
-            venue = venue_info.get("name", venue)
-            if "location" in venue_info:
-                lat = float(venue_info["location"]["latitude"])
-                lon = float(venue_info["location"]["longitude"])
-                map_data.append({"lat": lat, "lon": lon})
-
-        if "classifications" in event:
-            cat = event["classifications"][0]["segment"]["name"]
-            category_count[cat] = category_count.get(cat, 0) + 1
-
-        # Event Card
-        with st.container():
-            col1, col2, col3 = st.columns([1, 3, 1])
-            with col1:
-                if image:
-                    st.image(image, use_container_width=True)
-            with col2:
-                st.markdown(f"### {name}")
-                st.write(f"📅 **Date:** {date}")
-                st.write(f"📍 **Venue:** {venue}")
-                st.markdown(f"[🎟️ View Event]({event_url})")
-            with col3:
-                if st.button("⭐ Save", key=f"save_{idx}"):
-                    if st.session_state["user"]:
-                        save_event(
-                            st.session_state["user"][0],
-                            name,
-                            date,
-                            venue,
-                            event_url
-                        )
-                    else:
-                        st.warning("Please log in to save events.")
-            st.markdown("---")
-
-    # Analytics
+    # Only the current pages are rendered; a live stream is still drained
+    # so the complete result lands in session state.
+    shown = st.session_state["results_shown"]
+    rendered = set()
+    for event in events:
+        if len(rendered) < shown and event.id not in rendered:
+            rendered.add(event.id)
+            render_card(event)
+
+    remaining = len({event.id for event in st.session_state["search_results"]}) - len(rendered)
+    if remaining > 0:
+        st.button(
+            f"Load more ({remaining} more)",
+            key="load_more",
+            on_click=show_more_results
+        )
+
+    events = st.session_state["search_results"]
+    if not events:
+        st.warning("No events found for this search.")
+
+    # Analytics (memoized per result set, so unrelated reruns are free)
+    stats = services.analytics.summary(events)
     st.subheader("Event Analytics")
     colA, colB = st.columns(2)
-    
+
     with colA:
-        st.metric("Total Events Found", len(events))
-    
-    with colB:
-        if category_count:
-            # 1. Clear the current figure to prevent data ghosting
-            plt.clf() 
-            
-            # 2. Create the plot with improved styling
-            df = pd.DataFrame(list(category_count.items()), columns=["Category", "Count"])
-            
-            # Use a slightly larger figure size to give labels more room
-            fig, ax = plt.subplots(figsize=(6, 4))
-            
-            ax.bar(df["Category"], df["Count"], color='skyblue', edgecolor='navy')
-            ax.set_xlabel("Category", fontsize=10)
-            ax.set_ylabel("Number of Events", fontsize=10)
-            ax.set_title("Events by Category", fontsize=12)
-            
-            # 3. FIX: Adjust label rotation and alignment to prevent overlapping
-            plt.xticks(rotation=45, ha='right')
-            
-            # 4. FIX: Use tight_layout so labels don't get cut off at the bottom
-            plt.tight_layout()
-            
-            st.pyplot(fig)
-
-    # Map
-    if map_data:
+        st.metric("Total Events Found", stats["total"])
+
+    with colB, metrics.timed("render_charts"):
+        if stats["categories"]:
+            if CHART_BACKEND == "matplotlib":
+                fig = services.analytics.category_figure(stats)
+                st.pyplot(fig)
+                services.analytics.close_figure(fig)
+            else:
+                st.bar_chart(
+                    services.analytics.category_frame(stats),
+                    x_label="Category",
+                    y_label="Number of Events"
+                )
+
+    map_points = services.analytics.map_points(events)
+    if map_points:
         st.subheader("Event Locations")
-        st.map(map_data)
+        with metrics.timed("render_map"):
+            st.map(map_points)
 # ----------------------------
 # 🔥 Smart Recommendation System
 # ----------------------------
@@ -351,67 +382,25 @@ if st.session_state["user"]:
 
     user_id = st.session_state["user"][0]
 
-    # Get user's favorite category
-    cursor.execute("""
-        SELECT category, COUNT(category)
-        FROM saved_events
-        WHERE user_id=? AND category IS NOT NULL
-        GROUP BY category
-        ORDER BY COUNT(category) DESC
-        LIMIT 1
-    """, (user_id,))
+    # Category / venue preferences, maintained incrementally by save_event
+    profile = services.recommendations.profile(user_id)
 
-    result = cursor.fetchone()
+    if profile.categories:
 
-    if result:
+        st.info(f"Personalized based on: {', '.join(profile.top_categories())}")
 
-        favorite_category = result[0]
-        st.info(f"Personalized based on: {favorite_category}")
+        # The scoring frame is built once per result set and shared
+        recommendations = services.recommendations.recommend(
+            user_id, st.session_state["search_results"], keyword=keyword
+        )
 
-        # Get already saved event names
-        cursor.execute("""
-            SELECT event_name FROM saved_events
-            WHERE user_id=?
-        """, (user_id,))
+        if not recommendations.empty:
 
-        saved_names = [row[0] for row in cursor.fetchall()]
+            for rec in recommendations.itertuples():  # Show top 5 only
 
-        scored_events = []
-
-        for event in st.session_state["search_results"]:
-
-            score = 0
-
-            name = event.get("name", "")
-            city_match = 0
-
-            # Category match
-            if "classifications" in event:
-                cat = event["classifications"][0]["segment"]["name"]
-                if cat == favorite_category:
-                    score += 3
-
-            # Avoid already saved events
-            if name not in saved_names:
-                score += 2
-
-            # Optional: Boost if keyword matches search
-            if keyword and keyword.lower() in name.lower():
-                score += 2
-
-            if score > 0:
-                scored_events.append((score, event))
-
-        # Sort by highest score
-        scored_events.sort(reverse=True, key=lambda x: x[0])
-
-        if scored_events:
-
-            for score, event in scored_events[:5]:  # Show top 5 only
-
-                st.success(f"⭐ {event.get('name')}")
-                st.write(f"📅 {event.get('dates', {}).get('start', {}).get('localDate')}")
-                st.markdown(f"[View Event]({event.get('url')})")
+                st.success(f"⭐ {rec.name}")
+                st.write(f"📅 {rec.date}")
+                st.markdown(f"[View Event]({rec.url})")
                 st.markdown("---")
 
         else:
@@ -420,6 +409,28 @@ if st.session_state["user"]:
     else:
         st.write("Save more events to improve recommendations!")
 # ----------------------------
+# Event Assistant
+# ----------------------------
+@st.fragment
+def render_chat():
+    # A fragment: sending a message reruns the chat only, not the page
+    history = st.session_state["chat_history"]
+    user_input = st.text_input("Type a message...", key="chat_input")
+
+    if st.button("Send", key="chat_send") and user_input:
+        with metrics.timed("assistant_reply"):
+            response = services.assistant.reply(
+                user_input, st.session_state["search_results"], st.session_state["search_city"]
+            )
+        history.append(("You", user_input))
+        history.append(("Bot", response))
+        del history[:-MAX_CHAT_MESSAGES]
+
+    for sender, message in history:
+        with st.chat_message("user" if sender == "You" else "assistant"):
+            st.markdown(message)
+
+# ----------------------------
 # Right Side Panel
 # ----------------------------
 
@@ -433,76 +444,27 @@ with right:
     if "chat_history" not in st.session_state:
         st.session_state["chat_history"] = []
 
-    # Input box
-    user_input = st.text_input("Type a message...", key="chat_input")
-
-    if st.button("Send", key="chat_send") and user_input:
-        text = user_input.lower()
-        if "concert" in text or "music" in text:
-            response = "Here are some upcoming music events! 🎵"
-        elif "sports" in text:
-            response = "I can show you nearby sports events! 🏟️"
-        elif "save" in text:
-            response = "You can save events by clicking the ⭐ button next to them."
-        elif "recommend" in text:
-            response = "I can recommend events based on your saved events!"
-        else:
-            response = "I can help with filters, saving events, and recommendations!"
-
-        st.session_state["chat_history"].append(("You", user_input))
-        st.session_state["chat_history"].append(("Bot", response))
-
-# Display chat messages
-    for sender, message in st.session_state["chat_history"]:
-        if sender == "You":
-            st.markdown(
-                f"<div style='background-color:#DCF8C6; padding:10px; border-radius:10px; margin:5px 0; width: fit-content; float:right; clear:both;'><b>{sender}:</b> {message}</div>",
-                unsafe_allow_html=True,
-            )
-        else:
-            st.markdown(
-                f"<div style='background-color:#F1F0F0; padding:10px; border-radius:10px; margin:5px 0; width: fit-content; float:left; clear:both;'><b>{sender}:</b> {message}</div>",
-                unsafe_allow_html=True,
-            )
-
-    st.markdown("<div style='clear:both'></div>", unsafe_allow_html=True)
+    render_chat()
 
     # ---------------- Saved Events ----------------
     st.subheader("⭐ Saved Events")
 
     if st.session_state["saved_events"] and st.session_state["user"]:
 
-        today = datetime.utcnow().date()
-        tomorrow = today + timedelta(days=1)
-
-        for event in st.session_state["saved_events"]:
-            name = event[0]
-            date_str = event[1]
-            venue = event[2]
-            url = event[3]
+        reminders_day, reminders = st.session_state.get("reminders", (None, []))
+        if reminders_day != utc_today():
+            load_saved_events()
+            reminders_day, reminders = st.session_state["reminders"]
 
-            # category may or may not exist
-            cat = event[4] if len(event) > 4 else None
-            event_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-
-            # Reminder highlight
-            if today <= event_date <= tomorrow:
-                st.info(f"⏰ Upcoming: {name} on {date_str}")
+        # Reminder highlight
+        for name, day in reminders:
+            st.info(f"⏰ Upcoming: {name} on {day}")
 
+        for name, date_str, venue, url, whatsapp, tweet in st.session_state["saved_events"]:
             st.markdown(f"• [{name}]({url}) on {date_str}")
 
-            # Sharing
-            wa_message = urllib.parse.quote(
-                f"Check out this event: {name} on {date_str}. {url}"
-            )
-            tweet_message = urllib.parse.quote(
-                f"Check out this event: {name} on {date_str} {url}"
-            )
-
-            st.markdown(
-                f"[WhatsApp](https://wa.me/?text={wa_message}) | "
-                f"[Twitter](https://twitter.com/intent/tweet?text={tweet_message})"
-            )
+            # Sharing links are built once, when the event is saved
+            st.markdown(f"[WhatsApp]({whatsapp}) | [Twitter]({tweet})")
 
     else:
         st.write("No saved events yet.")
@@ -512,9 +474,21 @@ with right:
 if st.session_state["user"]:
     st.sidebar.write(f"👤 Logged in as: {st.session_state['user'][1]}")
     if st.sidebar.button("Logout"):
+        # Revoked, so the token can't be used from anywhere else either
+        services.sessions.revoke(st.session_state["session_token"])
+        st.session_state["session_token"] = None
         st.session_state["user"] = None
         st.session_state["saved_events"] = []
         st.session_state["search_results"] = []
         st.sidebar.success("Logged out successfully")
         st.rerun()
-    
\ No newline at end of file
+
+# ----------------------------
+# Performance debug panel
+# ----------------------------
+metrics.observe("rerun", time.perf_counter() - rerun_started)
+
+if st.sidebar.checkbox("🛠 Show performance metrics", key="show_metrics"):
+    with st.sidebar.expander("Performance", expanded=True):
+        st.dataframe(metrics.REGISTRY.snapshot(), hide_index=True)
+        st.json(metrics.REGISTRY.counters())
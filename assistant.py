@@ -0,0 +1,345 @@
+# assistant.py
+# Offline event assistant behind the chat panel.
+#
+# A message is tokenized once and scanned with a token trie that holds the
+# whole vocabulary (intents, categories, date phrases, known cities), so
+# matching costs O(message length x longest phrase) no matter how many
+# phrases there are. Answers come from the current search results, or
+# from the local event index (event_index.py) when the question names
+# another city or nothing has been searched yet.
+#
+#   assistant = Assistant(index)
+#   assistant.reply("any concerts this weekend?", events, city="Boston")
+import re
+import threading
+import time
+from datetime import date, timedelta
+
+MAX_LISTED = 3                  # events spelled out in an answer
+INDEX_LIMIT = 100
+CITY_REFRESH_SECONDS = 600      # how often cities are re-read from the index
+
+_TOKEN = re.compile(r"[a-z0-9&']+")
+
+INTENTS = {
+    "greet": ["hi", "hello", "hey", "good morning", "good afternoon", "good evening"],
+    "thanks": ["thanks", "thank you", "cheers"],
+    "help": ["help", "what can you do", "how does this work"],
+    "save": ["save", "saving", "saved", "saved events", "bookmark"],
+    "recommend": ["recommend", "recommendation", "recommendations", "suggest", "suggestions"],
+    "count": ["how many", "number of", "count"],
+    "next": ["next", "soonest", "earliest", "upcoming"],
+    "when": ["when is", "when's", "what day is", "what date is"],
+    "where": ["where is", "where's", "which venue"],
+    "find": [
+        "find", "show", "shows", "list", "search", "events", "event", "what's on", "whats on",
+        "happening", "going on", "things to do", "anything",
+    ],
+}
+CATEGORIES = {
+    "Music": ["music", "concert", "concerts", "gig", "gigs", "live music", "festival", "festivals", "band"],
+    "Sports": [
+        "sports", "sport", "game", "games", "match", "matches", "football", "basketball",
+        "baseball", "hockey", "soccer", "cricket", "tennis",
+    ],
+    "Arts & Theatre": [
+        "arts", "theatre", "theater", "play", "plays", "musical", "musicals", "comedy",
+        "opera", "ballet", "dance", "arts & theatre",
+    ],
+    "Film": ["film", "films", "movie", "movies", "cinema", "screening"],
+}
+# Intents answered from events rather than with canned text; the others
+# win unless the message also names a city, category or date
+EVENT_INTENTS = {"count", "next", "find", "when", "where"}
+HELP_INTENTS = {"save", "recommend", "help"}
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+DATE_PHRASES = [
+    "today", "tonight", "tomorrow", "this weekend", "weekend", "next weekend",
+    "this week", "next week", "this month", "next month",
+] + WEEKDAYS
+# Words that introduce a city we may not know yet ("in Springfield")
+CITY_MARKERS = {"in", "near", "around"}
+STOPWORDS = {
+    "a", "an", "the", "are", "is", "there", "any", "some", "me", "i", "to", "of", "for", "on",
+    "at", "with", "do", "you", "have", "can", "please", "what", "which", "who", "about", "and",
+    "or", "my", "it", "that", "this", "these", "those", "up", "coming", "get", "want", "like",
+    "would", "see", "tell", "give", "good", "fun", "cool", "best", "all", "be", "will", "am",
+    "what's", "whats", "how", "does", "did", "something", "go", "going", "out", "now", "here",
+    "when", "where", "we", "us", "our", "them", "they", "should", "could", "more", "yet",
+} | CITY_MARKERS
+
+
+def tokenize(text):
+    return _TOKEN.findall((text or "").lower().replace("’", "'"))
+
+
+def date_range(phrase, today):
+    """(first day, last day) for a date phrase, relative to `today`."""
+    if phrase in ("today", "tonight"):
+        return today, today
+    if phrase == "tomorrow":
+        day = today + timedelta(days=1)
+        return day, day
+    if phrase in ("this weekend", "weekend", "next weekend"):
+        saturday = today + timedelta(days=(5 - today.weekday()) % 7)
+        if today.weekday() == 6:
+            saturday = today - timedelta(days=1)
+        if phrase == "next weekend":
+            saturday += timedelta(days=7)
+        return max(saturday, today), saturday + timedelta(days=1)
+    if phrase == "this week":
+        return today, today + timedelta(days=6 - today.weekday())
+    if phrase == "next week":
+        monday = today + timedelta(days=7 - today.weekday())
+        return monday, monday + timedelta(days=6)
+    if phrase in ("this month", "next month"):
+        first = today.replace(day=1)
+        if phrase == "next month":
+            first = (first + timedelta(days=32)).replace(day=1)
+        last = (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        return max(first, today), last
+    # A weekday: its next occurrence, today included
+    day = today + timedelta(days=(WEEKDAYS.index(phrase) - today.weekday()) % 7)
+    return day, day
+
+
+# ----------------------------
+# Phrase matching
+# ----------------------------
+class PhraseTrie:
+    """Token trie; scan() finds leftmost-longest phrase matches."""
+
+    def __init__(self):
+        self.root = {}
+        self._lock = threading.Lock()
+
+    def add(self, phrase, value, replace=True):
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+        with self._lock:
+            node = self.root
+            for token in tokens:
+                node = node.setdefault(token, {})
+            # None marks the end of a phrase
+            if replace or None not in node:
+                node[None] = value
+
+    def scan(self, tokens):
+        """[(start, end, value)] for non-overlapping matches, longest first."""
+        matches = []
+        i = 0
+        while i < len(tokens):
+            node = self.root
+            best = None
+            j = i
+            while j < len(tokens) and tokens[j] in node:
+                node = node[tokens[j]]
+                j += 1
+                if None in node:
+                    best = (j, node[None])
+            if best is None:
+                i += 1
+                continue
+            matches.append((i, best[0], best[1]))
+            i = best[0]
+        return matches
+
+
+class Query:
+
+    def __init__(self):
+        self.intents = set()
+        self.city = None
+        self.category = None
+        self.date_phrase = None
+        self.start = None
+        self.end = None
+        self.terms = []
+
+    def has_filters(self):
+        return bool(self.city or self.category or self.date_phrase)
+
+
+# ----------------------------
+# Assistant
+# ----------------------------
+class Assistant:
+
+    def __init__(self, index=None, cities=None):
+        # event_index.EventIndex; optional (answers then use the results only)
+        self.index = index
+        self.trie = PhraseTrie()
+        for intent, phrases in INTENTS.items():
+            for phrase in phrases:
+                self.trie.add(phrase, ("intent", intent))
+        for category, phrases in CATEGORIES.items():
+            for phrase in phrases:
+                self.trie.add(phrase, ("category", category))
+        for phrase in DATE_PHRASES:
+            self.trie.add(phrase, ("date", phrase))
+
+        self._cities = set()
+        self._cities_loaded = 0.0
+        if cities is None:
+            from data import events_data
+            cities = events_data
+        self.add_cities(cities)
+
+    def add_cities(self, cities):
+        for city in cities:
+            key = " ".join(tokenize(city))
+            if key and key not in self._cities:
+                self._cities.add(key)
+                # A city never shadows vocabulary ("Orange", "Reading")
+                self.trie.add(key, ("city", key.title()), replace=False)
+
+    def parse(self, text, today=None):
+        today = today or date.today()
+        tokens = tokenize(text)
+        query = Query()
+        matched = set()
+        for start, end, (kind, value) in self.trie.scan(tokens):
+            matched.update(range(start, end))
+            if kind == "intent":
+                query.intents.add(value)
+            elif kind == "category":
+                query.category = query.category or value
+            elif kind == "city":
+                query.city = query.city or value
+            elif kind == "date" and query.date_phrase is None:
+                query.date_phrase = value
+                query.start, query.end = date_range(value, today)
+
+        if query.city is None:
+            # "in <unknown city>": take the unmatched words after the marker
+            for i, token in enumerate(tokens):
+                if token in CITY_MARKERS:
+                    words = []
+                    for j in range(i + 1, min(i + 4, len(tokens))):
+                        if j in matched or tokens[j] in STOPWORDS:
+                            break
+                        words.append(tokens[j])
+                        matched.add(j)
+                    if words:
+                        query.city = " ".join(words).title()
+                        break
+        query.terms = [t for i, t in enumerate(tokens) if i not in matched and t not in STOPWORDS]
+        return query
+
+    def reply(self, text, events=(), city=None, today=None):
+        """Markdown answer to a chat message, given the current results and their city."""
+        self._refresh_cities(events)
+        query = self.parse(text, today)
+        intents = query.intents
+        if not query.has_filters() and (intents & HELP_INTENTS or not (query.terms or intents & EVENT_INTENTS)):
+            return self.small_talk(intents)
+        if not events and not query.city and not city:
+            return "Search for a city first, or name one: e.g. “music in Boston this weekend”."
+
+        found, where = self.candidates(query, events, city)
+        label = self.describe(query, where, len(found))
+        if intents & {"when", "where"}:
+            return self.answer_lookup(query, found, label)
+        if "count" in intents:
+            return f"There {'is' if len(found) == 1 else 'are'} **{len(found)}** {label}."
+        if not found:
+            return f"I couldn't find any {label}. Try another date or category."
+        if "next" in intents:
+            dated = sorted((e for e in found if e.local_date), key=lambda e: e.local_date)
+            return f"Next up: {self.line((dated or found)[0])}"
+        return self.answer_list(found, label)
+
+    def candidates(self, query, events, city=None):
+        """(matching events, city they are in); the index stands in for other cities."""
+        events = list(events or ())
+        asked = query.city
+        other_city = asked is not None and (city or "").strip().casefold() != asked.casefold()
+        if (other_city or not events) and self.index is not None:
+            events = self.index.search(
+                city=asked or city,
+                keyword=" ".join(query.terms) if query.terms else None,
+                segments=[query.category] if query.category else None,
+                start_date=query.start,
+                end_date=query.end,
+                limit=INDEX_LIMIT
+            )
+            return events, asked or city
+        if other_city:
+            return [], asked
+        return [e for e in events if self.matches(query, e)], city
+
+    def matches(self, query, event):
+        if query.category and event.segment != query.category:
+            return False
+        if query.start:
+            if not event.local_date:
+                return False
+            if not query.start.isoformat() <= event.local_date <= query.end.isoformat():
+                return False
+        if query.terms:
+            text = " ".join(tokenize(f"{event.name} {event.venue or ''}"))
+            if not all(term in text for term in query.terms):
+                return False
+        return True
+
+    # ----------------------------
+    # Answers
+    # ----------------------------
+    def describe(self, query, city, count=0):
+        noun = "event" if count == 1 else "events"
+        label = f"{query.category.lower()} {noun}" if query.category else noun
+        if query.terms:
+            label += f" matching “{' '.join(query.terms)}”"
+        if city:
+            label += f" in {city.strip().title()}"
+        if query.date_phrase in WEEKDAYS:
+            label += f" on {query.date_phrase.title()}"
+        elif query.date_phrase:
+            label += f" {query.date_phrase}"
+        return label
+
+    def line(self, event):
+        name = f"[{event.name}]({event.url})" if event.url else event.name
+        return f"**{name}** — {event.local_date or 'date TBA'}, {event.venue or 'venue TBA'}"
+
+    def answer_list(self, found, label):
+        lines = [f"I found **{len(found)}** {label}:"]
+        lines += [f"- {self.line(event)}" for event in found[:MAX_LISTED]]
+        if len(found) > MAX_LISTED:
+            lines.append(f"…and {len(found) - MAX_LISTED} more in the results.")
+        return "\n".join(lines)
+
+    def answer_lookup(self, query, found, label):
+        if not query.terms:
+            return "Which event? Ask e.g. “when is Hamilton?”"
+        if not found:
+            return f"I couldn't find any {label}."
+        return self.line(found[0])
+
+    def small_talk(self, intents):
+        if "save" in intents:
+            return ("Click **⭐ Save** on any event card to keep it in your Saved Events "
+                    "(you need to be logged in).")
+        if "recommend" in intents:
+            return ("Log in and save a few events: **🔥 Recommended For You** then ranks the "
+                    "current results by the categories and venues you save most.")
+        if "thanks" in intents:
+            return "You're welcome! 🎉"
+        if "greet" in intents:
+            return "Hi! 👋 " + self.help_text()
+        return self.help_text()
+
+    def help_text(self):
+        return ("Ask me about events, e.g. “music this weekend”, “how many sports events "
+                "in Boston?” or “when is Hamilton?”. I answer from your search results and "
+                "the offline event index.")
+
+    def _refresh_cities(self, events):
+        self.add_cities({e.city for e in events or () if e.city})
+        now = time.monotonic()
+        if self.index is None or now - self._cities_loaded < CITY_REFRESH_SECONDS:
+            return
+        self._cities_loaded = now
+        rows = self.index.db.fetchall("SELECT DISTINCT city FROM events WHERE city IS NOT NULL")
+        self.add_cities(row[0] for row in rows)
@@ -0,0 +1,191 @@
+# auth.py
+# Password hashing and login sessions.
+#
+# Passwords are stored as scrypt hashes ("scrypt$n$r$p$salt$hash"). scrypt
+# is memory-hard (128 * n * r bytes per hash: 16 MB at the defaults), so
+# hashing runs on a small thread pool whose size caps CPU and memory use
+# during a burst of logins. The caller still waits for its own hash (a
+# login can't finish before it), so the pool bounds concurrency; it does
+# not make a login non-blocking. hashlib releases the GIL while it works,
+# so other sessions' reruns keep going meanwhile.
+#
+# A login issues a random session token. Only its SHA-256 is stored (the
+# sessions table, keyed by that digest), and validated tokens are kept in
+# an in-process LRU, so an authenticated rerun or API call is checked with
+# a dict lookup instead of a password hash and a users query.
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from lru import LRUCache
+
+SCHEME = "scrypt"
+SCRYPT_N = 2 ** 14              # CPU / memory cost; raise it as hardware gets faster
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_BYTES = 16
+HASH_BYTES = 32
+HASH_WORKERS = 4
+SESSION_TTL = 30 * 24 * 3600
+SESSION_RECHECK = 60            # seconds a cached session is trusted before re-reading its row
+MAX_CACHED_SESSIONS = 10_000
+
+# What callers get for a user: never the password hash
+USER_COLUMNS = "id, username, email, created_at"
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _unb64(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p, dklen=HASH_BYTES,
+        maxmem=128 * r * (n + p) + 1024 * 1024
+    )
+
+
+# ----------------------------
+# Password hashes
+# ----------------------------
+def hash_password(password, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+    salt = os.urandom(SALT_BYTES)
+    digest = _scrypt(password, salt, n, r, p)
+    return f"{SCHEME}${n}${r}${p}${_b64(salt)}${_b64(digest)}"
+
+
+def is_hashed(stored):
+    return bool(stored) and stored.startswith(SCHEME + "$")
+
+
+def verify_password(password, stored):
+    if not is_hashed(stored):
+        # Plaintext left by older tools; upgraded on the next login
+        return stored is not None and hmac.compare_digest(password.encode(), stored.encode())
+    try:
+        _, n, r, p, salt, digest = stored.split("$")
+        expected = _unb64(digest)
+        actual = _scrypt(password, _unb64(salt), int(n), int(r), int(p))
+    except (ValueError, TypeError):
+        return False
+    return hmac.compare_digest(actual, expected)
+
+
+def hash_passwords(passwords, workers=HASH_WORKERS):
+    """Hash many passwords in parallel (used by bulk.py)."""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(hash_password, passwords))
+
+
+class PasswordHasher:
+    """
+    Hashes and verifies on a bounded thread pool with tunable scrypt cost.
+    Each call blocks until its hash is done; the pool only limits how many
+    run at once.
+    """
+
+    def __init__(self, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, workers=HASH_WORKERS):
+        self.n = n
+        self.r = r
+        self.p = p
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="passwords")
+        self._dummy = None
+
+    def hash(self, password):
+        return self._executor.submit(hash_password, password, self.n, self.r, self.p).result()
+
+    def verify(self, password, stored):
+        if stored is None:
+            # Unknown user: spend the same time as a real check
+            if self._dummy is None:
+                self._dummy = self.hash(secrets.token_hex(8))
+            stored = self._dummy
+            self._executor.submit(verify_password, password, stored).result()
+            return False
+        return self._executor.submit(verify_password, password, stored).result()
+
+    def needs_rehash(self, stored):
+        if not is_hashed(stored):
+            return True
+        return stored.split("$")[1:4] != [str(self.n), str(self.r), str(self.p)]
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ----------------------------
+# Sessions
+# ----------------------------
+def token_key(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class SessionStore:
+
+    def __init__(self, db, ttl=SESSION_TTL, max_entries=MAX_CACHED_SESSIONS):
+        self.db = db
+        self.ttl = ttl
+        # token key -> (user, checked_at), dropped when the session expires
+        self._sessions = LRUCache(max_entries)
+
+    def create(self, user):
+        """New session token for a user row (see USER_COLUMNS)."""
+        token = secrets.token_urlsafe(32)
+        key = token_key(token)
+        now = time.time()
+        expires_at = now + self.ttl
+        self.db.write(
+            "INSERT INTO sessions (token_hash, user_id, created_at, expires_at) VALUES (?, ?, ?, ?)",
+            (key, user[0], now, expires_at)
+        )
+        # Expired rows go on the way out, through the expires_at index
+        self.db.submit_write("DELETE FROM sessions WHERE expires_at<=?", (now,))
+        self._sessions.set(key, (tuple(user), now), expires_at=expires_at)
+        return token
+
+    def validate(self, token):
+        """The user for a live token, or None."""
+        if not token:
+            return None
+        key = token_key(token)
+        now = time.time()
+        entry = self._sessions.get(key)
+        if entry is not None:
+            user, checked_at = entry
+            if now - checked_at < SESSION_RECHECK:
+                return user
+            # Still there? Another process may have logged it out
+            row = self.db.fetchone(
+                "SELECT expires_at FROM sessions WHERE token_hash=? AND expires_at>?", (key, now)
+            )
+            if row is None:
+                self._sessions.pop(key)
+                return None
+            self._sessions.set(key, (user, now), expires_at=row[0])
+            return user
+
+        row = self.db.fetchone(f"""
+            SELECT {", ".join("u." + c for c in USER_COLUMNS.split(", "))}, s.expires_at
+            FROM sessions s JOIN users u ON u.id = s.user_id
+            WHERE s.token_hash=? AND s.expires_at>?
+        """, (key, now))
+        if row is None:
+            return None
+        user = tuple(row[:-1])
+        self._sessions.set(key, (user, now), expires_at=row[-1])
+        return user
+
+    def revoke(self, token):
+        if not token:
+            return
+        key = token_key(token)
+        self._sessions.pop(key)
+        self.db.write("DELETE FROM sessions WHERE token_hash=?", (key,))
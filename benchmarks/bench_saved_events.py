@@ -0,0 +1,78 @@
+# benchmarks/bench_saved_events.py
+# Saved-event lookup latency before and after the saved_events indexes.
+#
+#   python benchmarks/bench_saved_events.py --rows 1000000
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.datasets import populate_saved_events, populate_users  # noqa: E402
+from migrations import MIGRATIONS, index_saved_events, migrate  # noqa: E402
+
+LOAD_SAVED = """
+    SELECT event_name, event_date, event_venue, event_url
+    FROM saved_events
+    WHERE user_id=?
+    ORDER BY saved_at DESC
+"""
+DUPLICATE_CHECK = """
+    SELECT 1 FROM saved_events
+    WHERE user_id=? AND event_name=? AND event_date=?
+"""
+
+
+def time_queries(conn, users, repeat):
+    rng = random.Random(7)
+    load = []
+    dup = []
+    for _ in range(repeat):
+        user_id = rng.randint(1, users)
+        start = time.perf_counter()
+        conn.execute(LOAD_SAVED, (user_id,)).fetchall()
+        load.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        conn.execute(DUPLICATE_CHECK, (user_id, "Event 123", "2026-05-05")).fetchone()
+        dup.append(time.perf_counter() - start)
+    return sorted(load)[len(load) // 2], sorted(dup)[len(dup) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark saved-event lookups")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    conn = sqlite3.connect(path)
+
+    # Schema as it was before the saved_events indexes were added
+    index_version = next(v for v, _, step in MIGRATIONS if step is index_saved_events)
+    migrate(conn, target=index_version - 1)
+    print(f"Inserting {args.rows:,} saved events for {args.users:,} users...")
+    populate_users(conn, args.users)
+    populate_saved_events(conn, args.rows, args.users)
+
+    load, dup = time_queries(conn, args.users, args.repeat)
+    print(f"before: load_saved_events p50 {load * 1000:8.3f} ms | duplicate check p50 {dup * 1000:8.3f} ms")
+
+    start = time.perf_counter()
+    migrate(conn, target=index_version)
+    print(f"migration to v{index_version} took {time.perf_counter() - start:.2f} s")
+
+    load, dup = time_queries(conn, args.users, args.repeat)
+    print(f"after:  load_saved_events p50 {load * 1000:8.3f} ms | duplicate check p50 {dup * 1000:8.3f} ms")
+
+    conn.close()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
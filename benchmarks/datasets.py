@@ -0,0 +1,79 @@
+# benchmarks/datasets.py
+# Deterministic synthetic data for the benchmarks: users, saved events and
+# parsed Event records. Sizes default to the production-scale targets
+# (10k users, 1M saved events).
+import random
+from datetime import date, timedelta
+
+from event_record import Event
+
+USERS = 10_000
+SAVED_EVENTS = 1_000_000
+BATCH = 50_000
+
+SEGMENTS = ("Music", "Sports", "Arts & Theatre", "Film", "Miscellaneous")
+CITIES = ("New York", "Boston", "Chicago", "Austin", "Seattle", "Denver")
+
+INSERT_SAVED = """
+    INSERT INTO saved_events
+        (user_id, event_name, event_date, event_venue, event_url, saved_at, category, provider_event_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def populate_users(conn, users=USERS):
+    conn.executemany(
+        "INSERT INTO users (username, email, password) VALUES (?, ?, ?)",
+        ((f"user{i}", f"user{i}@example.com", "x") for i in range(users))
+    )
+    conn.commit()
+
+
+def saved_event_rows(rows, users, seed=42):
+    rng = random.Random(seed)
+    for i in range(rows):
+        yield (
+            rng.randint(1, users),
+            f"Event {i}",
+            f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            f"Venue {i % 500}",
+            f"https://example.com/{i}",
+            f"2026-01-01 00:{(i // 60) % 60:02d}:{i % 60:02d}",
+            SEGMENTS[i % len(SEGMENTS)],
+            f"evt-{i}",
+        )
+
+
+def populate_saved_events(conn, rows=SAVED_EVENTS, users=USERS, seed=42):
+    batch = []
+    for row in saved_event_rows(rows, users, seed):
+        batch.append(row)
+        if len(batch) == BATCH:
+            conn.executemany(INSERT_SAVED, batch)
+            batch.clear()
+    if batch:
+        conn.executemany(INSERT_SAVED, batch)
+    conn.commit()
+
+
+def synthetic_events(count, seed=42, start=None):
+    """Parsed Event records spread over 60 days, 500 venues and a few cities."""
+    rng = random.Random(seed)
+    start = start or date(2026, 6, 1)
+    events = []
+    for i in range(count):
+        city = CITIES[i % len(CITIES)]
+        events.append(Event(
+            id=f"evt-{i}",
+            name=f"{rng.choice(('The', 'Live:', 'An Evening with'))} Artist {i % 2000}",
+            local_date=(start + timedelta(days=rng.randrange(60))).isoformat(),
+            venue=f"Venue {i % 500}",
+            venue_id=f"venue-{i % 500}",
+            city=city,
+            lat=40.0 + rng.random(),
+            lon=-74.0 + rng.random(),
+            segment=SEGMENTS[rng.randrange(len(SEGMENTS))],
+            image_url=f"https://example.com/img/{i}.jpg",
+            url=f"https://example.com/event/{i}",
+        ))
+    return tuple(events)
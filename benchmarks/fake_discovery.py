@@ -0,0 +1,67 @@
+# benchmarks/fake_discovery.py
+# Discovery API fake for the benchmarks: serves pages built from a recorded
+# response (fixtures/discovery_page.json), so parsing cost matches the real
+# payloads - nested venues, seven image variants, classifications, links.
+#
+#   python benchmarks/fake_discovery.py --port 8765 --total 1000
+import argparse
+import copy
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_server import StubServer  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "discovery_page.json")
+
+_recorded = None
+
+
+def recorded_events():
+    global _recorded
+    if _recorded is None:
+        with open(FIXTURE, encoding="utf-8") as f:
+            _recorded = json.load(f)["_embedded"]["events"]
+    return _recorded
+
+
+def recorded_event(i, city=None):
+    # Recorded event i (mod the fixture size) with a unique id, name and url
+    event = copy.deepcopy(recorded_events()[i % len(recorded_events())])
+    event["id"] = f"{event['id']}-{i}"
+    event["name"] = f"{event['name']} #{i}"
+    event["url"] = f"{event['url']}?n={i}"
+    if city:
+        event["_embedded"]["venues"][0]["city"]["name"] = city
+    return event
+
+
+def recorded_payload(city="New York", size=20, page=0, total=20):
+    start = page * size
+    count = max(0, min(size, total - start))
+    total_pages = (total + size - 1) // size if size else 0
+    payload = {"page": {"size": size, "totalElements": total, "totalPages": total_pages, "number": page}}
+    if count:
+        payload["_embedded"] = {"events": [recorded_event(start + i, city) for i in range(count)]}
+    return payload
+
+
+def fake_discovery(total=250, delay=0.0, port=0):
+    """A StubServer serving recorded payloads; use as a context manager."""
+    return StubServer(port=port, total=total, delay=delay, payload=recorded_payload)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded Discovery API payloads")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--total", type=int, default=250, help="events available per search")
+    args = parser.parse_args()
+
+    with fake_discovery(args.total, port=args.port) as server:
+        print(f"Serving recorded Discovery payloads at {server.url}")
+        try:
+            server._thread.join()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,283 @@
+# benchmarks/run.py
+# Offline benchmark suite for the hot paths. Everything runs against a
+# temporary SQLite database and the recorded-payload Discovery fake, so
+# results are comparable between commits and machines.
+#
+#   python benchmarks/run.py                        # full size: 10k users, 1M saved events
+#   python benchmarks/run.py --quick                # small datasets, for a smoke run
+#   python benchmarks/run.py --only search,parse
+#   python benchmarks/run.py --compare benchmarks/results/<old>.json
+#
+# Results go to benchmarks/results/<commit>.json unless --output is given.
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from analytics import compute_aggregates  # noqa: E402
+from assistant import Assistant  # noqa: E402
+from auth import PasswordHasher, SessionStore  # noqa: E402
+from benchmarks.datasets import (  # noqa: E402
+    SAVED_EVENTS, USERS, populate_saved_events, populate_users, synthetic_events
+)
+from benchmarks.fake_discovery import fake_discovery, recorded_event  # noqa: E402
+from database import Database  # noqa: E402
+from event_fetcher import iter_records  # noqa: E402
+from event_record import parse_events  # noqa: E402
+from eventure.repository import SavedEventRepository, UserRepository  # noqa: E402
+from migrations import migrate  # noqa: E402
+from provider_client import ProviderClient  # noqa: E402
+from providers import FederatedSearch, LocalDatasetProvider, TicketmasterProvider  # noqa: E402
+from recommender import events_frame, recommend  # noqa: E402
+from reminders import fill_share_links  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+SCENARIOS = {}
+
+
+def scenario(name, rounds):
+    """Register fn(ctx) -> operation; only the operation is timed."""
+    def register(fn):
+        SCENARIOS[name] = (fn, rounds)
+        return fn
+    return register
+
+
+# ----------------------------
+# Scenarios
+# ----------------------------
+@scenario("search", rounds=20)
+def search(ctx):
+    # Five pages of 50 recorded events over loopback HTTP, fetched and parsed
+    client = ctx["client"]
+    url = ctx["server"].url
+    params = {"city": "New York", "sort": "date,asc"}
+    return lambda: tuple(iter_records(client, url, params, max_pages=5, page_size=50))
+
+
+@scenario("federated", rounds=20)
+def federated(ctx):
+    # The search scenario's pages fanned out with the local dataset, merged and de-duplicated
+    providers = FederatedSearch([
+        TicketmasterProvider(ctx["client"], ctx["server"].url, max_pages=5),
+        LocalDatasetProvider(),
+    ])
+    params = {"city": "New York", "sort": "date,asc"}
+    return lambda: tuple(providers.search(params))
+
+
+@scenario("parse", rounds=50)
+def parse(ctx):
+    raw = [recorded_event(i) for i in range(1000)]
+    return lambda: parse_events(raw)
+
+
+@scenario("save", rounds=500)
+def save(ctx):
+    repo = SavedEventRepository(ctx["db"])
+    users = ctx["users"]
+    rng = random.Random(11)
+    counter = iter(range(10**9))
+
+    def op():
+        i = next(counter)
+        repo.save(rng.randint(1, users), f"Bench Event {i}", "2026-06-01", "Bench Venue",
+                  f"https://example.com/bench/{i}", "Music", f"bench-{i}")
+    return op
+
+
+@scenario("load_saved", rounds=500)
+def load_saved(ctx):
+    repo = SavedEventRepository(ctx["db"])
+    users = ctx["users"]
+    rng = random.Random(7)
+    return lambda: repo.list(rng.randint(1, users))
+
+
+@scenario("authenticate", rounds=20)
+def authenticate(ctx):
+    # One scrypt verification at the default cost
+    users = UserRepository(ctx["db"], ctx["passwords"])
+    users.create("bench-login", "bench-login@example.com", "correct horse")
+    return lambda: users.authenticate("bench-login", "correct horse")
+
+
+@scenario("session", rounds=500)
+def session(ctx):
+    # A rerun's token check: served from the in-process cache
+    sessions = SessionStore(ctx["db"])
+    token = sessions.create(UserRepository(ctx["db"], ctx["passwords"]).get(1))
+    return lambda: sessions.validate(token)
+
+
+@scenario("recommend", rounds=50)
+def recommend_events(ctx):
+    frame = events_frame(ctx["events"])
+    category_weights = {"Music": 1.0, "Sports": 0.4}
+    venue_weights = {"Venue 1": 1.0, "Venue 7": 0.5}
+    saved_names = {event.name for event in ctx["events"][:200]}
+    today = date(2026, 6, 1)
+    return lambda: recommend(frame, category_weights, saved_names, keyword="artist 1",
+                             today=today, venue_weights=venue_weights)
+
+
+@scenario("assistant", rounds=200)
+def assistant(ctx):
+    # Intent / entity matching plus an answer over the whole result set
+    bot = Assistant()
+    events = ctx["events"]
+    return lambda: bot.reply("how many music events this weekend?", events, city="Boston")
+
+
+@scenario("analytics", rounds=50)
+def analytics(ctx):
+    # compute_aggregates, not the memoized wrapper: every round does the work
+    events = ctx["events"]
+    return lambda: compute_aggregates(events)
+
+
+# ----------------------------
+# Harness
+# ----------------------------
+def summarize(timings):
+    ordered = sorted(timings)
+    return {
+        "rounds": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 4),
+        "median_ms": round(statistics.median(ordered) * 1000, 4),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+        "stdev_ms": round(statistics.pstdev(ordered) * 1000, 4),
+    }
+
+
+def run_scenario(name, ctx, rounds, warmup=2):
+    fn, _ = SCENARIOS[name]
+    op = fn(ctx)
+    for _ in range(warmup):
+        op()
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        op()
+        timings.append(time.perf_counter() - start)
+    return summarize(timings)
+
+
+def build_database(path, users, rows):
+    db = Database(path)
+    with db.connection() as conn:
+        migrate(conn)
+        # Bulk load through an implicit transaction
+        conn.isolation_level = ""
+        populate_users(conn, users)
+        populate_saved_events(conn, rows, users)
+        conn.isolation_level = None
+    # As the reminder job does for bulk-loaded rows
+    fill_share_links(db)
+    return db
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline.get('commit', baseline_path)} (median):")
+    for name, stats in results["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old:
+            print(f"  {name:12} {stats['median_ms']:10.3f} ms  (new)")
+            continue
+        ratio = stats["median_ms"] / old["median_ms"] if old["median_ms"] else float("inf")
+        print(f"  {name:12} {old['median_ms']:10.3f} -> {stats['median_ms']:10.3f} ms  x{ratio:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite")
+    parser.add_argument("--users", type=int, default=USERS)
+    parser.add_argument("--saved-events", type=int, default=SAVED_EVENTS)
+    parser.add_argument("--events", type=int, default=10_000, help="result-set size for recommend/analytics")
+    parser.add_argument("--quick", action="store_true", help="1k users, 50k saved events, fewer rounds")
+    parser.add_argument("--only", help="comma-separated scenario names")
+    parser.add_argument("--output", help="results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.users, args.saved_events = 1_000, 50_000
+    names = args.only.split(",") if args.only else list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    workdir = tempfile.mkdtemp(prefix="eventure-bench-")
+    try:
+        print(f"Building dataset: {args.users:,} users, {args.saved_events:,} saved events...")
+        start = time.perf_counter()
+        db = build_database(os.path.join(workdir, "bench.db"), args.users, args.saved_events)
+        print(f"  done in {time.perf_counter() - start:.1f} s")
+
+        passwords = PasswordHasher()
+        with fake_discovery(total=250) as server, ProviderClient(retries=0) as client:
+            ctx = {
+                "db": db,
+                "passwords": passwords,
+                "users": args.users,
+                "events": synthetic_events(args.events),
+                "server": server,
+                "client": client,
+            }
+            results = {
+                "commit": git_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "params": {"users": args.users, "saved_events": args.saved_events, "events": args.events},
+                "scenarios": {},
+            }
+            for name in names:
+                rounds = SCENARIOS[name][1]
+                if args.quick:
+                    rounds = max(5, rounds // 5)
+                stats = run_scenario(name, ctx, rounds)
+                results["scenarios"][name] = stats
+                print(f"  {name:12} median {stats['median_ms']:10.3f} ms   p95 {stats['p95_ms']:10.3f} ms")
+        passwords.close()
+        db.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{results['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,438 @@
+# bulk.py
+# Bulk import / export of the users and saved_events tables.
+#
+#   python bulk.py export saved_events snapshot/saved_events.csv.gz
+#   python bulk.py export users users.jsonl --include-passwords
+#   python bulk.py import saved_events partner.parquet
+#   python bulk.py rehash users
+#
+# The format comes from the file extension: .csv, .jsonl or .parquet
+# (Parquet needs pandas + pyarrow); .csv and .jsonl may be gzipped (.gz).
+#
+# Imports stream the file into executemany() batches. By default the
+# table's secondary indexes are dropped first and rebuilt once at the end,
+# all in one transaction, so readers never see a half-loaded table and
+# duplicates (by the unique indexes) are dropped just like
+# "ON CONFLICT DO NOTHING" would. Importing saved_events drops the
+# affected users' preference profiles, which are rebuilt on next use.
+# Exports stream from the cursor in chunks, so tables of any size are
+# written in constant memory.
+#
+# users.password holds scrypt hashes (see auth.py) and is only exported
+# with --include-passwords; plaintext passwords in an imported file are
+# hashed on the way in, so a users import runs at scrypt speed. `rehash`
+# upgrades the plaintext rows migration 9 flagged as legacy, hashing
+# outside any transaction and writing each round in a short one, so the
+# app keeps running meanwhile.
+import argparse
+import csv
+import gzip
+import itertools
+import json
+import operator
+import os
+import sqlite3
+import sys
+import time
+
+from auth import SCHEME, hash_passwords, is_hashed
+from migrations import migrate
+
+DB_PATH = "event_finder.db"
+BATCH_ROWS = 50_000             # rows per executemany() / fetchmany()
+COMMIT_ROWS = 500_000           # --keep-indexes commits this often
+HASH_ROWS = 1_000               # passwords hashed per thread-pool round
+
+TABLES = {
+    "users": ["id", "username", "email", "password", "created_at"],
+    "saved_events": [
+        "id", "user_id", "event_name", "event_date", "event_venue", "event_url",
+        "saved_at", "category", "provider_event_id",
+    ],
+}
+REQUIRED = {
+    "users": ["username", "email", "password"],
+    "saved_events": ["user_id", "event_name"],
+}
+INTEGER_COLUMNS = ("id", "user_id")
+SECRET_COLUMNS = {"users": ["password"]}
+
+
+def file_format(path):
+    name = path[:-3] if path.endswith(".gz") else path
+    extension = os.path.splitext(name)[1].lower().lstrip(".")
+    if extension not in ("csv", "jsonl", "parquet"):
+        raise SystemExit(f"Unsupported file type for {path} (use .csv, .jsonl or .parquet)")
+    return extension
+
+
+def open_text(path, mode, compressed=None):
+    if compressed is None:
+        compressed = path.endswith(".gz")
+    if compressed:
+        return gzip.open(path, mode + "t", compresslevel=6, encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def tune_for_load(conn):
+    # synchronous=OFF skips every fsync. If the import process dies, SQLite
+    # still rolls the load back cleanly; but a power loss or OS crash
+    # during the load can corrupt the database file, so export a snapshot
+    # first when loading into a database you can't rebuild.
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-262144")   # 256 MB page cache for index builds
+    conn.execute("PRAGMA threads=4")            # parallel sorting in CREATE INDEX
+
+
+def reset_after_load(conn):
+    # Back to the settings database.Database uses, whether or not the load worked
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=DEFAULT")
+    conn.execute("PRAGMA cache_size=-2000")
+    conn.execute("PRAGMA threads=0")
+
+
+# ----------------------------
+# Readers
+# ----------------------------
+# Each reader yields the field names first, then one sequence per row.
+def read_csv(path):
+    with open_text(path, "r") as f:
+        reader = csv.reader(f)
+        yield next(reader, [])
+        yield from reader
+
+
+def read_jsonl(path):
+    with open_text(path, "r") as f:
+        lines = (line for line in f if line.strip())
+        first = next(lines, None)
+        if first is None:
+            yield []
+            return
+        record = json.loads(first)
+        fields = list(record)
+        yield fields
+        yield tuple(map(record.get, fields))
+        for line in lines:
+            yield tuple(map(json.loads(line).get, fields))
+
+
+def read_parquet(path):
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    yield parquet.schema_arrow.names
+    for batch in parquet.iter_batches(batch_size=BATCH_ROWS):
+        yield from zip(*(column.to_pylist() for column in batch.columns))
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl, "parquet": read_parquet}
+
+
+# ----------------------------
+# Import
+# ----------------------------
+def user_ids(conn):
+    return dict(conn.execute("SELECT username, id FROM users"))
+
+
+def import_rows(conn, table, fields, records, keep_ids=False):
+    """(columns, row tuples) picked out of the file's fields."""
+    columns = [c for c in TABLES[table] if c in fields and (keep_ids or c != "id")]
+    by_name = table == "saved_events" and "user_id" not in fields and "username" in fields
+    missing = [c for c in REQUIRED[table] if c not in columns and not (by_name and c == "user_id")]
+    if missing:
+        raise SystemExit(f"{table} import is missing column(s): {', '.join(missing)}")
+
+    positions = [fields.index(c) for c in columns]
+    if len(positions) == 1:
+        pick = lambda row, i=positions[0]: (row[i],)  # noqa: E731
+    else:
+        pick = operator.itemgetter(*positions)
+    if not by_name:
+        return columns, map(pick, records)
+
+    # Partner files identify users by name; unknown names are skipped
+    usernames = user_ids(conn)
+    name_at = fields.index("username")
+    rows = (
+        (user_id,) + pick(row)
+        for row in records
+        if (user_id := usernames.get(row[name_at])) is not None
+    )
+    return ["user_id"] + columns, rows
+
+
+def hash_plaintext_passwords(rows, position):
+    """Rows with plaintext passwords (at `position`) replaced by scrypt hashes."""
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, HASH_ROWS))
+        if not chunk:
+            return
+        todo = [i for i, row in enumerate(chunk) if row[position] and not is_hashed(row[position])]
+        hashes = hash_passwords([chunk[i][position] for i in todo])
+        for i, hashed in zip(todo, hashes):
+            row = chunk[i]
+            chunk[i] = row[:position] + (hashed,) + row[position + 1:]
+        yield from chunk
+
+
+def rehash_legacy_passwords(conn):
+    """Hash the passwords flagged password_legacy; returns how many were upgraded."""
+    upgraded = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, password FROM users WHERE password_legacy=1 AND id>? ORDER BY id LIMIT ?",
+            (last_id, HASH_ROWS)
+        ).fetchall()
+        if not rows:
+            return upgraded
+        last_id = rows[-1][0]
+        todo = [(user_id, password) for user_id, password in rows if not is_hashed(password)]
+        hashes = hash_passwords([password for _, password in todo])
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # A login may have upgraded (or changed) a row in the meantime
+            upgraded += conn.executemany(
+                "UPDATE users SET password=?, password_legacy=0 WHERE id=? AND password=?",
+                [(hashed, user_id, password) for hashed, (user_id, password) in zip(hashes, todo)]
+            ).rowcount
+            conn.executemany(
+                "UPDATE users SET password_legacy=0 WHERE id=? AND substr(password, 1, ?)=?",
+                [(user_id, len(SCHEME) + 1, SCHEME + "$") for user_id, _ in rows]
+            )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+
+def secondary_indexes(conn, table):
+    """(name, create sql, unique columns or None) for the table's own indexes."""
+    indexes = []
+    for name, sql in conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type='index' AND tbl_name=? AND sql IS NOT NULL",
+        (table,)
+    ):
+        unique = next(row[2] for row in conn.execute(f"PRAGMA index_list({table})") if row[1] == name)
+        columns = [row[2] for row in conn.execute(f"PRAGMA index_info({name})")] if unique else None
+        indexes.append((name, sql, columns))
+    return indexes
+
+
+def rebuild_indexes(conn, table, indexes, first_new_rowid=1):
+    """Recreate dropped indexes; returns how many loaded duplicates were removed."""
+    removed = 0
+    for name, sql, unique_columns in indexes:
+        if not unique_columns:
+            conn.execute(sql)
+            continue
+        conn.execute("SAVEPOINT unique_index")
+        try:
+            conn.execute(sql)
+        except sqlite3.IntegrityError:
+            # Duplicates loaded: drop each imported row whose key an earlier
+            # row already has, as ON CONFLICT DO NOTHING would have, then
+            # build the index again. Rows from before the import are never
+            # touched, and NULL keys never clash (the index treats them as
+            # distinct)
+            conn.execute("ROLLBACK TO unique_index")
+            group = ", ".join(unique_columns)
+            not_null = " AND ".join(f"{c} IS NOT NULL" for c in unique_columns)
+            removed += conn.execute(f"""
+                DELETE FROM {table}
+                WHERE rowid >= ? AND {not_null}
+                  AND rowid NOT IN (SELECT MIN(rowid) FROM {table} WHERE {not_null} GROUP BY {group})
+            """, (first_new_rowid,)).rowcount
+            conn.execute(sql)
+        conn.execute("RELEASE unique_index")
+    return removed
+
+
+def forget_profiles(conn, first_new_rowid, keep_ids=False):
+    # Profiles are rebuilt from saved_events the next time they're needed
+    # (see profiles.py); imported ids may sit anywhere, so --keep-ids drops all
+    if keep_ids:
+        conn.execute("DELETE FROM user_profiles")
+        return
+    conn.execute("""
+        DELETE FROM user_profiles
+        WHERE user_id IN (SELECT DISTINCT user_id FROM saved_events WHERE rowid >= ?)
+    """, (first_new_rowid,))
+
+
+def import_table(conn, table, path, keep_indexes=False, keep_ids=False):
+    fmt = file_format(path)
+    records = READERS[fmt](path)
+    fields = next(records)
+    if not fields:
+        return 0
+    tune_for_load(conn)
+    try:
+        return _load(conn, table, fmt, fields, records, keep_indexes, keep_ids)
+    finally:
+        reset_after_load(conn)
+
+
+def _load(conn, table, fmt, fields, records, keep_indexes, keep_ids):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Rows inserted from here on have larger rowids (see rebuild_indexes)
+        first_new_rowid = conn.execute(f"SELECT COALESCE(MAX(rowid), 0) + 1 FROM {table}").fetchone()[0]
+        columns, rows = import_rows(conn, table, fields, records, keep_ids)
+        if table == "users":
+            rows = hash_plaintext_passwords(rows, columns.index("password"))
+        # Empty CSV cells become NULL inside SQLite rather than per value in Python
+        placeholders = ", ".join(["NULLIF(?, '')" if fmt == "csv" else "?"] * len(columns))
+        # OR IGNORE skips rows that clash with the primary key or a UNIQUE column
+        sql = f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+        indexes = [] if keep_indexes else secondary_indexes(conn, table)
+        for name, _, _ in indexes:
+            conn.execute(f"DROP INDEX {name}")
+
+        inserted = 0
+        batch = []
+        pending = 0
+        for row in rows:
+            batch.append(row)
+            if len(batch) == BATCH_ROWS:
+                # rowcount: rows actually inserted, not the ignored ones
+                inserted += conn.executemany(sql, batch).rowcount
+                pending += len(batch)
+                batch.clear()
+                if keep_indexes and pending >= COMMIT_ROWS:
+                    conn.commit()
+                    conn.execute("BEGIN IMMEDIATE")
+                    pending = 0
+        if batch:
+            inserted += conn.executemany(sql, batch).rowcount
+
+        inserted -= rebuild_indexes(conn, table, indexes, first_new_rowid)
+        if table == "saved_events" and inserted:
+            forget_profiles(conn, first_new_rowid, keep_ids)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return inserted
+
+
+# ----------------------------
+# Export
+# ----------------------------
+def export_columns(table, include_secrets):
+    hidden = [] if include_secrets else SECRET_COLUMNS.get(table, [])
+    return [c for c in TABLES[table] if c not in hidden]
+
+
+def export_table(conn, table, path, include_secrets=False):
+    columns = export_columns(table, include_secrets)
+    fmt = file_format(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    # One read transaction: a consistent snapshot even while the app writes
+    conn.execute("BEGIN")
+    try:
+        cursor = conn.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY id")
+        # Written next to the target and renamed, so a failed export never
+        # replaces the previous snapshot
+        tmp = path + ".partial"
+        try:
+            if fmt == "parquet":
+                count = write_parquet(cursor, columns, tmp)
+            else:
+                with open_text(tmp, "w", compressed=path.endswith(".gz")) as f:
+                    count = (write_csv if fmt == "csv" else write_jsonl)(cursor, columns, f)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+    finally:
+        conn.rollback()
+    return count
+
+
+def chunks(cursor):
+    while True:
+        rows = cursor.fetchmany(BATCH_ROWS)
+        if not rows:
+            return
+        yield rows
+
+
+def write_csv(cursor, columns, f):
+    writer = csv.writer(f)
+    writer.writerow(columns)
+    count = 0
+    for rows in chunks(cursor):
+        writer.writerows(rows)
+        count += len(rows)
+    return count
+
+
+def write_jsonl(cursor, columns, f):
+    count = 0
+    for rows in chunks(cursor):
+        f.write("".join(json.dumps(dict(zip(columns, row))) + "\n" for row in rows))
+        count += len(rows)
+    return count
+
+
+def write_parquet(cursor, columns, path):
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Fixed schema, so an all-NULL chunk can't change a column's type
+    schema = pa.schema([(c, pa.int64() if c in INTEGER_COLUMNS else pa.string()) for c in columns])
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in chunks(cursor):
+            frame = pd.DataFrame.from_records(rows, columns=columns)
+            writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+            count += len(rows)
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import / export users and saved_events")
+    parser.add_argument("action", choices=["import", "export", "rehash"])
+    parser.add_argument("table", choices=sorted(TABLES))
+    parser.add_argument("path", nargs="?", help=".csv, .jsonl (optionally .gz) or .parquet")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--keep-indexes", action="store_true",
+                        help="import with indexes in place, committing every few hundred thousand rows")
+    parser.add_argument("--keep-ids", action="store_true",
+                        help="import the id column as is (restoring a snapshot into an empty database)")
+    parser.add_argument("--include-passwords", action="store_true",
+                        help="include the users.password column (password hashes) in exports")
+    args = parser.parse_args(argv)
+    if args.action == "rehash" and args.table != "users":
+        parser.error("rehash only applies to users")
+    if args.action != "rehash" and not args.path:
+        parser.error(f"{args.action} needs a path")
+
+    conn = sqlite3.connect(args.db, isolation_level=None)
+    conn.execute("PRAGMA busy_timeout=30000")
+    migrate(conn)
+    start = time.perf_counter()
+    if args.action == "rehash":
+        count = rehash_legacy_passwords(conn)
+        print(f"Hashed {count:,} legacy passwords in {time.perf_counter() - start:.1f} s")
+    elif args.action == "import":
+        count = import_table(conn, args.table, args.path, args.keep_indexes, args.keep_ids)
+        print(f"Imported {count:,} new {args.table} rows in {time.perf_counter() - start:.1f} s")
+    else:
+        count = export_table(conn, args.table, args.path, args.include_passwords)
+        print(f"Exported {count:,} {args.table} rows to {args.path} in {time.perf_counter() - start:.1f} s")
+    conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,12 @@
 import sqlite3
 
+from migrations import current_version, migrate
+
 conn = sqlite3.connect("event_finder.db")
-cursor = conn.cursor()
 
-# Add category column
-cursor.execute("ALTER TABLE saved_events ADD COLUMN category TEXT;")
+# Bring the schema up to date (adds the category column among others)
+before = current_version(conn)
+after = migrate(conn)
+print(f"Schema version: {before} -> {after}")
 
-conn.commit()
-conn.close()
\ No newline at end of file
+conn.close()
@@ -0,0 +1,208 @@
+# database.py
+# Small SQLite access layer: WAL mode, a pool of connections that threads
+# borrow one at a time, and a background writer that groups writes into
+# shared transactions.
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+import metrics
+
+log = logging.getLogger("database")
+
+DB_PATH = "event_finder.db"
+BUSY_TIMEOUT_MS = 5000
+POOL_SIZE = 16
+MAX_BATCH = 64          # writes committed together
+MAX_BATCH_DELAY = 0.005  # seconds a busy batch waits for more writes to join
+
+
+# ----------------------------
+# Connection pool
+# ----------------------------
+class Database:
+
+    def __init__(self, path=DB_PATH, pool_size=POOL_SIZE, busy_timeout_ms=BUSY_TIMEOUT_MS):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self._writer = None
+        self._writer_lock = threading.Lock()
+
+        # journal_mode is persistent, so setting it once per file is enough
+        conn = self._open()
+        conn.execute("PRAGMA journal_mode=WAL")
+        self._release(conn)
+
+    def _open(self):
+        # Autocommit mode: transactions are always explicit (see transaction())
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._open()
+
+    def _release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of the block."""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self, immediate=True):
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+    def fetchone(self, sql, params=()):
+        with self.connection() as conn:
+            start = time.perf_counter()
+            row = conn.execute(sql, params).fetchone()
+            metrics.record_query(sql, time.perf_counter() - start)
+            return row
+
+    def fetchall(self, sql, params=()):
+        with self.connection() as conn:
+            start = time.perf_counter()
+            rows = conn.execute(sql, params).fetchall()
+            metrics.record_query(sql, time.perf_counter() - start)
+            return rows
+
+    # ----------------------------
+    # Batched writes
+    # ----------------------------
+    def submit_write(self, sql, params=()):
+        """Queue a write; the Future resolves to its rowcount or raises its error."""
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = WriteBatcher(self)
+        return self._writer.submit(sql, params)
+
+    def write(self, sql, params=()):
+        # Includes time spent queued behind other writes
+        start = time.perf_counter()
+        try:
+            return self.submit_write(sql, params).result()
+        finally:
+            metrics.observe("db_write", time.perf_counter() - start)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class WriteBatcher:
+    """
+    Single writer thread. Writes that arrive close together share one
+    transaction (and one fsync); each runs under its own SAVEPOINT so a
+    constraint error only fails that write.
+    """
+
+    def __init__(self, db, max_batch=MAX_BATCH, max_delay=MAX_BATCH_DELAY):
+        self.db = db
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, sql, params):
+        future = Future()
+        self._queue.put((sql, params, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = None
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            # A write on its own commits right away; only when others were
+            # already queued is it worth lingering for the rest of the burst
+            if len(batch) == 1:
+                break
+            if deadline is None:
+                deadline = time.monotonic() + self.max_delay
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        # Nothing may end this loop: every later write would wait forever
+        while True:
+            batch = self._collect()
+            try:
+                self._run_batch(batch)
+            except Exception as exc:
+                log.exception("write batch failed")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+
+    def _run_batch(self, batch):
+        results = []
+        try:
+            with self.db.transaction() as conn:
+                for sql, params, future in batch:
+                    conn.execute("SAVEPOINT batched_write")
+                    try:
+                        start = time.perf_counter()
+                        rowcount = conn.execute(sql, params).rowcount
+                        metrics.record_query(sql, time.perf_counter() - start, stage="db_batched_write")
+                    except Exception as exc:
+                        # Bad SQL or bad parameters (e.g. an int over 64 bits) fail this write only
+                        conn.execute("ROLLBACK TO batched_write")
+                        results.append((future, None, exc))
+                    else:
+                        results.append((future, rowcount, None))
+                    conn.execute("RELEASE batched_write")
+        except Exception as exc:
+            # The whole transaction failed (e.g. the database stayed locked)
+            results = [(future, None, exc) for _, _, future in batch]
+
+        for future, rowcount, error in results:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(rowcount)
@@ -0,0 +1,113 @@
+# event_fetcher.py
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urljoin, urlsplit, urlunsplit
+
+import metrics
+
+from event_record import Event
+from provider_client import ProviderError
+
+PAGE_SIZE = 50
+MAX_PAGES = 5
+MAX_WORKERS = 4
+# The Discovery API rejects requests where size * page reaches 1000
+DEEP_PAGING_LIMIT = 1000
+# RFC 6570 expressions in templated links, e.g. "{&sort}"
+URI_TEMPLATE = re.compile(r"\{[^}]*\}")
+
+
+def page_events(data):
+    return data.get("_embedded", {}).get("events", [])
+
+
+def next_link(url, base, data):
+    """
+    (url, params) for the page _links.next points at, or None. The href
+    is resolved against url; the API leaves the key out of its links, so
+    it is added back from base (never for a link to another host).
+    """
+    href = data.get("_links", {}).get("next", {}).get("href")
+    if not href:
+        return None
+    parts = urlsplit(urljoin(url, URI_TEMPLATE.sub("", href)))
+    if parts.netloc != urlsplit(url).netloc:
+        return None
+    params = dict(parse_qsl(parts.query))
+    if "apikey" in base:
+        params.setdefault("apikey", base["apikey"])
+    return urlunsplit(parts._replace(query="")), params
+
+
+# ----------------------------
+# Paginated event fetch
+# ----------------------------
+def iter_events(client, url, params, max_pages=MAX_PAGES, page_size=PAGE_SIZE, workers=MAX_WORKERS):
+    """
+    Yield events page by page. The first page is yielded as soon as it
+    arrives; the remaining pages (up to max_pages) are fetched concurrently
+    and yielded in page order so relevance ordering is kept.
+
+    If a later page fails, the pages that did arrive are still yielded and
+    ProviderError is raised at the end, so callers never mistake a
+    truncated result set for a complete one (and cache it).
+    """
+    base = dict(params, size=page_size)
+    max_pages = max(1, min(max_pages, DEEP_PAGING_LIMIT // page_size))
+
+    first = client.get_json(url, params=dict(base, page=0))
+    yield from page_events(first)
+
+    page_info = first.get("page")
+    if page_info is None:
+        # No page metadata: walk _links.next one page at a time
+        yield from _follow_next(client, url, base, first, max_pages)
+        return
+
+    last_page = min(page_info.get("totalPages", 1), max_pages)
+    if last_page <= 1:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=min(workers, last_page - 1))
+    try:
+        futures = [
+            executor.submit(client.get_json, url, dict(base, page=page))
+            for page in range(1, last_page)
+        ]
+        failed = []
+        for future in futures:
+            try:
+                data = future.result()
+            except ProviderError as exc:
+                failed.append(exc)
+                continue
+            yield from page_events(data)
+        if failed:
+            raise ProviderError(f"{len(failed)} of {last_page} result pages failed: {failed[0]}")
+    finally:
+        # Also runs when the consumer stops early (e.g. a Streamlit rerun)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _follow_next(client, url, base, data, max_pages):
+    page = 0
+    while page + 1 < max_pages:
+        link = next_link(url, base, data)
+        if link is None:
+            return
+        page += 1
+        try:
+            data = client.get_json(*link)
+        except ProviderError as exc:
+            raise ProviderError(f"result page {page} failed: {exc}") from exc
+        yield from page_events(data)
+
+
+def iter_records(client, url, params, max_pages=MAX_PAGES, page_size=PAGE_SIZE, workers=MAX_WORKERS):
+    # Same as iter_events, parsed into compact Event records
+    for raw in iter_events(client, url, params, max_pages, page_size, workers):
+        start = time.perf_counter()
+        event = Event.from_api(raw)
+        metrics.observe("parse_event", time.perf_counter() - start)
+        yield event
@@ -0,0 +1,192 @@
+# event_index.py
+import json
+import logging
+import queue
+import threading
+import time
+
+import metrics
+from event_record import Event
+
+log = logging.getLogger("event_index")
+
+# One statement each, run in one transaction (migration 11 keeps its own copy).
+# events_fts is an external-content table keyed on events.id: an explicit
+# INTEGER PRIMARY KEY, which (unlike an implicit rowid) VACUUM never renumbers.
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS events (
+        id INTEGER PRIMARY KEY,
+        event_id TEXT NOT NULL UNIQUE,
+        name TEXT NOT NULL,
+        local_date TEXT,
+        venue TEXT,
+        city TEXT,
+        segment TEXT,
+        url TEXT,
+        latitude REAL,
+        longitude REAL,
+        payload TEXT NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_events_city_date ON events(city, local_date)",
+    "CREATE INDEX IF NOT EXISTS idx_events_segment ON events(segment)",
+    "CREATE INDEX IF NOT EXISTS idx_events_local_date ON events(local_date)",
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+        name, venue, content='events', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS events_ai AFTER INSERT ON events BEGIN
+        INSERT INTO events_fts(rowid, name, venue) VALUES (new.id, new.name, new.venue);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS events_ad AFTER DELETE ON events BEGIN
+        INSERT INTO events_fts(events_fts, rowid, name, venue) VALUES ('delete', old.id, old.name, old.venue);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS events_au AFTER UPDATE ON events BEGIN
+        INSERT INTO events_fts(events_fts, rowid, name, venue) VALUES ('delete', old.id, old.name, old.venue);
+        INSERT INTO events_fts(rowid, name, venue) VALUES (new.id, new.name, new.venue);
+    END
+    """,
+)
+
+UPSERT = """
+INSERT INTO events (event_id, name, local_date, venue, city, segment, url,
+                    latitude, longitude, payload, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(event_id) DO UPDATE SET
+    name=excluded.name, local_date=excluded.local_date, venue=excluded.venue,
+    city=excluded.city, segment=excluded.segment, url=excluded.url,
+    latitude=excluded.latitude, longitude=excluded.longitude,
+    payload=excluded.payload, updated_at=excluded.updated_at
+"""
+
+
+# ----------------------------
+# Normalization
+# ----------------------------
+def event_row(event, now=None):
+    return (
+        event.id,
+        event.name,
+        event.local_date,
+        event.venue,
+        (event.city or "").casefold() or None,
+        event.segment,
+        event.url,
+        event.lat,
+        event.lon,
+        json.dumps(event.to_dict()),
+        now or time.time(),
+    )
+
+
+def fts_query(keyword):
+    # Quote each term so user input can't inject FTS syntax; prefix-match the last
+    terms = [t.replace('"', '""') for t in keyword.split()]
+    if not terms:
+        return None
+    quoted = [f'"{t}"' for t in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def as_day(value):
+    if value is None:
+        return None
+    return value if isinstance(value, str) else value.strftime("%Y-%m-%d")
+
+
+def create_schema(conn):
+    for statement in SCHEMA:
+        conn.execute(statement)
+
+
+# ----------------------------
+# Local event index
+# ----------------------------
+class EventIndex:
+
+    def __init__(self, db):
+        self.db = db
+        with db.transaction() as conn:
+            create_schema(conn)
+
+    def upsert(self, events):
+        now = time.time()
+        rows = [event_row(e, now) for e in events if e.name]
+        if not rows:
+            return 0
+        with self.db.transaction() as conn:
+            conn.executemany(UPSERT, rows)
+        return len(rows)
+
+    def search(self, city=None, keyword=None, segments=None, start_date=None, end_date=None, limit=200):
+        clauses = []
+        args = []
+
+        match = fts_query(keyword) if keyword else None
+        if match:
+            clauses.append("e.id IN (SELECT rowid FROM events_fts WHERE events_fts MATCH ?)")
+            args.append(match)
+        if city:
+            clauses.append("e.city = ?")
+            args.append(city.strip().casefold())
+        if segments:
+            clauses.append(f"e.segment IN ({','.join('?' * len(segments))})")
+            args.extend(segments)
+        if start_date:
+            clauses.append("e.local_date >= ?")
+            args.append(as_day(start_date))
+        if end_date:
+            clauses.append("e.local_date <= ?")
+            args.append(as_day(end_date))
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.db.fetchall(
+            f"SELECT e.payload FROM events e {where} ORDER BY e.local_date LIMIT ?",
+            (*args, limit)
+        )
+        return [Event(**json.loads(row[0])) for row in rows]
+
+    def count(self):
+        return self.db.fetchone("SELECT COUNT(*) FROM events")[0]
+
+
+# ----------------------------
+# Background ingest
+# ----------------------------
+class IndexIngestor:
+    """Upserts fetched events into the index off the request thread."""
+
+    def __init__(self, index):
+        self.index = index
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, events):
+        if events:
+            self._queue.put(list(events))
+
+    def join(self):
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            events = self._queue.get()
+            try:
+                self.index.upsert(events)
+            except Exception:
+                # Best effort (the next search will try again), but never
+                # silent: a broken trigger or a full disk stops the index
+                log.exception("indexing %d events failed", len(events))
+                metrics.count("index_ingest_errors")
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,86 @@
+# event_record.py
+# Compact event record. Discovery API events are parsed once into this
+# shape and shared by rendering, analytics and recommendations, instead of
+# keeping (and re-walking) the full nested JSON in session state.
+import json
+from dataclasses import asdict, dataclass
+
+# Card image size; the smallest variant covering it wins (image_cache.py
+# turns that variant into the fixed-size thumbnail)
+IMAGE_MIN_WIDTH = 300
+IMAGE_MIN_HEIGHT = 200
+
+
+@dataclass(frozen=True, slots=True)
+class Event:
+    id: str
+    name: str
+    local_date: str | None = None
+    venue: str | None = None
+    venue_id: str | None = None
+    city: str | None = None
+    lat: float | None = None
+    lon: float | None = None
+    segment: str | None = None
+    image_url: str | None = None
+    url: str | None = None
+
+    @classmethod
+    def from_api(cls, raw):
+        venue_info = (raw.get("_embedded", {}).get("venues") or [{}])[0]
+        location = venue_info.get("location") or {}
+        classifications = raw.get("classifications") or [{}]
+        return cls(
+            id=raw.get("id") or raw.get("url") or raw.get("name", ""),
+            name=raw.get("name", "No Name"),
+            local_date=raw.get("dates", {}).get("start", {}).get("localDate"),
+            venue=venue_info.get("name"),
+            venue_id=venue_info.get("id"),
+            city=(venue_info.get("city") or {}).get("name"),
+            lat=to_float(location.get("latitude")),
+            lon=to_float(location.get("longitude")),
+            segment=(classifications[0].get("segment") or {}).get("name"),
+            image_url=choose_image(raw.get("images")),
+            url=raw.get("url"),
+        )
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def choose_image(images, min_width=IMAGE_MIN_WIDTH, min_height=IMAGE_MIN_HEIGHT):
+    if not images:
+        return None
+    sized = [img for img in images if img.get("url") and img.get("width")]
+    if not sized:
+        return images[0].get("url")
+    # Variants without a height only have to be wide enough
+    big_enough = [
+        img for img in sized
+        if img["width"] >= min_width and (img.get("height") or min_height) >= min_height
+    ]
+    if big_enough:
+        return min(big_enough, key=lambda img: img["width"])["url"]
+    return max(sized, key=lambda img: img["width"])["url"]
+
+
+# ----------------------------
+# Bulk helpers
+# ----------------------------
+def parse_events(raw_events):
+    return [Event.from_api(raw) for raw in raw_events]
+
+
+def events_to_json(events):
+    return json.dumps([event.to_dict() for event in events])
+
+
+def events_from_json(payload):
+    return tuple(Event(**fields) for fields in json.loads(payload))
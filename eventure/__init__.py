@@ -0,0 +1,24 @@
+# eventure/__init__.py
+# Service layer behind the Streamlit view (app.py): repositories for the
+# users / saved_events tables, search, recommendations and analytics.
+#
+#   from eventure import Services
+#   services = Services()
+#   events, source = services.search.search("Boston", category="Music")
+from eventure.analytics_service import AnalyticsService
+from eventure.config import Settings
+from eventure.recommendation_service import RecommendationService
+from eventure.repository import SavedEventRepository, UserRepository
+from eventure.search_service import SearchService, build_params
+from eventure.services import Services
+
+__all__ = [
+    "AnalyticsService",
+    "RecommendationService",
+    "SavedEventRepository",
+    "SearchService",
+    "Services",
+    "Settings",
+    "UserRepository",
+    "build_params",
+]
@@ -0,0 +1,25 @@
+# eventure/analytics_service.py
+# Result-set statistics, chart data and map points for the analytics
+# section. Aggregates and venue stores are memoized per result set.
+import analytics
+import geo
+
+
+class AnalyticsService:
+
+    def summary(self, events):
+        return analytics.aggregates(events)
+
+    def category_frame(self, stats):
+        return analytics.counts_frame(stats["categories"], "Category")
+
+    def category_figure(self, stats):
+        """Matplotlib chart; pass it to close_figure() once rendered."""
+        return analytics.category_figure(stats["categories"])
+
+    def close_figure(self, fig):
+        analytics.close_figure(fig)
+
+    def map_points(self, events):
+        # Venues deduplicated and clustered, so the payload is bounded
+        return geo.venue_store(events).map_points()
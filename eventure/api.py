@@ -0,0 +1,326 @@
+# eventure/api.py
+# Headless JSON API for mobile and partner clients: a plain ASGI app over
+# the same services (and the same SQLite database) as the Streamlit UI.
+#
+#   uvicorn eventure.api:app --port 8000      (see api.sh)
+#
+#   GET  /search?city=Boston[&keyword=&category=&start_date=&end_date=&offline=1]
+#   POST /sessions                            (HTTP Basic auth) -> {"token", "expires_in"}
+#   DELETE /sessions                          (Bearer token)
+#   GET  /saved                               (Bearer token or HTTP Basic auth)
+#   POST /saved   {"name", "date", "venue", "url", "category", "event_id", "city"}
+#   GET  /recommendations?city=Boston[&keyword=]
+#   GET  /health
+#
+# Basic auth hashes the password (scrypt) on every request; clients that
+# call more than once should trade it for a session token, which is
+# checked against an in-process cache.
+#
+# /search reports where results came from (cache, upstream, partial when a
+# provider failed or missed its deadline, or offline) in an X-Result-Source
+# header. Responses carry a weak ETag (If-None-Match -> 304) and are
+# gzipped when the client accepts it. Blocking work runs on worker
+# threads, so one worker process serves many concurrent requests.
+import asyncio
+import base64
+import binascii
+import gzip
+import hashlib
+import json
+from datetime import date
+from urllib.parse import parse_qs
+
+from analytics import result_set_key
+from lru import LRUCache
+from reminders import utc_today
+
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 5
+MAX_BODY_BYTES = 64 * 1024
+MAX_ENCODED_RESULTS = 64
+RECOMMENDATION_COLUMNS = ["id", "name", "date", "url", "segment", "venue", "score"]
+# POST /saved fields and their maximum lengths; all are strings or null
+SAVE_FIELDS = {
+    "name": 300,
+    "date": 40,
+    "venue": 300,
+    "url": 2048,
+    "category": 100,
+    "event_id": 200,
+    "city": 100,
+}
+
+
+class HTTPError(Exception):
+
+    def __init__(self, status, message, headers=()):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = list(headers)
+
+
+# ----------------------------
+# Request / response helpers
+# ----------------------------
+class Request:
+
+    def __init__(self, scope, receive):
+        self.method = scope["method"]
+        self.path = scope["path"].rstrip("/") or "/"
+        self.query = {k: v[0] for k, v in parse_qs(scope.get("query_string", b"").decode()).items()}
+        self.headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        self._receive = receive
+
+    async def json(self):
+        chunks = []
+        size = 0
+        more = True
+        while more:
+            message = await self._receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                raise HTTPError(413, "Request body too large")
+            chunks.append(chunk)
+            more = message.get("more_body", False)
+        try:
+            return json.loads(b"".join(chunks) or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Body must be JSON")
+
+    def param_date(self, name):
+        value = self.query.get(name)
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise HTTPError(400, f"{name} must be YYYY-MM-DD")
+
+
+def etag_for(body):
+    return 'W/"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+
+def etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison: W/"x" and "x" name the same representation
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag.removeprefix("W/") in tags
+
+
+def accepts_gzip(header):
+    for part in (header or "").split(","):
+        coding, _, q = part.strip().partition(";")
+        if coding.strip() in ("gzip", "*"):
+            return q.strip() not in ("q=0", "q=0.0")
+    return False
+
+
+def encode(payload):
+    return json.dumps(payload, separators=(",", ":"), default=str).encode()
+
+
+async def send_json(request, send, status, payload, cache_control="no-cache", headers=()):
+    # payload may already be encoded (see API._encoded_results)
+    body = payload if isinstance(payload, bytes) else encode(payload)
+    etag = etag_for(body)
+    response_headers = [
+        (b"content-type", b"application/json"),
+        (b"cache-control", cache_control.encode()),
+        (b"etag", etag.encode()),
+        (b"vary", b"Accept-Encoding, Authorization"),
+    ] + [(k.encode(), v.encode()) for k, v in headers]
+
+    if request.method == "GET" and status == 200 and etag_matches(request.headers.get("if-none-match"), etag):
+        await send({"type": "http.response.start", "status": 304, "headers": response_headers})
+        await send({"type": "http.response.body", "body": b""})
+        return
+
+    if len(body) >= GZIP_MIN_BYTES and accepts_gzip(request.headers.get("accept-encoding")):
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        response_headers.append((b"content-encoding", b"gzip"))
+    response_headers.append((b"content-length", str(len(body)).encode()))
+    await send({"type": "http.response.start", "status": status, "headers": response_headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+# ----------------------------
+# Application
+# ----------------------------
+class API:
+
+    def __init__(self, services=None):
+        # Built on lifespan startup (or first request) unless given
+        self.services = services
+        # Encoded search bodies per result set: cache hits skip re-serializing
+        self._encoded = LRUCache(MAX_ENCODED_RESULTS)
+        self.routes = {
+            ("GET", "/health"): self.health,
+            ("GET", "/search"): self.search,
+            ("POST", "/sessions"): self.create_session,
+            ("DELETE", "/sessions"): self.delete_session,
+            ("GET", "/saved"): self.list_saved,
+            ("POST", "/saved"): self.save,
+            ("GET", "/recommendations"): self.recommendations,
+        }
+
+    def _services(self):
+        if self.services is None:
+            from dotenv import load_dotenv
+
+            from eventure.services import Services
+
+            load_dotenv()
+            self.services = Services()
+        return self.services
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        request = Request(scope, receive)
+        handler = self.routes.get((request.method, request.path))
+        try:
+            if handler is None:
+                if any(path == request.path for _, path in self.routes):
+                    raise HTTPError(405, "Method not allowed")
+                raise HTTPError(404, "Not found")
+            status, payload, cache_control, headers = await handler(request)
+        except HTTPError as exc:
+            await send_json(request, send, exc.status, {"error": exc.message}, "no-store", exc.headers)
+            return
+        await send_json(request, send, status, payload, cache_control, headers)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await asyncio.to_thread(self._services)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self.services is not None:
+                    self.services.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _user(self, request, allow_token=True):
+        scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+        scheme = scheme.lower()
+        if scheme == "bearer" and allow_token and credentials:
+            user = await asyncio.to_thread(self._services().sessions.validate, credentials.strip())
+            if user is None:
+                raise HTTPError(401, "Invalid or expired token", [("www-authenticate", 'Bearer realm="eventure"')])
+            return user
+        if scheme != "basic" or not credentials:
+            raise HTTPError(401, "Authentication required", [("www-authenticate", 'Basic realm="eventure"')])
+        try:
+            username, _, password = base64.b64decode(credentials).decode().partition(":")
+        except (binascii.Error, UnicodeDecodeError):
+            raise HTTPError(401, "Malformed credentials")
+        user = await asyncio.to_thread(self._services().users.authenticate, username, password)
+        if user is None:
+            raise HTTPError(401, "Invalid credentials", [("www-authenticate", 'Basic realm="eventure"')])
+        return user
+
+    async def _search(self, request):
+        city = request.query.get("city", "").strip()
+        if not city:
+            raise HTTPError(400, "city is required")
+        return await asyncio.to_thread(
+            self._services().search.search,
+            city,
+            request.query.get("keyword") or None,
+            request.query.get("category") or None,
+            request.param_date("start_date"),
+            request.param_date("end_date"),
+            request.query.get("offline") == "1"
+        )
+
+    def _encoded_results(self, events):
+        return self._encoded.get_or_compute(
+            result_set_key(events),
+            lambda: encode({"count": len(events), "events": [e.to_dict() for e in events]})
+        )
+
+    # ----------------------------
+    # Endpoints
+    # ----------------------------
+    async def health(self, request):
+        return 200, {"status": "ok"}, "no-store", ()
+
+    async def search(self, request):
+        events, source = await self._search(request)
+        body = await asyncio.to_thread(self._encoded_results, events)
+        # The source stays out of the body so the ETag only tracks the events
+        return 200, body, "public, max-age=60", [("x-result-source", source)]
+
+    async def create_session(self, request):
+        user = await self._user(request, allow_token=False)
+        sessions = self._services().sessions
+        token = await asyncio.to_thread(sessions.create, user)
+        return 201, {"token": token, "expires_in": int(sessions.ttl)}, "no-store", ()
+
+    async def delete_session(self, request):
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            raise HTTPError(401, "Bearer token required", [("www-authenticate", 'Bearer realm="eventure"')])
+        await asyncio.to_thread(self._services().sessions.revoke, token.strip())
+        return 200, {"revoked": True}, "no-store", ()
+
+    async def list_saved(self, request):
+        user = await self._user(request)
+        rows = await asyncio.to_thread(self._services().saved_events.list, user[0])
+        reminders = await asyncio.to_thread(self._services().saved_events.upcoming, user[0], utc_today())
+        saved = [
+            {"name": name, "date": day, "venue": venue, "url": url,
+             "share": {"whatsapp": whatsapp, "twitter": tweet}}
+            for name, day, venue, url, whatsapp, tweet in rows
+        ]
+        upcoming = [{"name": name, "date": day} for name, day in reminders]
+        return 200, {"count": len(saved), "saved": saved, "upcoming": upcoming}, "private, no-cache", ()
+
+    async def save(self, request):
+        user = await self._user(request)
+        body = await request.json()
+        if not isinstance(body, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+        for field, max_length in SAVE_FIELDS.items():
+            value = body.get(field)
+            if value is not None and not isinstance(value, str):
+                raise HTTPError(400, f"{field} must be a string")
+            if value is not None and len(value) > max_length:
+                raise HTTPError(400, f"{field} must be at most {max_length} characters")
+        if not body.get("name"):
+            raise HTTPError(400, "name is required")
+        saved = await asyncio.to_thread(
+            self._services().save_event,
+            user[0],
+            body["name"],
+            body.get("date") or "N/A",
+            body.get("venue") or "Venue Not Available",
+            body.get("url") or "#",
+            body.get("category"),
+            body.get("event_id"),
+            body.get("city")
+        )
+        return (201 if saved else 200), {"saved": saved}, "no-store", ()
+
+    async def recommendations(self, request):
+        user = await self._user(request)
+        events, _ = await self._search(request)
+        picks = await asyncio.to_thread(
+            self._services().recommendations.recommend, user[0], events, request.query.get("keyword")
+        )
+        records = picks[RECOMMENDATION_COLUMNS].to_dict("records") if len(picks) else []
+        return 200, {"count": len(records), "recommendations": records}, "private, no-cache", ()
+
+
+app = API()
@@ -0,0 +1,65 @@
+# eventure/config.py
+import os
+
+from auth import HASH_WORKERS, SCRYPT_N
+from prefetch import INTERVAL_SECONDS
+from providers import PROVIDER_NAMES, REMOTE_DEADLINE
+from rate_limit import api_keys_from_env
+
+DEFAULT_TICKETMASTER_URL = "https://app.ticketmaster.com/discovery/v2/events.json"
+# Streamlit serves <app dir>/static when server.enableStaticServing is on;
+# THUMBNAIL_DIR must be inside it (checked by image_cache.ThumbnailCache)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(ROOT, "static")
+DEFAULT_THUMBNAIL_DIR = os.path.join(STATIC_DIR, "thumbs")
+DEFAULT_EVENTS_JSONL = os.path.join(ROOT, "events.jsonl")
+
+
+class Settings:
+    """Process-wide settings, read once from the environment."""
+
+    def __init__(self, db_path="event_finder.db", ticketmaster_url=DEFAULT_TICKETMASTER_URL,
+                 max_result_pages=5, user_quota_wait=3.0, api_keys=(),
+                 thumbnail_dir=DEFAULT_THUMBNAIL_DIR, thumbnail_cache_mb=200,
+                 password_hash_n=SCRYPT_N, password_hash_workers=HASH_WORKERS, session_days=30,
+                 providers=PROVIDER_NAMES, provider_deadline=REMOTE_DEADLINE,
+                 events_jsonl=DEFAULT_EVENTS_JSONL, prefetch_interval=INTERVAL_SECONDS):
+        self.db_path = db_path
+        self.ticketmaster_url = ticketmaster_url
+        self.max_result_pages = max_result_pages
+        # How long a user search may queue for an API token before falling
+        # back to the offline index
+        self.user_quota_wait = user_quota_wait
+        self.api_keys = list(api_keys)
+        self.thumbnail_dir = thumbnail_dir
+        self.thumbnail_cache_mb = thumbnail_cache_mb
+        # scrypt cost (a power of two); existing hashes are upgraded on login
+        self.password_hash_n = password_hash_n
+        self.password_hash_workers = password_hash_workers
+        self.session_days = session_days
+        # Event sources searched in parallel (see providers.py); the
+        # deadline applies to remote ones
+        self.providers = list(providers)
+        self.provider_deadline = provider_deadline
+        self.events_jsonl = events_jsonl
+        # Seconds between prefetch worker passes (prefetch.py)
+        self.prefetch_interval = prefetch_interval
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            db_path=os.getenv("EVENTURE_DB", "event_finder.db"),
+            ticketmaster_url=os.getenv("TICKETMASTER_URL", DEFAULT_TICKETMASTER_URL),
+            max_result_pages=int(os.getenv("MAX_RESULT_PAGES", "5")),
+            user_quota_wait=float(os.getenv("USER_QUOTA_WAIT", "3")),
+            api_keys=api_keys_from_env(),
+            thumbnail_dir=os.getenv("THUMBNAIL_DIR", DEFAULT_THUMBNAIL_DIR),
+            thumbnail_cache_mb=int(os.getenv("THUMBNAIL_CACHE_MB", "200")),
+            password_hash_n=int(os.getenv("PASSWORD_HASH_N", str(SCRYPT_N))),
+            password_hash_workers=int(os.getenv("PASSWORD_HASH_WORKERS", str(HASH_WORKERS))),
+            session_days=float(os.getenv("SESSION_DAYS", "30")),
+            providers=[p.strip() for p in os.getenv("PROVIDERS", ",".join(PROVIDER_NAMES)).split(",") if p.strip()],
+            provider_deadline=float(os.getenv("PROVIDER_DEADLINE", str(REMOTE_DEADLINE))),
+            events_jsonl=os.getenv("EVENTS_JSONL", DEFAULT_EVENTS_JSONL),
+            prefetch_interval=int(os.getenv("PREFETCH_INTERVAL", str(INTERVAL_SECONDS))),
+        )
@@ -0,0 +1,47 @@
+# eventure/recommendation_service.py
+# Personalized picks from the current result set. recommender (numpy and
+# pandas) is imported on first use, so sessions that never see a
+# recommendation don't pay for it.
+import metrics
+from analytics import result_set_key
+from lru import LRUCache
+
+MAX_CACHED_FRAMES = 32
+
+
+class RecommendationService:
+
+    def __init__(self, profile_store, max_frames=MAX_CACHED_FRAMES):
+        self.profiles = profile_store
+        self._frames = LRUCache(max_frames)
+
+    def profile(self, user_id):
+        return self.profiles.get(user_id)
+
+    def frame(self, events):
+        """Columnar frame for a result set; built once per distinct result set."""
+        from recommender import events_frame
+
+        def build():
+            with metrics.timed("build_frame"):
+                return events_frame(events)
+
+        return self._frames.get_or_compute(result_set_key(events), build)
+
+    def recommend(self, user_id, events, keyword=None, k=None, today=None):
+        """Top picks as a DataFrame (id, name, date, url, ..., score)."""
+        from recommender import TOP_K, recommend
+
+        profile = self.profile(user_id)
+        frame = self.frame(events)
+        with metrics.timed("recommend"):
+            return recommend(
+                frame,
+                profile.category_weights(),
+                profile.saved_names,
+                keyword=keyword,
+                k=k or TOP_K,
+                today=today,
+                saved_ids=profile.saved_ids,
+                venue_weights=profile.venue_weights()
+            )
@@ -0,0 +1,88 @@
+# eventure/repository.py
+# SQL for the users and saved_events tables. Reads go through the
+# connection pool, writes through the batched writer (see database.py).
+import sqlite3
+
+import metrics
+from auth import USER_COLUMNS
+from reminders import share_links, upcoming
+
+LIST_SAVED = """
+    SELECT event_name, event_date, event_venue, event_url, share_whatsapp, share_twitter
+    FROM saved_events
+    WHERE user_id=?
+    ORDER BY saved_at DESC
+"""
+INSERT_SAVED = """
+    INSERT INTO saved_events
+        (user_id, event_name, event_date, event_venue, event_url, category, provider_event_id,
+         share_whatsapp, share_twitter)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, event_name, event_date) DO NOTHING
+"""
+
+
+class UserRepository:
+
+    def __init__(self, db, passwords):
+        self.db = db
+        # auth.PasswordHasher: scrypt on a bounded thread pool
+        self.passwords = passwords
+
+    def create(self, username, email, password):
+        """False when the username or email is already taken."""
+        try:
+            self.db.write(
+                "INSERT INTO users (username, email, password) VALUES (?, ?, ?)",
+                (username, email, self.passwords.hash(password))
+            )
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    @metrics.timed("authenticate")
+    def authenticate(self, username, password):
+        """The user row (see auth.USER_COLUMNS) or None."""
+        row = self.db.fetchone(
+            f"SELECT {USER_COLUMNS}, password FROM users WHERE username=?", (username,)
+        )
+        stored = row[-1] if row else None
+        if not self.passwords.verify(password, stored):
+            return None
+        if self.passwords.needs_rehash(stored):
+            # Plaintext or older cost settings: store a current hash
+            self.db.submit_write(
+                "UPDATE users SET password=?, password_legacy=0 WHERE id=? AND password=?",
+                (self.passwords.hash(password), row[0], stored)
+            )
+        return row[:-1]
+
+    def get(self, user_id):
+        return self.db.fetchone(f"SELECT {USER_COLUMNS} FROM users WHERE id=?", (user_id,))
+
+
+class SavedEventRepository:
+
+    def __init__(self, db):
+        self.db = db
+
+    @metrics.timed("load_saved_events")
+    def list(self, user_id):
+        rows = self.db.fetchall(LIST_SAVED, (user_id,))
+        # Rows written without share links (bulk.py) until reminders.py fills them in
+        return [row if row[4] is not None else row[:4] + share_links(row[0], row[1], row[3]) for row in rows]
+
+    @metrics.timed("save_event")
+    def save(self, user_id, name, date, venue, event_url, category=None, provider_event_id=None):
+        """True if the event was saved, False if this user already had it."""
+        # Share links are built once here rather than on every render
+        inserted = self.db.write(
+            INSERT_SAVED,
+            (user_id, name, date, venue, event_url, category, provider_event_id,
+             *share_links(name, date, event_url))
+        )
+        return inserted > 0
+
+    def upcoming(self, user_id, today):
+        """(event_name, event_day) saved for today (reminders.utc_today()) or tomorrow; an index range scan."""
+        return upcoming(self.db, user_id, today)
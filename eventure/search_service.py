@@ -0,0 +1,98 @@
+# eventure/search_service.py
+# Event search: result cache, single-flight federated fetch (see
+# providers.py), offline index fallback. Shared by the Streamlit view and
+# headless callers.
+from prefetch import log_search
+from provider_client import ProviderError
+from search_cache import normalize_params
+
+DEFAULT_SEGMENTS = ["Music", "Sports", "Arts & Theatre"]
+
+SOURCE_CACHE = "cache"
+SOURCE_UPSTREAM = "upstream"
+SOURCE_PARTIAL = "partial"      # some providers failed or missed their deadline
+SOURCE_OFFLINE = "offline"
+
+
+def build_params(city, keyword=None, category=None, start_date=None, end_date=None):
+    """Discovery API query for a search form (without the API key)."""
+    params = {"city": city, "sort": "relevance,asc"}
+    if keyword:
+        params["keyword"] = keyword
+    if category:
+        params["classificationName"] = category
+    else:
+        params["segmentName"] = ",".join(DEFAULT_SEGMENTS)
+    if start_date and end_date:
+        params["startDateTime"] = f"{start_date.strftime('%Y-%m-%d')}T00:00:00Z"
+        params["endDateTime"] = f"{end_date.strftime('%Y-%m-%d')}T23:59:59Z"
+    return params
+
+
+class SearchService:
+
+    def __init__(self, db, search_cache, providers, index, ingestor, single_flight):
+        self.db = db
+        self.search_cache = search_cache
+        # providers.FederatedSearch
+        self.providers = providers
+        self.index = index
+        self.ingestor = ingestor
+        self.single_flight = single_flight
+
+    def cache_key(self, params):
+        return normalize_params(params)
+
+    def log(self, cache_key, params):
+        # Feeds the prefetch worker's popularity ranking
+        log_search(self.db, cache_key, params)
+
+    def cached(self, cache_key):
+        return self.search_cache.get(cache_key)
+
+    def local(self, city, keyword=None, category=None, start_date=None, end_date=None):
+        return self.index.search(
+            city=city,
+            keyword=keyword,
+            segments=[category] if category else DEFAULT_SEGMENTS,
+            start_date=start_date,
+            end_date=end_date
+        )
+
+    def stream(self, params, cache_key):
+        """
+        Shared fetch from every provider for this search; iterate it to
+        receive events as they arrive (raises ProviderError at the end if a
+        provider failed or missed its deadline, and the result isn't cached).
+        """
+        return self.single_flight.fetch(
+            cache_key,
+            # Runs on a single-flight worker thread
+            lambda: self.providers.search(params),
+            on_complete=lambda events: self._store(cache_key, events)
+        )
+
+    def search(self, city, keyword=None, category=None, start_date=None, end_date=None,
+               offline_only=False):
+        """Blocking search; returns (events, source)."""
+        if offline_only:
+            return tuple(self.local(city, keyword, category, start_date, end_date)), SOURCE_OFFLINE
+        params = build_params(city, keyword, category, start_date, end_date)
+        cache_key = self.cache_key(params)
+        self.log(cache_key, params)
+        events = self.cached(cache_key)
+        if events is not None:
+            return events, SOURCE_CACHE
+        shared = self.stream(params, cache_key)
+        events = []
+        try:
+            events.extend(shared)
+        except ProviderError:
+            if events:
+                return tuple(events), SOURCE_PARTIAL
+            return tuple(self.local(city, keyword, category, start_date, end_date)), SOURCE_OFFLINE
+        return shared.result(), SOURCE_UPSTREAM
+
+    def _store(self, cache_key, events):
+        self.search_cache.set(cache_key, events)
+        self.ingestor.submit(events)
@@ -0,0 +1,89 @@
+# eventure/services.py
+# Wires the shared resources together once per process. The Streamlit app
+# holds one Services through st.cache_resource; headless callers build
+# their own.
+from assistant import Assistant
+from auth import PasswordHasher, SessionStore
+from database import Database
+from event_index import EventIndex, IndexIngestor
+from event_record import events_from_json, events_to_json
+from eventure.analytics_service import AnalyticsService
+from eventure.config import STATIC_DIR, Settings
+from eventure.recommendation_service import RecommendationService
+from eventure.repository import SavedEventRepository, UserRepository
+from eventure.search_service import SearchService
+from image_cache import ThumbnailCache
+from migrations import migrate
+from profiles import ProfileStore
+from provider_client import ProviderClient
+from providers import FederatedSearch, build_providers
+from rate_limit import PRIORITY_USER, KeyedClient, SharedRateLimiter
+from search_cache import SearchCache
+from singleflight import SingleFlight
+
+
+class Services:
+
+    def __init__(self, settings=None):
+        self.settings = settings or Settings.from_env()
+
+        # WAL + pooled connections; the schema is brought up to date once
+        self.db = Database(self.settings.db_path)
+        with self.db.connection() as conn:
+            migrate(conn)
+
+        # Shared with the prefetch worker through the api_quota table
+        keys = self.settings.api_keys
+        self.rate_limiter = SharedRateLimiter(self.db, keys) if keys else None
+        self.client = ProviderClient()
+        upstream = self.client
+        if self.rate_limiter is not None:
+            upstream = KeyedClient(self.client, self.rate_limiter, PRIORITY_USER,
+                                   timeout=self.settings.user_quota_wait)
+
+        self.search_cache = SearchCache(db=self.db, dumps=events_to_json, loads=events_from_json)
+        self.index = EventIndex(self.db)
+        self.ingestor = IndexIngestor(self.index)
+        self.single_flight = SingleFlight()
+        self.profiles = ProfileStore(self.db)
+        self.thumbnails = ThumbnailCache(
+            self.db, self.settings.thumbnail_dir, static_dir=STATIC_DIR,
+            max_bytes=self.settings.thumbnail_cache_mb * 1024 * 1024
+        )
+
+        self.passwords = PasswordHasher(n=self.settings.password_hash_n,
+                                        workers=self.settings.password_hash_workers)
+        self.users = UserRepository(self.db, self.passwords)
+        self.sessions = SessionStore(self.db, ttl=self.settings.session_days * 24 * 3600)
+        self.saved_events = SavedEventRepository(self.db)
+        self.providers = self.federated_search(upstream)
+        self.search = SearchService(
+            self.db, self.search_cache, self.providers, self.index, self.ingestor, self.single_flight
+        )
+        self.recommendations = RecommendationService(self.profiles)
+        self.analytics = AnalyticsService()
+        self.assistant = Assistant(self.index)
+
+    def federated_search(self, upstream):
+        """The configured providers as a FederatedSearch, fetching through `upstream`."""
+        return FederatedSearch(build_providers(
+            self.settings.providers, upstream, self.settings.ticketmaster_url,
+            max_pages=self.settings.max_result_pages,
+            remote_deadline=self.settings.provider_deadline,
+            jsonl_path=self.settings.events_jsonl
+        ))
+
+    def save_event(self, user_id, name, date, venue, event_url, category=None,
+                   provider_event_id=None, city=None):
+        """Save for a user and update their profile; False if already saved."""
+        saved = self.saved_events.save(user_id, name, date, venue, event_url, category, provider_event_id)
+        if saved:
+            self.profiles.record_save(user_id, name, provider_event_id, category, venue, city)
+        return saved
+
+    def close(self):
+        self.thumbnails.close()
+        self.passwords.close()
+        self.providers.close()
+        self.client.close()
+        self.db.close()
@@ -0,0 +1,146 @@
+# geo.py
+# Venue geo store: venues deduplicated by id, a uniform grid index for
+# radius queries, and grid clusters per map zoom level.
+import math
+from collections import defaultdict
+
+from analytics import result_set_key
+from lru import LRUCache
+
+EARTH_RADIUS_KM = 6371.0
+INDEX_CELL_DEG = 0.05        # ~5.5 km of latitude per index cell
+MAX_ZOOM = 16
+CLUSTERS_PER_TILE = 4        # cluster cells across one 256px map tile
+MAX_MAP_POINTS = 300
+MAX_MEMOIZED = 64
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def cell_of(lat, lon, size):
+    return math.floor(lat / size), math.floor(lon / size)
+
+
+class Venue:
+    __slots__ = ("id", "name", "lat", "lon", "event_count")
+
+    def __init__(self, venue_id, name, lat, lon):
+        self.id = venue_id
+        self.name = name
+        self.lat = lat
+        self.lon = lon
+        self.event_count = 0
+
+
+# ----------------------------
+# Store
+# ----------------------------
+class VenueGeoStore:
+
+    def __init__(self, cell_deg=INDEX_CELL_DEG):
+        self.cell_deg = cell_deg
+        self.venues = {}
+        self._grid = defaultdict(list)
+        self._clusters = {}
+
+    @classmethod
+    def from_events(cls, events):
+        store = cls()
+        for event in events:
+            store.add_event(event)
+        return store
+
+    def add_event(self, event):
+        if event.lat is None or event.lon is None:
+            return
+        # Events without a venue id fall back to their coordinates
+        venue_id = event.venue_id or f"{event.lat:.5f},{event.lon:.5f}"
+        venue = self.venues.get(venue_id)
+        if venue is None:
+            venue = Venue(venue_id, event.venue, event.lat, event.lon)
+            self.venues[venue_id] = venue
+            self._grid[cell_of(venue.lat, venue.lon, self.cell_deg)].append(venue)
+            self._clusters.clear()
+        venue.event_count += 1
+
+    def within(self, lat, lon, radius_km):
+        """Venues within radius_km, nearest first. Only nearby grid cells are scanned."""
+        dlat = radius_km / 111.0
+        dlon = radius_km / (111.0 * max(math.cos(math.radians(lat)), 1e-6))
+        row_lo, col_lo = cell_of(lat - dlat, lon - dlon, self.cell_deg)
+        row_hi, col_hi = cell_of(lat + dlat, lon + dlon, self.cell_deg)
+
+        found = []
+        if (row_hi - row_lo + 1) * (col_hi - col_lo + 1) > len(self._grid):
+            # Huge radius: scanning occupied cells is cheaper than the box
+            candidates = (v for cell in self._grid.values() for v in cell)
+        else:
+            candidates = (
+                v
+                for row in range(row_lo, row_hi + 1)
+                for col in range(col_lo, col_hi + 1)
+                for v in self._grid.get((row, col), ())
+            )
+        for venue in candidates:
+            distance = haversine_km(lat, lon, venue.lat, venue.lon)
+            if distance <= radius_km:
+                found.append((distance, venue))
+        found.sort(key=lambda pair: pair[0])
+        return [venue for _, venue in found]
+
+    # ----------------------------
+    # Clustering
+    # ----------------------------
+    def clusters(self, zoom):
+        """Grid clusters for a map zoom level, as dicts for st.map."""
+        zoom = max(0, min(MAX_ZOOM, zoom))
+        cached = self._clusters.get(zoom)
+        if cached is not None:
+            return cached
+
+        size = 360.0 / (2 ** zoom) / CLUSTERS_PER_TILE
+        cells = {}
+        for venue in self.venues.values():
+            key = cell_of(venue.lat, venue.lon, size)
+            acc = cells.get(key)
+            if acc is None:
+                cells[key] = [venue.lat * venue.event_count, venue.lon * venue.event_count, venue.event_count]
+            else:
+                acc[0] += venue.lat * venue.event_count
+                acc[1] += venue.lon * venue.event_count
+                acc[2] += venue.event_count
+
+        result = [
+            {"lat": lat_sum / count, "lon": lon_sum / count, "events": count}
+            for lat_sum, lon_sum, count in cells.values()
+        ]
+        self._clusters[zoom] = result
+        return result
+
+    def map_points(self, max_points=MAX_MAP_POINTS):
+        """Clusters at the most detailed zoom that stays within max_points."""
+        if len(self.venues) <= max_points:
+            return self.clusters(MAX_ZOOM)
+        best = self.clusters(0)
+        for zoom in range(1, MAX_ZOOM + 1):
+            points = self.clusters(zoom)
+            if len(points) > max_points:
+                break
+            best = points
+        return best
+
+
+# ----------------------------
+# Memoized per result set
+# ----------------------------
+_memo = LRUCache(MAX_MEMOIZED)
+
+
+def venue_store(events):
+    return _memo.get_or_compute(result_set_key(events), lambda: VenueGeoStore.from_events(events))
@@ -0,0 +1,264 @@
+# image_cache.py
+# Local thumbnail cache for event artwork.
+#
+# The chosen image variant (see event_record.choose_image) is downloaded
+# once, cropped to a fixed-size JPEG thumbnail and stored under a name
+# derived from its content hash, so identical artwork shared by many
+# events is stored once. Files live in static/thumbs, which Streamlit
+# serves itself (server.enableStaticServing, <app dir>/static at
+# app/static/); the cache directory may be any folder under static/. The
+# least recently used files are evicted once the cache grows past its
+# byte budget.
+#
+# Pillow is optional: without it the downloaded variant is cached as is.
+import hashlib
+import logging
+import os
+import posixpath
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+log = logging.getLogger("image_cache")
+
+STATIC_DIR = "static"
+STATIC_URL = "app/static"
+CACHE_DIR = os.path.join(STATIC_DIR, "thumbs")
+THUMBNAIL_SIZE = (300, 200)
+JPEG_QUALITY = 80
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+LOW_WATERMARK = 0.9             # evict down to 90% of the budget
+MAX_DOWNLOAD_BYTES = 5 * 1024 * 1024
+DOWNLOAD_TIMEOUT = (3.05, 10)
+DOWNLOAD_WORKERS = 4
+TOUCH_INTERVAL = 60             # seconds between last_access updates per url
+RETRY_FAILED_AFTER = 600        # seconds before a failed download is retried
+EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/gif": ".gif", "image/webp": ".webp"}
+
+
+def static_url(directory, static_dir=STATIC_DIR):
+    """URL prefix Streamlit serves `directory` at; ValueError unless it is inside static_dir."""
+    relative = os.path.relpath(os.path.realpath(directory), os.path.realpath(static_dir))
+    if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+        raise ValueError(f"Thumbnail directory {directory} must be inside {static_dir}, "
+                         "the only folder Streamlit serves")
+    if relative == os.curdir:
+        return STATIC_URL
+    return posixpath.join(STATIC_URL, *relative.split(os.sep))
+
+
+def make_thumbnail(data, size=THUMBNAIL_SIZE):
+    """JPEG bytes cropped to `size`; None if Pillow is missing or can't read the image."""
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return None
+    try:
+        with Image.open(BytesIO(data)) as image:
+            thumb = ImageOps.fit(image.convert("RGB"), size, Image.LANCZOS)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+    out = BytesIO()
+    thumb.save(out, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+# ----------------------------
+# Cache
+# ----------------------------
+class ThumbnailCache:
+
+    def __init__(self, db, directory=CACHE_DIR, static_dir=STATIC_DIR, size=THUMBNAIL_SIZE,
+                 max_bytes=MAX_CACHE_BYTES, workers=DOWNLOAD_WORKERS):
+        self.db = db
+        self.directory = directory
+        self.url_prefix = static_url(directory, static_dir)
+        self.size = size
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self._known = {}        # image url -> cached filename
+        self._touched = {}      # image url -> last recorded access
+        self._pending = set()
+        self._failed = {}       # image url -> time of the failed attempt
+        self._total_bytes = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbs")
+
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=1)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def url_for(self, image_url):
+        """
+        URL of the local thumbnail, or None while it isn't cached yet (the
+        download then starts in the background; show the remote image).
+        """
+        if not image_url:
+            return None
+        filename = self._lookup(image_url)
+        if filename is None:
+            self._schedule(image_url)
+            return None
+        self._touch(image_url)
+        return f"{self.url_prefix}/{filename}"
+
+    def fetch(self, image_url):
+        """Download, convert and store one image; returns the cached filename."""
+        with metrics.timed("thumbnail_fetch"):
+            data, content_type = self._download(image_url)
+        thumb = make_thumbnail(data, self.size)
+        if thumb is not None:
+            data, extension = thumb, ".jpg"
+        else:
+            extension = EXTENSIONS.get(content_type, ".img")
+
+        filename = hashlib.sha256(data).hexdigest()[:32] + extension
+        path = os.path.join(self.directory, filename)
+        added = 0
+        if not os.path.exists(path):
+            # Write-then-rename so a half-written file is never served
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            added = len(data)
+
+        now = time.time()
+        self.db.write("""
+            INSERT INTO image_cache (url, filename, bytes, last_access) VALUES (?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                filename=excluded.filename, bytes=excluded.bytes, last_access=excluded.last_access
+        """, (image_url, filename, len(data), now))
+        with self._lock:
+            self._known[image_url] = filename
+            self._touched[image_url] = now
+            if self._total_bytes is not None:
+                self._total_bytes += added
+        self.evict()
+        return filename
+
+    def evict(self):
+        """Drop least recently used files until the cache fits its budget."""
+        total = self._cached_bytes()
+        if total <= self.max_bytes:
+            return 0
+        target = self.max_bytes * LOW_WATERMARK
+        removed = 0
+        rows = self.db.fetchall("""
+            SELECT filename, MAX(bytes), MAX(last_access) AS seen
+            FROM image_cache GROUP BY filename ORDER BY seen
+        """)
+        for filename, size, _ in rows:
+            if total <= target:
+                break
+            self.db.write("DELETE FROM image_cache WHERE filename=?", (filename,))
+            try:
+                os.remove(os.path.join(self.directory, filename))
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+            with self._lock:
+                for url in [u for u, f in self._known.items() if f == filename]:
+                    del self._known[url]
+        with self._lock:
+            self._total_bytes = total
+        metrics.count("thumbnails_evicted", removed)
+        return removed
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+    # ----------------------------
+    # Internals
+    # ----------------------------
+    def _path_exists(self, filename):
+        # Another process sharing the directory may have evicted it
+        return os.path.exists(os.path.join(self.directory, filename))
+
+    def _lookup(self, image_url):
+        with self._lock:
+            filename = self._known.get(image_url)
+            if filename is None and image_url in self._pending:
+                return None
+        if filename is None:
+            row = self.db.fetchone("SELECT filename FROM image_cache WHERE url=?", (image_url,))
+            filename = row[0] if row else None
+        if filename is None or not self._path_exists(filename):
+            with self._lock:
+                self._known.pop(image_url, None)
+            return None
+        with self._lock:
+            self._known[image_url] = filename
+        return filename
+
+    def _schedule(self, image_url):
+        with self._lock:
+            if image_url in self._pending:
+                return
+            failed_at = self._failed.get(image_url)
+            if failed_at is not None and time.time() - failed_at < RETRY_FAILED_AFTER:
+                return
+            self._pending.add(image_url)
+        self._executor.submit(self._fetch_in_background, image_url)
+
+    def _fetch_in_background(self, image_url):
+        try:
+            self.fetch(image_url)
+            with self._lock:
+                self._failed.pop(image_url, None)
+        except Exception as exc:
+            # Best effort: the card keeps showing the remote image
+            log.info("thumbnail for %s failed: %s", image_url, exc)
+            metrics.count("thumbnail_failures")
+            with self._lock:
+                self._failed[image_url] = time.time()
+        finally:
+            with self._lock:
+                self._pending.discard(image_url)
+
+    def _download(self, image_url):
+        with self.session.get(image_url, timeout=DOWNLOAD_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if not content_type.startswith("image/"):
+                raise ValueError(f"not an image ({content_type or 'no content type'})")
+            chunks = []
+            size = 0
+            for chunk in response.iter_content(64 * 1024):
+                size += len(chunk)
+                if size > MAX_DOWNLOAD_BYTES:
+                    raise ValueError("image too large")
+                chunks.append(chunk)
+        return b"".join(chunks), content_type
+
+    def _cached_bytes(self):
+        with self._lock:
+            if self._total_bytes is not None:
+                return self._total_bytes
+        total = self.db.fetchone("""
+            SELECT COALESCE(SUM(bytes), 0) FROM (
+                SELECT MAX(bytes) AS bytes FROM image_cache GROUP BY filename
+            )
+        """)[0]
+        with self._lock:
+            self._total_bytes = total
+        return total
+
+    def _touch(self, image_url):
+        now = time.time()
+        with self._lock:
+            if now - self._touched.get(image_url, 0) < TOUCH_INTERVAL:
+                return
+            self._touched[image_url] = now
+        self.db.submit_write("UPDATE image_cache SET last_access=? WHERE url=?", (now, image_url))
@@ -0,0 +1,72 @@
+# lru.py
+# Thread-safe LRU cache with optional expiry, behind the in-process caches
+# and memos (search results, aggregates, venue stores, frames, encoded
+# responses, sessions, profiles).
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+
+    def __init__(self, max_entries, ttl=None):
+        self.max_entries = max_entries
+        # Seconds an entry stays fresh; None keeps it until it is evicted
+        self.ttl = ttl
+        self._entries = OrderedDict()    # key -> (expires_at or None, value)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= now:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at=None):
+        """Store a value; expires_at (a time.time() value) overrides the TTL."""
+        if expires_at is None and self.ttl is not None:
+            expires_at = time.time() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def get_or_compute(self, key, compute):
+        # compute() runs outside the lock; two threads may both compute a
+        # missing value, which is fine for the pure results cached here
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = self.set(key, compute())
+        return value
+
+    def expires_at(self, key):
+        """When the entry expires (0 if missing or expired; None if it never does)."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or (entry[0] is not None and entry[0] <= time.time()):
+            return 0.0
+        return entry[0]
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
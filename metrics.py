@@ -0,0 +1,207 @@
+# metrics.py
+# Lightweight in-process timings and counters for the hot paths, exported
+# in Prometheus text format from a small sidecar HTTP endpoint.
+#
+#   with metrics.timed("recommend"): ...
+#   @metrics.timed("load_saved_events")
+#   metrics.count("upstream_responses", status=200)
+import logging
+import threading
+import time
+from contextlib import ContextDecorator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+log = logging.getLogger("metrics")
+
+PREFIX = "eventure"
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_QUERY_SECONDS = 0.05
+
+
+def label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in pairs) + "}"
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        index = 0
+        while index < len(BUCKETS) and value > BUCKETS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.total += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return BUCKETS[index] if index < len(BUCKETS) else self.max
+        return self.max
+
+
+# ----------------------------
+# Registry
+# ----------------------------
+class Registry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def count(self, name, value=1, **labels):
+        key = (name, label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def snapshot(self):
+        """Per-stage summary rows for the debug panel."""
+        with self._lock:
+            return [
+                {
+                    "stage": stage,
+                    "count": h.count,
+                    "avg_ms": round(h.total / h.count * 1000, 3) if h.count else 0.0,
+                    "p50_ms": round(h.quantile(0.5) * 1000, 3),
+                    "p95_ms": round(h.quantile(0.95) * 1000, 3),
+                    "max_ms": round(h.max * 1000, 3),
+                }
+                for stage, h in sorted(self._histograms.items())
+            ]
+
+    def counters(self):
+        with self._lock:
+            return {
+                f"{name}{format_labels(labels)}": value
+                for (name, labels), value in sorted(self._counters.items())
+            }
+
+    def render_prometheus(self):
+        lines = []
+        with self._lock:
+            name = f"{PREFIX}_stage_seconds"
+            lines.append(f"# HELP {name} Time spent per hot-path stage.")
+            lines.append(f"# TYPE {name} histogram")
+            for stage, h in sorted(self._histograms.items()):
+                labels = (("stage", stage),)
+                cumulative = 0
+                for bound, bucket_count in zip(BUCKETS, h.counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{format_labels(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_bucket{format_labels(labels, [('le', '+Inf')])} {h.count}")
+                lines.append(f"{name}_sum{format_labels(labels)} {h.total}")
+                lines.append(f"{name}_count{format_labels(labels)} {h.count}")
+
+            seen = set()
+            for (counter, labels), value in sorted(self._counters.items()):
+                full = f"{PREFIX}_{counter}_total"
+                if full not in seen:
+                    lines.append(f"# TYPE {full} counter")
+                    seen.add(full)
+                lines.append(f"{full}{format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+REGISTRY = Registry()
+
+
+class timed(ContextDecorator):
+    """Time a block or function into the stage histogram."""
+
+    def __init__(self, stage, registry=None):
+        self.stage = stage
+        self.registry = registry or REGISTRY
+        self._local = threading.local()
+
+    def __enter__(self):
+        starts = getattr(self._local, "starts", None)
+        if starts is None:
+            starts = self._local.starts = []
+        starts.append(time.perf_counter())
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self._local.starts.pop()
+        self.registry.observe(self.stage, elapsed)
+        return False
+
+
+def observe(stage, seconds):
+    REGISTRY.observe(stage, seconds)
+
+
+def count(name, value=1, **labels):
+    REGISTRY.count(name, value, **labels)
+
+
+def record_query(sql, seconds, stage="db_query"):
+    REGISTRY.observe(stage, seconds)
+    if seconds >= SLOW_QUERY_SECONDS:
+        REGISTRY.count("slow_queries")
+        log.warning("slow query (%.1f ms): %s", seconds * 1000, " ".join(sql.split())[:200])
+
+
+# ----------------------------
+# Sidecar endpoint
+# ----------------------------
+def serve(port, host="0.0.0.0", registry=None):
+    """Serve /metrics on a daemon thread; returns the server."""
+    registry = registry or REGISTRY
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
@@ -0,0 +1,326 @@
+# migrations.py
+# Versioned schema migrations for event_finder.db.
+# The applied version is tracked in SQLite's PRAGMA user_version.
+import sqlite3
+import urllib.parse
+
+
+def column_exists(conn, table, column):
+    # table_xinfo also lists generated columns
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_xinfo({table})"))
+
+
+def add_column(conn, table, column, decl):
+    # Older databases may already have the column from the ad-hoc check.py
+    if not column_exists(conn, table, column):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+# ----------------------------
+# Migrations
+# ----------------------------
+def create_base_tables(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS saved_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        event_name TEXT,
+        event_date TEXT,
+        event_venue TEXT,
+        event_url TEXT,
+        saved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    )
+    """)
+
+
+def add_saved_event_columns(conn):
+    add_column(conn, "saved_events", "category", "TEXT")
+    add_column(conn, "saved_events", "provider_event_id", "TEXT")
+
+
+def index_saved_events(conn):
+    # Drop duplicate saves (keeping the first) so the unique index can be built
+    conn.execute("""
+        DELETE FROM saved_events
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM saved_events
+            GROUP BY user_id, event_name, event_date
+        )
+    """)
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_saved_events_unique
+        ON saved_events(user_id, event_name, event_date)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_saved_events_user_saved_at
+        ON saved_events(user_id, saved_at)
+    """)
+
+
+def create_user_profiles(conn):
+    # Filled lazily from saved_events the first time a profile is needed
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS user_profiles (
+        user_id INTEGER PRIMARY KEY,
+        categories TEXT NOT NULL DEFAULT '{}',
+        venues TEXT NOT NULL DEFAULT '{}',
+        cities TEXT NOT NULL DEFAULT '{}',
+        saved_ids TEXT NOT NULL DEFAULT '[]',
+        saved_names TEXT NOT NULL DEFAULT '[]',
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    )
+    """)
+
+
+def create_search_log(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS search_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        cache_key TEXT NOT NULL,
+        params TEXT NOT NULL,
+        searched_at REAL NOT NULL
+    )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_search_log_searched_at
+        ON search_log(searched_at, cache_key)
+    """)
+
+
+def create_api_quota(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS api_quota (
+        key_id TEXT PRIMARY KEY,
+        tokens REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        day TEXT NOT NULL,
+        day_count INTEGER NOT NULL DEFAULT 0
+    )
+    """)
+
+
+def create_image_cache(conn):
+    # url -> content-addressed thumbnail file (see image_cache.py)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS image_cache (
+        url TEXT PRIMARY KEY,
+        filename TEXT NOT NULL,
+        bytes INTEGER NOT NULL,
+        last_access REAL NOT NULL
+    )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_image_cache_last_access
+        ON image_cache(last_access)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_image_cache_filename
+        ON image_cache(filename)
+    """)
+
+
+def create_sessions(conn):
+    # token_hash is the SHA-256 of the session token (see auth.SessionStore)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS sessions (
+        token_hash TEXT PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        expires_at REAL NOT NULL,
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sessions_expires_at
+        ON sessions(expires_at)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sessions_user_id
+        ON sessions(user_id)
+    """)
+
+
+def mark_legacy_passwords(conn):
+    # Hashing here would hold the write lock for the whole users table while
+    # every process waits to start. Plaintext rows are only flagged; logins
+    # upgrade them (see eventure/repository.py), or `python bulk.py rehash users`.
+    # The prefix is the hash format as of this migration, not auth.SCHEME
+    add_column(conn, "users", "password_legacy", "INTEGER NOT NULL DEFAULT 0")
+    conn.execute("UPDATE users SET password_legacy=1 WHERE substr(password, 1, 7) != 'scrypt$'")
+
+
+def share_links_v10(name, date_str, url):
+    # The link format as of migration 10, kept here so that changing
+    # reminders.share_links later doesn't change what this migration wrote
+    whatsapp = urllib.parse.quote(f"Check out this event: {name} on {date_str}. {url}")
+    tweet = urllib.parse.quote(f"Check out this event: {name} on {date_str} {url}")
+    return (
+        f"https://wa.me/?text={whatsapp}",
+        f"https://twitter.com/intent/tweet?text={tweet}",
+    )
+
+
+def type_saved_event_dates(conn):
+    # A real day (or NULL for "N/A" and other non-dates), kept in step with
+    # event_date by SQLite itself, so every writer gets it for free
+    add_column(conn, "saved_events", "event_day", "TEXT GENERATED ALWAYS AS (date(event_date)) VIRTUAL")
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_saved_events_event_day
+        ON saved_events(event_day)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_saved_events_user_event_day
+        ON saved_events(user_id, event_day)
+    """)
+    add_column(conn, "saved_events", "share_whatsapp", "TEXT")
+    add_column(conn, "saved_events", "share_twitter", "TEXT")
+    add_column(conn, "saved_events", "reminded_at", "REAL")
+
+    last_id = 0
+    while True:
+        batch = conn.execute("""
+            SELECT id, event_name, event_date, event_url FROM saved_events
+            WHERE id > ? ORDER BY id LIMIT 50000
+        """, (last_id,)).fetchall()
+        if not batch:
+            break
+        conn.executemany(
+            "UPDATE saved_events SET share_whatsapp=?, share_twitter=? WHERE id=?",
+            [(*share_links_v10(name, day, url), row_id) for row_id, name, day, url in batch]
+        )
+        last_id = batch[-1][0]
+
+
+# The event index schema as of migration 11 (see event_index.py), kept
+# here so later changes to event_index don't change what this migration builds
+EVENT_INDEX_V11 = (
+    """
+    CREATE TABLE IF NOT EXISTS events (
+        id INTEGER PRIMARY KEY,
+        event_id TEXT NOT NULL UNIQUE,
+        name TEXT NOT NULL,
+        local_date TEXT,
+        venue TEXT,
+        city TEXT,
+        segment TEXT,
+        url TEXT,
+        latitude REAL,
+        longitude REAL,
+        payload TEXT NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_events_city_date ON events(city, local_date)",
+    "CREATE INDEX IF NOT EXISTS idx_events_segment ON events(segment)",
+    "CREATE INDEX IF NOT EXISTS idx_events_local_date ON events(local_date)",
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+        name, venue, content='events', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS events_ai AFTER INSERT ON events BEGIN
+        INSERT INTO events_fts(rowid, name, venue) VALUES (new.id, new.name, new.venue);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS events_ad AFTER DELETE ON events BEGIN
+        INSERT INTO events_fts(events_fts, rowid, name, venue) VALUES ('delete', old.id, old.name, old.venue);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS events_au AFTER UPDATE ON events BEGIN
+        INSERT INTO events_fts(events_fts, rowid, name, venue) VALUES ('delete', old.id, old.name, old.venue);
+        INSERT INTO events_fts(rowid, name, venue) VALUES (new.id, new.name, new.venue);
+    END
+    """,
+)
+EVENT_COLUMNS_V11 = [
+    "event_id", "name", "local_date", "venue", "city", "segment", "url",
+    "latitude", "longitude", "payload", "updated_at",
+]
+
+
+def rekey_event_index(conn):
+    # events was keyed on the implicit rowid of a TEXT PRIMARY KEY table,
+    # which VACUUM may renumber under events_fts; copy it into the
+    # INTEGER PRIMARY KEY schema (the insert trigger refills the FTS table)
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='events'").fetchone():
+        return
+    if column_exists(conn, "events", "id"):
+        return
+    for trigger in ("events_ai", "events_ad", "events_au"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.execute("DROP TABLE IF EXISTS events_fts")
+    for index in ("idx_events_city_date", "idx_events_segment", "idx_events_local_date"):
+        conn.execute(f"DROP INDEX IF EXISTS {index}")
+    conn.execute("ALTER TABLE events RENAME TO events_v1")
+    for statement in EVENT_INDEX_V11:
+        conn.execute(statement)
+    columns = ", ".join(EVENT_COLUMNS_V11)
+    conn.execute(f"INSERT INTO events ({columns}) SELECT {columns} FROM events_v1 ORDER BY rowid")
+    conn.execute("DROP TABLE events_v1")
+
+
+MIGRATIONS = [
+    (1, "create users and saved_events", create_base_tables),
+    (2, "add category and provider event id to saved_events", add_saved_event_columns),
+    (3, "index saved_events and enforce unique saves", index_saved_events),
+    (4, "create user_profiles", create_user_profiles),
+    (5, "create search_log", create_search_log),
+    (6, "create api_quota", create_api_quota),
+    (7, "create image_cache", create_image_cache),
+    (8, "create sessions", create_sessions),
+    (9, "mark plaintext passwords as legacy", mark_legacy_passwords),
+    (10, "type saved event dates and store share links", type_saved_event_dates),
+    (11, "key the event index on an integer id", rekey_event_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# ----------------------------
+# Runner
+# ----------------------------
+def current_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn, target=LATEST_VERSION):
+    """Apply pending migrations in order; each runs in its own transaction."""
+    for version, description, step in MIGRATIONS:
+        if version > target:
+            break
+        # IMMEDIATE takes the write lock up front so two processes starting
+        # together can't both apply the same step
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if current_version(conn) >= version:
+                conn.rollback()
+                continue
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return current_version(conn)
+
+
+if __name__ == "__main__":
+    conn = sqlite3.connect("event_finder.db")
+    before = current_version(conn)
+    after = migrate(conn)
+    print(f"Schema version: {before} -> {after}")
+    conn.close()
@@ -0,0 +1,158 @@
+# prefetch.py
+# Background prefetch / refresh of popular searches.
+#
+# Searches logged by app.py (search_log) are ranked by frequency; the top
+# ones are fetched ahead of time and refreshed shortly before their cache
+# entries expire, within an upstream request budget.
+#
+#   python prefetch.py            # run as a worker next to the Streamlit app
+import json
+import logging
+import threading
+import time
+
+from provider_client import ProviderError
+from rate_limit import RateLimited
+
+log = logging.getLogger("prefetch")
+
+TOP_SEARCHES = 20
+WINDOW_SECONDS = 24 * 3600      # how far back popularity is measured
+INTERVAL_SECONDS = 60           # time between scheduler passes
+REFRESH_MARGIN = 0.2            # refresh when < 20% of the TTL is left
+BACKGROUND_QUOTA_WAIT = 2       # seconds a refresh may wait for an API token
+
+
+def log_search(db, cache_key, params):
+    """Record a user search (without the API key) for popularity ranking."""
+    public = {k: v for k, v in params.items() if k != "apikey"}
+    db.submit_write(
+        "INSERT INTO search_log (cache_key, params, searched_at) VALUES (?, ?, ?)",
+        (cache_key, json.dumps(public, sort_keys=True), time.time())
+    )
+
+
+def popular_searches(db, limit=TOP_SEARCHES, window=WINDOW_SECONDS, now=None):
+    since = (now or time.time()) - window
+    rows = db.fetchall("""
+        SELECT cache_key, MAX(params), COUNT(*) AS hits
+        FROM search_log
+        WHERE searched_at > ?
+        GROUP BY cache_key
+        ORDER BY hits DESC
+        LIMIT ?
+    """, (since, limit))
+    return [(key, json.loads(params), hits) for key, params, hits in rows]
+
+
+def prune_search_log(db, window=WINDOW_SECONDS, now=None):
+    db.submit_write("DELETE FROM search_log WHERE searched_at <= ?", ((now or time.time()) - window,))
+
+
+# ----------------------------
+# Scheduler
+# ----------------------------
+class PrefetchScheduler:
+
+    def __init__(self, db, search_cache, providers, ingestor=None,
+                 top_n=TOP_SEARCHES, interval=INTERVAL_SECONDS,
+                 refresh_margin=REFRESH_MARGIN):
+        # providers.FederatedSearch, built over a background-priority
+        # rate_limit.KeyedClient (which also supplies the API key)
+        self.db = db
+        self.search_cache = search_cache
+        self.providers = providers
+        self.ingestor = ingestor
+        self.top_n = top_n
+        self.interval = interval
+        self.refresh_margin = refresh_margin
+        self._stop = threading.Event()
+        self._thread = None
+
+    def due(self, cache_key, now):
+        remaining = self.search_cache.expires_at(cache_key) - now
+        return remaining < self.search_cache.ttl * self.refresh_margin
+
+    def refresh(self, cache_key, params):
+        # Same providers as a user search, so the cached result matches it
+        events = tuple(self.providers.search(params))
+        self.search_cache.set(cache_key, events)
+        if self.ingestor is not None:
+            self.ingestor.submit(events)
+        return events
+
+    def run_once(self):
+        now = time.time()
+        refreshed = 0
+        for cache_key, params, hits in popular_searches(self.db, self.top_n, now=now):
+            if self._stop.is_set():
+                break
+            if not self.due(cache_key, now):
+                continue
+            try:
+                self.refresh(cache_key, params)
+                refreshed += 1
+            except RateLimited as exc:
+                # Out of budget: every later search would fail too
+                log.info("prefetch pass stopped at %s: %s", cache_key, exc)
+                break
+            except ProviderError as exc:
+                # This search failed upstream; the rest still get their turn
+                log.warning("prefetch of %s failed: %s", cache_key, exc)
+        prune_search_log(self.db, now=now)
+        return refreshed
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                log.info("refreshed %d searches", self.run_once())
+            except Exception:
+                log.exception("prefetch pass failed")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="prefetch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    from eventure.config import Settings
+    from eventure.services import Services
+    from rate_limit import PRIORITY_BACKGROUND, KeyedClient
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    load_dotenv()
+
+    # Same settings, database, cache and providers as the app
+    services = Services(Settings.from_env())
+    upstream = services.client
+    if services.rate_limiter is not None:
+        # Background priority: never eats into the share reserved for users,
+        # waits briefly for a token and otherwise gives up until the next pass
+        upstream = KeyedClient(services.client, services.rate_limiter, PRIORITY_BACKGROUND,
+                               timeout=BACKGROUND_QUOTA_WAIT)
+    scheduler = PrefetchScheduler(
+        services.db,
+        services.search_cache,
+        services.federated_search(upstream),
+        ingestor=services.ingestor,
+        interval=services.settings.prefetch_interval
+    )
+    log.info("prefetch worker started on %s", services.settings.db_path)
+    scheduler.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    scheduler.stop()
+    scheduler.providers.close()
+    services.close()
@@ -0,0 +1,148 @@
+# profiles.py
+# Per-user preference profiles, kept up to date as events are saved so
+# the recommender doesn't have to aggregate saved_events on every rerun.
+import json
+from collections import Counter
+
+from lru import LRUCache
+
+MAX_CACHED_PROFILES = 1024
+PROFILE_TTL = 60                # seconds; saves made by another process show up after this
+
+SELECT_PROFILE = """
+SELECT user_id, categories, venues, cities, saved_ids, saved_names
+FROM user_profiles WHERE user_id=?
+"""
+
+UPSERT_PROFILE = """
+INSERT INTO user_profiles (user_id, categories, venues, cities, saved_ids, saved_names, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+ON CONFLICT(user_id) DO UPDATE SET
+    categories=excluded.categories, venues=excluded.venues, cities=excluded.cities,
+    saved_ids=excluded.saved_ids, saved_names=excluded.saved_names,
+    updated_at=excluded.updated_at
+"""
+
+
+def normalized_weights(counter):
+    # Scale so the strongest preference is 1.0
+    if not counter:
+        return {}
+    top = max(counter.values())
+    return {key: count / top for key, count in counter.items()}
+
+
+# ----------------------------
+# Profile
+# ----------------------------
+class UserProfile:
+
+    def __init__(self, user_id, categories=None, venues=None, cities=None,
+                 saved_ids=None, saved_names=None):
+        self.user_id = user_id
+        self.categories = Counter(categories or {})
+        self.venues = Counter(venues or {})
+        self.cities = Counter(cities or {})
+        self.saved_ids = set(saved_ids or ())
+        self.saved_names = set(saved_names or ())
+
+    def add(self, name, event_id=None, category=None, venue=None, city=None):
+        if category:
+            self.categories[category] += 1
+        if venue:
+            self.venues[venue] += 1
+        if city:
+            self.cities[city.casefold()] += 1
+        if event_id:
+            self.saved_ids.add(event_id)
+        if name:
+            self.saved_names.add(name)
+
+    def category_weights(self):
+        return normalized_weights(self.categories)
+
+    def venue_weights(self):
+        return normalized_weights(self.venues)
+
+    def top_categories(self, n=3):
+        return [category for category, _ in self.categories.most_common(n)]
+
+    def to_row(self):
+        return (
+            self.user_id,
+            json.dumps(self.categories),
+            json.dumps(self.venues),
+            json.dumps(self.cities),
+            json.dumps(sorted(self.saved_ids)),
+            json.dumps(sorted(self.saved_names)),
+        )
+
+    @classmethod
+    def from_row(cls, row):
+        user_id, categories, venues, cities, saved_ids, saved_names = row
+        return cls(
+            user_id,
+            json.loads(categories),
+            json.loads(venues),
+            json.loads(cities),
+            json.loads(saved_ids),
+            json.loads(saved_names),
+        )
+
+
+# ----------------------------
+# Store
+# ----------------------------
+class ProfileStore:
+    """
+    Each save re-reads and writes the profile in one write transaction, so
+    processes sharing the database (app, API) never overwrite each other.
+    """
+
+    def __init__(self, db, max_entries=MAX_CACHED_PROFILES, ttl=PROFILE_TTL):
+        self.db = db
+        self._profiles = LRUCache(max_entries, ttl=ttl)
+
+    def get(self, user_id):
+        profile = self._profiles.get(user_id) or self._load(user_id)
+        if profile is None:
+            profile = self._rebuild(user_id)
+        return profile
+
+    def record_save(self, user_id, name, event_id=None, category=None, venue=None, city=None):
+        """Call after a save commits; updates the stored profile in O(1)."""
+        with self.db.transaction() as conn:
+            row = conn.execute(SELECT_PROFILE, (user_id,)).fetchone()
+            if row is None:
+                # The rebuild reads saved_events, which already has this save
+                profile = self._build(conn, user_id)
+            else:
+                profile = UserProfile.from_row(row)
+                profile.add(name, event_id, category, venue, city)
+            conn.execute(UPSERT_PROFILE, profile.to_row())
+        self._profiles.set(user_id, profile)
+
+    def forget(self, user_id):
+        self._profiles.pop(user_id)
+
+    def _load(self, user_id):
+        row = self.db.fetchone(SELECT_PROFILE, (user_id,))
+        if row is None:
+            return None
+        return self._profiles.set(user_id, UserProfile.from_row(row))
+
+    def _rebuild(self, user_id):
+        with self.db.transaction() as conn:
+            profile = self._build(conn, user_id)
+            conn.execute(UPSERT_PROFILE, profile.to_row())
+        return self._profiles.set(user_id, profile)
+
+    def _build(self, conn, user_id):
+        profile = UserProfile(user_id)
+        rows = conn.execute("""
+            SELECT event_name, provider_event_id, category, event_venue
+            FROM saved_events WHERE user_id=?
+        """, (user_id,))
+        for name, event_id, category, venue in rows:
+            profile.add(name, event_id, category, venue)
+        return profile
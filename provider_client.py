@@ -0,0 +1,145 @@
+# provider_client.py
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+DEFAULT_TIMEOUT = (3.05, 10)   # (connect, read) seconds
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5          # base delay, doubled on every attempt
+MAX_BACKOFF = 8.0
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class ProviderError(Exception):
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        # HTTP status of the failed response, when there was one
+        self.status = status
+
+
+# ----------------------------
+# Retry helpers
+# ----------------------------
+def parse_retry_after(value):
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt, base=DEFAULT_BACKOFF, cap=MAX_BACKOFF):
+    # "Full jitter": spread retries out so parallel sessions don't stampede
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+# ----------------------------
+# Pooled provider client
+# ----------------------------
+class ProviderClient:
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                 backoff=DEFAULT_BACKOFF, pool_size=20):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+        # Keep-alive connections are reused across searches and threads
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _attempt(self, url, params):
+        # Returns (data, retry_delay). retry_delay is None on success.
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, params=params, timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout) as exc:
+            metrics.count("upstream_responses", status="error")
+            return exc, -1.0
+        finally:
+            metrics.observe("upstream_request", time.perf_counter() - start)
+        metrics.count("upstream_responses", status=response.status_code)
+
+        if response.status_code in RETRY_STATUSES:
+            delay = parse_retry_after(response.headers.get("Retry-After"))
+            error = ProviderError(f"{url} returned HTTP {response.status_code}", response.status_code)
+            return error, (-1.0 if delay is None else delay)
+
+        if response.status_code >= 400:
+            raise ProviderError(f"{url} returned HTTP {response.status_code}", response.status_code)
+
+        try:
+            with metrics.timed("json_decode"):
+                return response.json(), None
+        except ValueError as exc:
+            raise ProviderError(f"{url} returned invalid JSON") from exc
+
+    def _next_delay(self, attempt, delay):
+        # A negative delay means "no Retry-After given, use backoff"
+        if delay < 0:
+            return backoff_delay(attempt, self.backoff)
+        return min(delay, MAX_BACKOFF)
+
+    def _hooked_attempt(self, url, params, before_attempt, last_error):
+        if before_attempt is not None:
+            params = before_attempt(params, last_error)
+        return self._attempt(url, params)
+
+    def get_json(self, url, params=None, before_attempt=None):
+        """
+        before_attempt(params, last_error) runs right before every attempt,
+        retries included, after any backoff, and returns the params to send
+        (rate_limit.KeyedClient takes a token and adds the API key there).
+        """
+        last_error = None
+        for attempt in range(self.retries + 1):
+            result, delay = self._hooked_attempt(url, params, before_attempt, last_error)
+            if delay is None:
+                return result
+            last_error = result
+            if attempt < self.retries:
+                time.sleep(self._next_delay(attempt, delay))
+        raise ProviderError(f"Giving up on {url} after {self.retries + 1} attempts") from last_error
+
+    async def aget_json(self, url, params=None, before_attempt=None):
+        # The pooled session does the I/O on a worker thread (the hook runs
+        # there too); waiting between retries happens on the event loop so
+        # no thread sits idle in a backoff sleep.
+        last_error = None
+        for attempt in range(self.retries + 1):
+            result, delay = await asyncio.to_thread(
+                self._hooked_attempt, url, params, before_attempt, last_error
+            )
+            if delay is None:
+                return result
+            last_error = result
+            if attempt < self.retries:
+                await asyncio.sleep(self._next_delay(attempt, delay))
+        raise ProviderError(f"Giving up on {url} after {self.retries + 1} attempts") from last_error
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
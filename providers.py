@@ -0,0 +1,273 @@
+# providers.py
+# Event providers and federated search.
+#
+# A provider turns a search (the Discovery-style params from
+# eventure.build_params, so cache keys and the search log stay as they
+# are) into Event records. FederatedSearch runs every provider at once on
+# a thread pool and yields events as they arrive, dropping duplicates by
+# normalized name, date and venue. Each provider has its own deadline: a
+# provider that misses it is left behind, so the slowest one no longer
+# sets the latency of the whole search.
+#
+#   ticketmaster   Discovery API (paged, see event_fetcher.py)
+#   local          the built-in city dataset in data.py
+#   jsonl          an offline file of Event records, one JSON object per line
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from event_fetcher import iter_records
+from event_record import Event
+from provider_client import ProviderError
+
+log = logging.getLogger("providers")
+
+REMOTE_DEADLINE = 8.0           # seconds, from the start of the search
+LOCAL_DEADLINE = 1.0
+WORKERS_PER_PROVIDER = 8        # concurrent searches each provider can serve
+PROVIDER_NAMES = ("ticketmaster", "local", "jsonl")
+
+_NOT_WORD = re.compile(r"[\W_]+")
+
+
+def normalize(text):
+    return _NOT_WORD.sub(" ", (text or "").casefold()).strip()
+
+
+def dedupe_key(event):
+    return normalize(event.name), event.local_date or "", normalize(event.venue)
+
+
+class SearchFilters:
+    """The parts of Discovery params the offline providers understand."""
+
+    def __init__(self, params):
+        self.city = normalize(params.get("city"))
+        self.keyword = normalize(params.get("keyword"))
+        segments = params.get("classificationName") or params.get("segmentName") or ""
+        self.segments = {normalize(s) for s in segments.split(",") if s.strip()}
+        self.start = (params.get("startDateTime") or "")[:10] or None
+        self.end = (params.get("endDateTime") or "")[:10] or None
+
+    def matches(self, event):
+        if self.keyword and self.keyword not in normalize(f"{event.name} {event.venue or ''}"):
+            return False
+        if self.segments and normalize(event.segment) not in self.segments:
+            return False
+        if self.start or self.end:
+            # Undated events can't be placed in the window
+            if not event.local_date:
+                return False
+            if self.start and event.local_date < self.start:
+                return False
+            if self.end and event.local_date > self.end:
+                return False
+        return True
+
+
+# ----------------------------
+# Providers
+# ----------------------------
+class Provider:
+    """Subclasses set `name` and `deadline` and implement search(params)."""
+
+    name = "provider"
+    deadline = LOCAL_DEADLINE
+
+    def search(self, params):
+        raise NotImplementedError
+
+
+class TicketmasterProvider(Provider):
+
+    name = "ticketmaster"
+
+    def __init__(self, client, url, max_pages=5, deadline=REMOTE_DEADLINE):
+        # `client` supplies the API key (rate_limit.KeyedClient) and retries
+        self.client = client
+        self.url = url
+        self.max_pages = max_pages
+        self.deadline = deadline
+
+    def search(self, params):
+        return iter_records(self.client, self.url, params, max_pages=self.max_pages)
+
+
+class LocalDatasetProvider(Provider):
+
+    name = "local"
+
+    def __init__(self, dataset=None, deadline=LOCAL_DEADLINE):
+        if dataset is None:
+            from data import events_data as dataset
+        self.deadline = deadline
+        # city -> Events, built once
+        self._events = {
+            normalize(city): tuple(
+                Event(
+                    id=f"local-{normalize(city).replace(' ', '-')}-{i}",
+                    name=item["name"],
+                    local_date=item.get("date"),
+                    venue=item.get("venue"),
+                    city=city.title(),
+                    segment=item.get("category"),
+                    url=item.get("url"),
+                )
+                for i, item in enumerate(items)
+            )
+            for city, items in dataset.items()
+        }
+
+    def search(self, params):
+        filters = SearchFilters(params)
+        return [event for event in self._events.get(filters.city, ()) if filters.matches(event)]
+
+
+class JsonlProvider(Provider):
+    """Events from a JSONL file of Event fields; re-read when the file changes."""
+
+    name = "jsonl"
+
+    def __init__(self, path, deadline=LOCAL_DEADLINE):
+        self.path = path
+        self.deadline = deadline
+        self._mtime = None
+        self._by_city = {}
+        self._lock = threading.Lock()
+
+    def search(self, params):
+        filters = SearchFilters(params)
+        return [event for event in self._events().get(filters.city, ()) if filters.matches(event)]
+
+    def _events(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return {}
+        with self._lock:
+            if mtime != self._mtime:
+                self._by_city = self._load()
+                self._mtime = mtime
+            return self._by_city
+
+    def _load(self):
+        fields = set(Event.__slots__)
+        by_city = {}
+        with open(self.path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    event = Event(**{k: v for k, v in record.items() if k in fields})
+                except (ValueError, TypeError) as exc:
+                    log.warning("%s:%d skipped: %s", self.path, line_no, exc)
+                    continue
+                by_city.setdefault(normalize(event.city), []).append(event)
+        return by_city
+
+
+def build_providers(names, client, url, max_pages=5, remote_deadline=REMOTE_DEADLINE,
+                    jsonl_path="events.jsonl"):
+    """Providers by name (see PROVIDER_NAMES), in the given order."""
+    factories = {
+        "ticketmaster": lambda: TicketmasterProvider(client, url, max_pages, remote_deadline),
+        "local": lambda: LocalDatasetProvider(),
+        "jsonl": lambda: JsonlProvider(jsonl_path),
+    }
+    unknown = [name for name in names if name not in factories]
+    if unknown:
+        raise ValueError(f"Unknown provider(s): {', '.join(unknown)}")
+    return [factories[name]() for name in names]
+
+
+# ----------------------------
+# Fan-out and merge
+# ----------------------------
+class FederatedSearch:
+
+    def __init__(self, providers, workers_per_provider=WORKERS_PER_PROVIDER):
+        self.providers = list(providers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, len(self.providers) * workers_per_provider),
+            thread_name_prefix="providers"
+        )
+
+    def search(self, params):
+        """
+        Merged, de-duplicated events from every provider, yielded as they
+        arrive. Raises ProviderError at the end if any provider failed or
+        missed its deadline; what was yielded before that still stands.
+        """
+        results = queue.Queue()
+        cancelled = threading.Event()
+        started = time.monotonic()
+        pending = {}
+        for provider in self.providers:
+            pending[provider.name] = started + provider.deadline
+            self._executor.submit(self._run, provider, params, results, cancelled)
+
+        seen = set()
+        failures = []
+        try:
+            while pending:
+                try:
+                    name, item, done = results.get(timeout=max(0.0, min(pending.values()) - time.monotonic()))
+                except queue.Empty:
+                    now = time.monotonic()
+                    for name in [n for n, deadline in pending.items() if deadline <= now]:
+                        del pending[name]
+                        failures.append(f"{name} timed out")
+                        metrics.count("provider_timeouts", provider=name)
+                    continue
+                if name not in pending:
+                    # Arrived after the provider's deadline
+                    continue
+                if done:
+                    del pending[name]
+                    if item is not None:
+                        failures.append(f"{name}: {item}")
+                    continue
+                key = dedupe_key(item)
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield item
+        finally:
+            # Also runs when the consumer stops early: stragglers stop too
+            cancelled.set()
+        if failures:
+            raise ProviderError("; ".join(failures))
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, provider, params, results, cancelled):
+        start = time.perf_counter()
+        events = None
+        try:
+            events = iter(provider.search(params))
+            for event in events:
+                if cancelled.is_set():
+                    break
+                results.put((provider.name, event, False))
+        except Exception as exc:
+            # A broken provider costs its own results, not the search
+            if not isinstance(exc, ProviderError):
+                log.exception("provider %s failed", provider.name)
+            metrics.count("provider_errors", provider=provider.name)
+            results.put((provider.name, exc, True))
+        else:
+            results.put((provider.name, None, True))
+        finally:
+            # Closes a paged fetch that was cut short (see event_fetcher.py)
+            close = getattr(events, "close", None)
+            if close is not None:
+                close()
+            metrics.observe(f"provider_{provider.name}", time.perf_counter() - start)
@@ -0,0 +1,188 @@
+# rate_limit.py
+# Shared upstream rate limiting for the Ticketmaster API keys.
+#
+# Budgets live in SQLite (api_quota), so the Streamlit app, the prefetch
+# worker and any other process draw from the same per-second token
+# bucket and per-day quota for each key.
+import hashlib
+import math
+import os
+import time
+
+from provider_client import ProviderError
+
+PER_SECOND = 5.0        # Discovery API default: 5 requests / second
+PER_DAY = 5000          # ... and 5000 requests / day
+BURST = 5.0
+
+PRIORITY_USER = 0
+PRIORITY_BACKGROUND = 1
+# Share of both budgets that only user-facing calls may use
+BACKGROUND_RESERVE = 0.2
+
+
+class RateLimited(ProviderError):
+    pass
+
+
+def key_id(api_key):
+    # Never store the key itself
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+def api_keys_from_env():
+    # API_KEYS="key1,key2" rotates between several keys; API_KEY still works
+    keys = os.getenv("API_KEYS") or os.getenv("API_KEY") or ""
+    return [key.strip() for key in keys.split(",") if key.strip()]
+
+
+def utc_day(now):
+    return time.strftime("%Y-%m-%d", time.gmtime(now))
+
+
+# ----------------------------
+# Limiter
+# ----------------------------
+class SharedRateLimiter:
+
+    def __init__(self, db, api_keys, per_second=PER_SECOND, per_day=PER_DAY, burst=BURST,
+                 background_reserve=BACKGROUND_RESERVE):
+        self.db = db
+        self.keys = [(key, key_id(key)) for key in api_keys if key]
+        if not self.keys:
+            raise ValueError("At least one API key is required")
+        self.per_second = per_second
+        self.per_day = per_day
+        self.burst = burst
+        self.background_reserve = background_reserve
+
+    def _state(self, row, now, today):
+        # Refill the bucket and roll the daily counter over lazily
+        if row is None:
+            return self.burst, today, 0
+        tokens, updated_at, day, used = row
+        tokens = min(self.burst, tokens + (now - updated_at) * self.per_second)
+        if day != today:
+            return tokens, today, 0
+        return tokens, day, used
+
+    def _limits(self, priority):
+        if priority == PRIORITY_USER:
+            return 1.0, self.per_day
+        return 1.0 + self.burst * self.background_reserve, self.per_day * (1 - self.background_reserve)
+
+    def try_acquire(self, priority=PRIORITY_USER, avoid=()):
+        """
+        Returns (api_key, 0) on success or (None, seconds_to_wait); inf means
+        out for today. Keys in `avoid` are only used when no other key can be.
+        """
+        now = time.time()
+        today = utc_day(now)
+        token_floor, day_limit = self._limits(priority)
+        ids = [kid for _, kid in self.keys]
+
+        with self.db.transaction() as conn:
+            rows = {
+                row[0]: row[1:]
+                for row in conn.execute(
+                    f"SELECT key_id, tokens, updated_at, day, day_count FROM api_quota "
+                    f"WHERE key_id IN ({','.join('?' * len(ids))})", ids
+                )
+            }
+
+            best = None
+            wait = math.inf
+            for key, kid in self.keys:
+                tokens, day, used = self._state(rows.get(kid), now, today)
+                if used >= day_limit:
+                    continue
+                if tokens >= token_floor:
+                    # Rotate towards the key with the most quota left today
+                    rank = (key in avoid, used)
+                    if best is None or rank < best[4]:
+                        best = (key, kid, tokens, used, rank)
+                else:
+                    wait = min(wait, (token_floor - tokens) / self.per_second)
+
+            if best is None:
+                return None, wait
+
+            key, kid, tokens, used, _ = best
+            conn.execute("""
+                INSERT INTO api_quota (key_id, tokens, updated_at, day, day_count)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(key_id) DO UPDATE SET
+                    tokens=excluded.tokens, updated_at=excluded.updated_at,
+                    day=excluded.day, day_count=excluded.day_count
+            """, (kid, tokens - 1, now, today, used + 1))
+            return key, 0.0
+
+    def acquire(self, priority=PRIORITY_USER, timeout=None, avoid=()):
+        """Wait (up to timeout) for a token; raises RateLimited when none comes."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            key, wait = self.try_acquire(priority, avoid)
+            if key is not None:
+                return key
+            if math.isinf(wait):
+                raise RateLimited("Daily API quota exhausted for every key")
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining < wait:
+                    raise RateLimited("Upstream request budget exhausted")
+            time.sleep(wait)
+
+    def remaining(self):
+        now = time.time()
+        today = utc_day(now)
+        result = []
+        for key, kid in self.keys:
+            row = self.db.fetchone(
+                "SELECT tokens, updated_at, day, day_count FROM api_quota WHERE key_id=?", (kid,)
+            )
+            tokens, _, used = self._state(row, now, today)
+            result.append({
+                "key": f"…{key[-4:]}",
+                "per_second": round(tokens, 2),
+                "today": max(0, self.per_day - used),
+            })
+        return result
+
+    def remaining_today(self):
+        return sum(entry["today"] for entry in self.remaining())
+
+
+# ----------------------------
+# Client wrapper
+# ----------------------------
+class KeyedClient:
+    """
+    Wraps a ProviderClient: every upstream attempt, retries included, takes
+    a token from the shared limiter once any backoff is over and is sent
+    with whichever key granted it. After a 429 the next attempt prefers
+    another key.
+    """
+
+    def __init__(self, client, limiter, priority=PRIORITY_USER, timeout=None):
+        self.client = client
+        self.limiter = limiter
+        self.priority = priority
+        self.timeout = timeout
+
+    def _before_attempt(self):
+        # One per request: remembers the key the previous attempt used
+        used = []
+
+        def before_attempt(params, last_error):
+            throttled = used[-1:] if getattr(last_error, "status", None) == 429 else ()
+            api_key = self.limiter.acquire(self.priority, self.timeout, avoid=tuple(throttled))
+            used.append(api_key)
+            return dict(params or {}, apikey=api_key)
+
+        return before_attempt
+
+    def get_json(self, url, params=None):
+        return self.client.get_json(url, params, before_attempt=self._before_attempt())
+
+    async def aget_json(self, url, params=None):
+        return await self.client.aget_json(url, params, before_attempt=self._before_attempt())
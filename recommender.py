@@ -0,0 +1,95 @@
+# recommender.py
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+CATEGORY_WEIGHT = 3.0
+NOT_SAVED_WEIGHT = 2.0
+KEYWORD_WEIGHT = 2.0
+VENUE_WEIGHT = 1.0
+RECENCY_WEIGHT = 1.0
+RECENCY_DAYS = 14   # events further out than this get no recency boost
+TOP_K = 5
+
+FRAME_COLUMNS = ["id", "name", "date", "url", "segment", "venue"]
+
+
+# ----------------------------
+# Columnar event frame
+# ----------------------------
+def events_frame(events):
+    rows = [
+        (event.id, event.name, event.local_date, event.url, event.segment, event.venue)
+        for event in events
+    ]
+    frame = pd.DataFrame.from_records(rows, columns=FRAME_COLUMNS)
+    frame["name_lower"] = frame["name"].str.lower()
+    frame["day"] = pd.to_datetime(frame["date"], errors="coerce")
+    return frame
+
+
+# ----------------------------
+# Vectorized scoring
+# ----------------------------
+def score_events(frame, category_weights, saved_names, keyword=None, today=None,
+                 saved_ids=(), venue_weights=None):
+    """
+    category_weights / venue_weights map a segment or venue name to a
+    0..1 preference (see profiles.UserProfile).
+    """
+    scores = np.zeros(len(frame))
+    if frame.empty:
+        return scores
+
+    category_match = frame["segment"].map(category_weights).fillna(0.0).to_numpy(dtype=float)
+    scores += CATEGORY_WEIGHT * category_match
+
+    if venue_weights:
+        venue_match = frame["venue"].map(venue_weights).fillna(0.0).to_numpy(dtype=float)
+        scores += VENUE_WEIGHT * venue_match
+
+    # isin hashes the saved sets once instead of scanning a list per event
+    saved = frame["name"].isin(set(saved_names)).to_numpy()
+    if saved_ids:
+        saved = saved | frame["id"].isin(set(saved_ids)).to_numpy()
+    scores += NOT_SAVED_WEIGHT * ~saved
+
+    if keyword:
+        matches = frame["name_lower"].str.contains(keyword.lower(), regex=False)
+        scores += KEYWORD_WEIGHT * matches.to_numpy()
+
+    today = pd.Timestamp(today or datetime.utcnow().date())
+    days_away = (frame["day"] - today).dt.days.to_numpy(dtype=float, na_value=np.nan)
+    boost = np.clip(1.0 - days_away / RECENCY_DAYS, 0.0, 1.0)
+    boost[np.isnan(boost) | (days_away < 0)] = 0.0
+    scores += RECENCY_WEIGHT * boost
+
+    return scores
+
+
+def top_k(scores, k=TOP_K):
+    """Indices of the k best positive scores, best first; ties keep input order."""
+    candidates = np.flatnonzero(scores > 0)
+    if len(candidates) == 0:
+        return candidates
+    if len(candidates) > k:
+        # O(n) selection; only the k winners are sorted. argpartition finds
+        # the cutoff score, and ties at the cutoff go to the earliest events
+        values = scores[candidates]
+        cutoff = values[np.argpartition(-values, k - 1)[k - 1]]
+        above = candidates[values > cutoff]
+        tied = candidates[values == cutoff][:k - len(above)]
+        candidates = np.sort(np.concatenate([above, tied]))
+    order = np.argsort(-scores[candidates], kind="stable")
+    return candidates[order]
+
+
+def recommend(frame, category_weights, saved_names, keyword=None, k=TOP_K, today=None,
+              saved_ids=(), venue_weights=None):
+    scores = score_events(frame, category_weights, saved_names, keyword, today,
+                          saved_ids, venue_weights)
+    picks = top_k(scores, k)
+    result = frame.iloc[picks].copy()
+    result["score"] = scores[picks]
+    return result
@@ -0,0 +1,141 @@
+# reminders.py
+# Saved-event reminders and share links.
+#
+# saved_events.event_day is date(event_date), a generated column: a real
+# YYYY-MM-DD day, or NULL for values like "N/A". It is indexed, so
+# "which saved events are today or tomorrow" is a range scan in SQL
+# instead of parsing every saved date on every rerun. Share links are
+# built once, when an event is saved.
+#
+# "Today" is always the UTC day (utc_today()), passed in explicitly, so
+# the batch job, the app and the API agree on which rows are due.
+#
+# The batch job marks reminders as due (saved_events.reminded_at), once
+# per saved event, and fills in share links for rows written without them
+# (e.g. by bulk.py):
+#
+#   python reminders.py            # one pass
+#   python reminders.py --loop     # a pass every REMINDER_INTERVAL seconds
+import argparse
+import logging
+import os
+import time
+import urllib.parse
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import metrics
+
+log = logging.getLogger("reminders")
+
+REMIND_DAYS = 1                 # today and tomorrow
+INTERVAL_SECONDS = 3600
+SHARE_BATCH = 10_000
+
+UPCOMING = """
+    SELECT event_name, event_day
+    FROM saved_events
+    WHERE user_id=? AND event_day BETWEEN ? AND ?
+    ORDER BY event_day
+"""
+MARK_DUE = """
+    UPDATE saved_events SET reminded_at=?
+    WHERE event_day BETWEEN ? AND ? AND reminded_at IS NULL
+    RETURNING user_id, event_name, event_day
+"""
+MISSING_SHARE_LINKS = """
+    SELECT id, event_name, event_date, event_url
+    FROM saved_events
+    WHERE id > ? AND share_whatsapp IS NULL
+    ORDER BY id
+    LIMIT ?
+"""
+
+
+def share_links(name, date_str, url):
+    """(WhatsApp, Twitter) links for a saved event."""
+    whatsapp = urllib.parse.quote(f"Check out this event: {name} on {date_str}. {url}")
+    tweet = urllib.parse.quote(f"Check out this event: {name} on {date_str} {url}")
+    return (
+        f"https://wa.me/?text={whatsapp}",
+        f"https://twitter.com/intent/tweet?text={tweet}",
+    )
+
+
+def utc_today():
+    return datetime.now(timezone.utc).date()
+
+
+def reminder_window(today, days=REMIND_DAYS):
+    return today.isoformat(), (today + timedelta(days=days)).isoformat()
+
+
+def upcoming(db, user_id, today, days=REMIND_DAYS):
+    """(event_name, event_day) for a user's saved events in the reminder window."""
+    return db.fetchall(UPCOMING, (user_id, *reminder_window(today, days)))
+
+
+# ----------------------------
+# Batch job
+# ----------------------------
+def mark_due(db, today, days=REMIND_DAYS, now=None):
+    """Mark reminders that just became due; returns the (user_id, name, day) rows."""
+    with db.transaction() as conn:
+        rows = conn.execute(MARK_DUE, (now or time.time(), *reminder_window(today, days))).fetchall()
+    metrics.count("reminders_marked", len(rows))
+    return rows
+
+
+def fill_share_links(db, batch=SHARE_BATCH):
+    """Build share links for rows saved without them; returns how many were filled."""
+    filled = 0
+    last_id = 0
+    while True:
+        # Resumes after the last batch instead of rescanning from the start
+        rows = db.fetchall(MISSING_SHARE_LINKS, (last_id, batch))
+        if not rows:
+            return filled
+        with db.transaction() as conn:
+            conn.executemany(
+                "UPDATE saved_events SET share_whatsapp=?, share_twitter=? WHERE id=?",
+                [(*share_links(name, day, url), row_id) for row_id, name, day, url in rows]
+            )
+        filled += len(rows)
+        last_id = rows[-1][0]
+
+
+def run_once(db, today):
+    due = mark_due(db, today)
+    if due:
+        # Delivery (email, push) plugs in here; for now the job reports them
+        per_user = Counter(user_id for user_id, _, _ in due)
+        log.info("%d reminders due for %d users", len(due), len(per_user))
+    filled = fill_share_links(db)
+    if filled:
+        log.info("filled share links for %d saved events", filled)
+    return len(due)
+
+
+if __name__ == "__main__":
+    from database import Database
+    from migrations import migrate
+
+    parser = argparse.ArgumentParser(description="Mark due saved-event reminders")
+    parser.add_argument("--db", default=os.getenv("EVENTURE_DB", "event_finder.db"))
+    parser.add_argument("--loop", action="store_true", help="keep running, one pass per interval")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    db = Database(args.db)
+    with db.connection() as conn:
+        migrate(conn)
+    interval = int(os.getenv("REMINDER_INTERVAL", str(INTERVAL_SECONDS)))
+    try:
+        while True:
+            log.info("marked %d reminders", run_once(db, utc_today()))
+            if not args.loop:
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    db.close()
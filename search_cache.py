@@ -0,0 +1,127 @@
+# search_cache.py
+import json
+import threading
+import time
+
+from lru import LRUCache
+
+DEFAULT_TTL = 600           # seconds a cached search stays fresh
+DEFAULT_MAX_ENTRIES = 256   # in-memory LRU size
+
+# Params that are free text and should match regardless of case / spacing
+TEXT_PARAMS = ("city", "keyword", "classificationName", "segmentName")
+# Params that are timestamps; bucketed to the day so near-identical
+# windows share one cache entry
+DATE_PARAMS = ("startDateTime", "endDateTime")
+# Params that never change the result set
+IGNORED_PARAMS = ("apikey",)
+
+
+# ----------------------------
+# Cache key normalization
+# ----------------------------
+def normalize_params(params):
+    key = {}
+    for name, value in params.items():
+        if name in IGNORED_PARAMS or value is None or value == "":
+            continue
+        if name in TEXT_PARAMS:
+            value = " ".join(str(value).split()).casefold()
+        elif name in DATE_PARAMS:
+            value = str(value)[:10]
+        key[name] = value
+    return json.dumps(key, sort_keys=True)
+
+
+# ----------------------------
+# TTL + LRU search cache
+# ----------------------------
+class SearchCache:
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, db=None,
+                 dumps=json.dumps, loads=json.loads):
+        self.ttl = ttl
+        self.db = db
+        # How values are (de)serialized for the SQLite layer
+        self.dumps = dumps
+        self.loads = loads
+        self.hits = 0
+        self.misses = 0
+        self._entries = LRUCache(max_entries)
+        self._lock = threading.Lock()       # guards the hit / miss counters
+
+        if db is not None:
+            with db.connection() as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS search_cache (
+                        cache_key TEXT PRIMARY KEY,
+                        payload TEXT NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                """)
+
+    def get(self, key):
+        value = self._entries.get(key)
+        if value is None:
+            entry = self._load(key, time.time())
+            if entry is None:
+                with self._lock:
+                    self.misses += 1
+                return None
+            value = self._entries.set(key, entry[1], expires_at=entry[0])
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        expires_at = time.time() + self.ttl
+        self._entries.set(key, value, expires_at=expires_at)
+        self._store(key, value, expires_at)
+
+    def expires_at(self, key):
+        """When the entry for key expires (0 if there is none); doesn't count as a hit."""
+        expires_at = self._entries.expires_at(key)
+        if not expires_at:
+            entry = self._load(key, time.time())
+            expires_at = entry[0] if entry else 0.0
+        return expires_at
+
+    def clear(self):
+        self._entries.clear()
+        if self.db is not None:
+            self.db.write("DELETE FROM search_cache")
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+            }
+
+    # ----------------------------
+    # Optional SQLite persistence
+    # ----------------------------
+    def _load(self, key, now):
+        if self.db is None:
+            return None
+        row = self.db.fetchone(
+            "SELECT payload, expires_at FROM search_cache WHERE cache_key=? AND expires_at>?",
+            (key, now)
+        )
+        if row is None:
+            return None
+        return row[1], self.loads(row[0])
+
+    def _store(self, key, value, expires_at):
+        if self.db is None:
+            return
+        # Fire and forget: the in-memory entry already serves this process
+        self.db.submit_write(
+            "INSERT OR REPLACE INTO search_cache (cache_key, payload, expires_at) VALUES (?, ?, ?)",
+            (key, self.dumps(value), expires_at)
+        )
+        # Drop anything that has gone stale so the table doesn't grow forever
+        self.db.submit_write("DELETE FROM search_cache WHERE expires_at<=?", (time.time(),))
@@ -0,0 +1,106 @@
+# singleflight.py
+# Process-wide request coalescing ("single-flight"). Concurrent identical
+# searches share one upstream fetch, which runs on a background thread so
+# that no single Streamlit session (which may be interrupted by a rerun)
+# owns it. Every caller streams the same items as they arrive.
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_CONCURRENT_FETCHES = 8
+
+
+class SharedFetch:
+
+    def __init__(self):
+        self._items = []
+        self._done = False
+        self._error = None
+        self._result = None
+        self._cond = threading.Condition()
+
+    def append(self, item):
+        with self._cond:
+            self._items.append(item)
+            self._cond.notify_all()
+
+    def finish(self, error=None):
+        with self._cond:
+            self._done = True
+            self._error = error
+            self._result = tuple(self._items)
+            self._cond.notify_all()
+
+    def __iter__(self):
+        position = 0
+        while True:
+            with self._cond:
+                while position >= len(self._items) and not self._done:
+                    self._cond.wait()
+                if position < len(self._items):
+                    # Hand out everything that has arrived since the last wake-up
+                    batch = self._items[position:]
+                    position = len(self._items)
+                elif self._error is not None:
+                    raise self._error
+                else:
+                    return
+            yield from batch
+
+    def result(self):
+        """The complete, immutable result (waits for the fetch to finish)."""
+        with self._cond:
+            while not self._done:
+                self._cond.wait()
+            if self._error is not None:
+                raise self._error
+            return self._result
+
+
+class SingleFlight:
+
+    def __init__(self, max_workers=MAX_CONCURRENT_FETCHES):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="singleflight")
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.started = 0
+        self.joined = 0
+
+    def fetch(self, key, produce, on_complete=None):
+        """
+        Return the SharedFetch for `key`, starting `produce()` (an iterable
+        factory) only if no identical fetch is already running.
+        `on_complete(result)` runs once, before the key is released, so
+        a later caller either joins this fetch or sees its cached result.
+        """
+        with self._lock:
+            shared = self._inflight.get(key)
+            if shared is not None:
+                self.joined += 1
+                return shared
+            shared = SharedFetch()
+            self._inflight[key] = shared
+            self.started += 1
+        self._executor.submit(self._run, key, shared, produce, on_complete)
+        return shared
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._inflight)
+
+    def _run(self, key, shared, produce, on_complete):
+        try:
+            for item in produce():
+                shared.append(item)
+        except Exception as exc:
+            shared.finish(exc)
+        else:
+            shared.finish()
+            if on_complete is not None:
+                try:
+                    on_complete(shared.result())
+                except Exception:
+                    # Caching is best effort; the fetched result is still served
+                    pass
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
@@ -0,0 +1,145 @@
+# stub_server.py
+# Local stand-in for the Ticketmaster Discovery API, for tests and offline runs.
+#
+#   python stub_server.py --port 8765
+#   TICKETMASTER_URL=http://127.0.0.1:8765/discovery/v2/events.json streamlit run app.py
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+EVENTS_PATH = "/discovery/v2/events.json"
+
+
+def sample_event(i, city="New York"):
+    return {
+        "id": f"stub-{i}",
+        "name": f"Stub Event {i}",
+        "url": f"https://example.com/event/{i}",
+        "images": [{"url": f"https://example.com/img/{i}.jpg", "width": 640, "height": 360}],
+        "dates": {"start": {"localDate": "2026-06-01"}},
+        "classifications": [{"segment": {"name": "Music"}}],
+        "_embedded": {
+            "venues": [{
+                "id": f"venue-{i % 5}",
+                "name": f"Stub Venue {i % 5}",
+                "city": {"name": city},
+                "location": {"latitude": "40.7128", "longitude": "-74.0060"}
+            }]
+        }
+    }
+
+
+def sample_payload(city="New York", size=20, page=0, total=20):
+    start = page * size
+    count = max(0, min(size, total - start))
+    total_pages = (total + size - 1) // size if size else 0
+    payload = {"page": {"size": size, "totalElements": total, "totalPages": total_pages, "number": page}}
+    if count:
+        payload["_embedded"] = {"events": [sample_event(start + i, city) for i in range(count)]}
+    return payload
+
+
+# ----------------------------
+# Server
+# ----------------------------
+class StubServer:
+    """
+    Serves generated Discovery payloads. `script` is an optional list of
+    (status, headers, body) tuples returned, in order, before falling back
+    to the generated payload - handy for exercising retries. `payload`
+    replaces the generator (same signature as sample_payload).
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, total=20, script=None, delay=0.0,
+                 payload=sample_payload):
+        self.total = total
+        self.payload = payload
+        self.script = list(script or [])
+        self.delay = delay
+        self.requests = []
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{EVENTS_PATH}"
+
+    def _next_scripted(self):
+        with self._lock:
+            return self.script.pop(0) if self.script else None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                with server._lock:
+                    server.requests.append(query)
+
+                if server.delay:
+                    threading.Event().wait(server.delay)
+
+                scripted = server._next_scripted()
+                if scripted:
+                    status, headers, body = scripted
+                elif parsed.path != EVENTS_PATH:
+                    status, headers, body = 404, {}, {"fault": "not found"}
+                else:
+                    body = server.payload(
+                        city=query.get("city", "New York"),
+                        size=int(query.get("size", 20)),
+                        page=int(query.get("page", 0)),
+                        total=server.total
+                    )
+                    status, headers = 200, {}
+
+                raw = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local Ticketmaster Discovery stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--total", type=int, default=200, help="events available per search")
+    args = parser.parse_args()
+
+    stub = StubServer(args.host, args.port, total=args.total)
+    print(f"Serving stub Discovery API at {stub.url}")
+    try:
+        stub._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
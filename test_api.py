@@ -1,8 +1,14 @@
+import os
+
 import requests
+from dotenv import load_dotenv
+
+load_dotenv()
 
-API_KEY = "XBAWKJdieqgwKIDlZdvUNRGAwLI4Dq3e"
+# Point TICKETMASTER_URL at benchmarks/fake_discovery.py to try this offline
+API_KEY = os.getenv("API_KEY", "")
 city = "New York"
-url = "https://app.ticketmaster.com/discovery/v2/events.json"
+url = os.getenv("TICKETMASTER_URL", "https://app.ticketmaster.com/discovery/v2/events.json")
 params = {"apikey": API_KEY, "city": city, "size": 5}
 
 response = requests.get(url, params=params)
@@ -16,4 +22,4 @@ if "_embedded" in data:
         venue = event["_embedded"]["venues"][0]["name"]
         print(f"{name} | {date} | {venue}")
 else:
-    print("No events found.")
\ No newline at end of file
+    print("No events found.")
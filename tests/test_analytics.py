@@ -0,0 +1,62 @@
+# tests/test_analytics.py
+# Result-set aggregates and the memo key shared with geo, frames and the API.
+from dataclasses import replace
+
+import analytics
+from analytics import aggregates, compute_aggregates, result_set_key
+from event_record import Event
+
+
+def events():
+    return [
+        Event("e1", "One", "2026-06-02", "Hall", segment="Music"),
+        Event("e2", "Two", "2026-06-01", "Hall", segment="Sports"),
+        Event("e3", "Three", "2026-06-01", "Arena", segment="Music"),
+        Event("e4", "Four"),
+    ]
+
+
+def test_compute_aggregates():
+    result = compute_aggregates(events())
+    assert result["total"] == 4
+    assert result["categories"] == {"Music": 2, "Sports": 1}
+    assert list(result["dates"]) == ["2026-06-01", "2026-06-02"]
+    assert result["top_venues"] == {"Hall": 2, "Arena": 1}
+
+
+def test_same_results_share_a_key():
+    assert result_set_key(events()) == result_set_key(events())
+    assert hash(result_set_key(events())) == hash(result_set_key(events()))
+
+
+def test_changed_fields_under_the_same_id_change_the_key():
+    before = events()
+    for field, value in [("local_date", "2026-07-01"), ("venue", "Moved"), ("segment", "Arts")]:
+        after = before[:1] + [replace(before[1], **{field: value})] + before[2:]
+        assert result_set_key(after) != result_set_key(before)
+
+
+def test_order_matters():
+    assert result_set_key(events()) != result_set_key(events()[::-1])
+
+
+def test_aggregates_are_memoized(monkeypatch):
+    calls = []
+    compute = analytics.compute_aggregates
+
+    def counted(evts):
+        calls.append(len(evts))
+        return compute(evts)
+
+    monkeypatch.setattr(analytics, "compute_aggregates", counted)
+    analytics._memo.clear()
+    assert aggregates(events()) is aggregates(events())
+    assert len(calls) == 1
+
+
+def test_stale_aggregates_are_not_served():
+    analytics._memo.clear()
+    before = events()
+    assert aggregates(before)["categories"]["Sports"] == 1
+    after = before[:1] + [replace(before[1], segment="Music")] + before[2:]
+    assert aggregates(after)["categories"] == {"Music": 3}
@@ -0,0 +1,233 @@
+# tests/test_api.py
+# The ASGI JSON API, driven in-process over the offline "local" provider.
+import asyncio
+import base64
+import gzip
+import json
+
+import pytest
+
+from eventure import api as api_module
+from eventure.api import API, accepts_gzip, etag_matches
+from eventure.config import Settings
+from eventure.services import Services
+
+FAST_N = 2 ** 8
+# The built-in dataset has one Food event in Delhi
+SEARCH = "city=delhi&category=Food"
+
+
+@pytest.fixture
+def services(tmp_path):
+    services = Services(Settings(
+        db_path=str(tmp_path / "test.db"), providers=["local"],
+        password_hash_n=FAST_N, password_hash_workers=1,
+    ))
+    services.users.create("alice", "alice@example.com", "secret")
+    yield services
+    services.close()
+
+
+@pytest.fixture
+def call(services):
+    app = API(services)
+
+    def call(method, path, query="", body=None, headers=()):
+        sent = []
+        data = body if isinstance(body, bytes) else (json.dumps(body).encode() if body is not None else b"")
+
+        async def receive():
+            return {"type": "http.request", "body": data, "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http", "method": method, "path": path, "query_string": query.encode(),
+            "headers": [(k.encode(), v.encode()) for k, v in headers],
+        }
+        asyncio.run(asyncio.wait_for(app(scope, receive, send), 10))
+        start, body_message = sent
+        response_headers = {k.decode(): v.decode() for k, v in start["headers"]}
+        return start["status"], response_headers, body_message["body"]
+
+    return call
+
+
+def basic(username="alice", password="secret"):
+    return ("authorization", "Basic " + base64.b64encode(f"{username}:{password}".encode()).decode())
+
+
+def bearer(token):
+    return ("authorization", f"Bearer {token}")
+
+
+# ----------------------------
+# Header helpers
+# ----------------------------
+def test_etag_matches():
+    assert etag_matches('W/"abc"', 'W/"abc"')
+    assert etag_matches('"abc"', 'W/"abc"')
+    assert etag_matches('"x", W/"abc"', 'W/"abc"')
+    assert etag_matches("*", 'W/"abc"')
+    assert not etag_matches('"abd"', 'W/"abc"')
+    assert not etag_matches(None, 'W/"abc"')
+
+
+def test_accepts_gzip():
+    assert accepts_gzip("gzip, deflate")
+    assert accepts_gzip("br;q=1.0, gzip;q=0.5")
+    assert accepts_gzip("*")
+    assert not accepts_gzip("gzip;q=0")
+    assert not accepts_gzip("deflate")
+    assert not accepts_gzip(None)
+
+
+# ----------------------------
+# Routing and search
+# ----------------------------
+def test_health_and_routing(call):
+    assert call("GET", "/health")[0] == 200
+    assert call("GET", "/nope")[0] == 404
+    assert call("PUT", "/health")[0] == 405
+
+
+def test_search_requires_city_and_valid_dates(call):
+    status, _, body = call("GET", "/search")
+    assert status == 400
+    assert json.loads(body) == {"error": "city is required"}
+    assert call("GET", "/search", "city=delhi&start_date=tomorrow")[0] == 400
+
+
+def test_search_reports_source_and_caches(call):
+    status, headers, body = call("GET", "/search", SEARCH)
+    assert status == 200
+    assert headers["x-result-source"] == "upstream"
+    assert headers["cache-control"] == "public, max-age=60"
+    payload = json.loads(body)
+    assert payload["count"] == len(payload["events"]) > 0
+
+    status, again, body_again = call("GET", "/search", SEARCH)
+    assert again["x-result-source"] == "cache"
+    assert body_again == body
+    assert again["etag"] == headers["etag"]
+
+
+def test_offline_search(call, services):
+    assert json.loads(call("GET", "/search", SEARCH + "&offline=1")[2])["count"] == 0
+    # Upstream results reach the offline index in the background
+    call("GET", "/search", SEARCH)
+    services.ingestor.join()
+    status, headers, body = call("GET", "/search", SEARCH + "&offline=1")
+    assert status == 200
+    assert headers["x-result-source"] == "offline"
+    assert json.loads(body)["count"] > 0
+
+
+def test_if_none_match_returns_304(call):
+    _, headers, _ = call("GET", "/search", SEARCH)
+    status, not_modified, body = call("GET", "/search", SEARCH, headers=[("if-none-match", headers["etag"])])
+    assert status == 304
+    assert body == b""
+    assert not_modified["etag"] == headers["etag"]
+    assert call("GET", "/search", SEARCH, headers=[("if-none-match", 'W/"stale"')])[0] == 200
+
+
+def test_gzip_only_when_accepted(call, monkeypatch):
+    monkeypatch.setattr(api_module, "GZIP_MIN_BYTES", 1)
+    _, plain_headers, plain = call("GET", "/search", SEARCH)
+    assert "content-encoding" not in plain_headers
+
+    _, headers, body = call("GET", "/search", SEARCH, headers=[("accept-encoding", "gzip")])
+    assert headers["content-encoding"] == "gzip"
+    assert headers["content-length"] == str(len(body))
+    assert gzip.decompress(body) == plain
+    # The ETag names the representation before compression
+    assert headers["etag"] == plain_headers["etag"]
+
+
+def test_small_bodies_are_not_gzipped(call):
+    _, headers, _ = call("GET", "/health", headers=[("accept-encoding", "gzip")])
+    assert "content-encoding" not in headers
+
+
+# ----------------------------
+# Authentication
+# ----------------------------
+def test_saved_requires_auth(call):
+    status, headers, _ = call("GET", "/saved")
+    assert status == 401
+    assert headers["www-authenticate"].startswith("Basic")
+    assert call("GET", "/saved", headers=[basic(password="wrong")])[0] == 401
+    assert call("GET", "/saved", headers=[("authorization", "Basic %%%")])[0] == 401
+    assert call("GET", "/saved", headers=[basic()])[0] == 200
+
+
+def test_session_token_lifecycle(call):
+    status, _, body = call("POST", "/sessions", headers=[basic()])
+    assert status == 201
+    session = json.loads(body)
+    assert session["expires_in"] > 0
+    token = session["token"]
+
+    assert call("GET", "/saved", headers=[bearer(token)])[0] == 200
+    assert call("DELETE", "/sessions", headers=[bearer(token)])[0] == 200
+    status, headers, _ = call("GET", "/saved", headers=[bearer(token)])
+    assert status == 401
+    assert headers["www-authenticate"].startswith("Bearer")
+
+
+def test_sessions_need_basic_auth(call):
+    token = json.loads(call("POST", "/sessions", headers=[basic()])[2])["token"]
+    # A token can't mint another token
+    assert call("POST", "/sessions", headers=[bearer(token)])[0] == 401
+    assert call("DELETE", "/sessions", headers=[basic()])[0] == 401
+
+
+# ----------------------------
+# Saved events
+# ----------------------------
+@pytest.mark.parametrize("body, error", [
+    ([1], "Body must be a JSON object"),
+    ({"name": "X", "date": ["2030-01-01"]}, "date must be a string"),
+    ({"name": "X", "event_id": 10 ** 30}, "event_id must be a string"),
+    ({"name": "x" * 301}, "name must be at most 300 characters"),
+    ({"venue": "Hall"}, "name is required"),
+])
+def test_save_validation(call, body, error):
+    status, _, response = call("POST", "/saved", body=body, headers=[basic()])
+    assert status == 400
+    assert json.loads(response) == {"error": error}
+
+
+def test_save_rejects_bad_json_and_large_bodies(call):
+    assert call("POST", "/saved", body=b"{not json", headers=[basic()])[0] == 400
+    big = json.dumps({"name": "x" * (api_module.MAX_BODY_BYTES + 1)}).encode()
+    assert call("POST", "/saved", body=big, headers=[basic()])[0] == 413
+
+
+def test_save_and_list(call):
+    event = {"name": "Jazz Night", "date": "2030-01-01", "venue": "Hall", "event_id": "e1", "city": "Delhi"}
+    status, _, body = call("POST", "/saved", body=event, headers=[basic()])
+    assert status == 201
+    assert json.loads(body) == {"saved": True}
+    # Saving the same event again is not an error
+    status, _, body = call("POST", "/saved", body=event, headers=[basic()])
+    assert status == 200
+    assert json.loads(body) == {"saved": False}
+
+    status, headers, body = call("GET", "/saved", headers=[basic()])
+    assert status == 200
+    assert headers["cache-control"] == "private, no-cache"
+    saved = json.loads(body)
+    assert saved["count"] == 1
+    assert saved["saved"][0]["name"] == "Jazz Night"
+    assert set(saved["saved"][0]["share"]) == {"whatsapp", "twitter"}
+
+
+def test_recommendations(call):
+    assert call("GET", "/recommendations", SEARCH)[0] == 401
+    status, _, body = call("GET", "/recommendations", SEARCH, headers=[basic()])
+    assert status == 200
+    payload = json.loads(body)
+    assert payload["count"] == len(payload["recommendations"])
@@ -0,0 +1,139 @@
+# tests/test_assistant.py
+# Phrase matching, query parsing and answers of the chat assistant.
+from datetime import date
+
+import pytest
+
+from assistant import Assistant, PhraseTrie, date_range, tokenize
+from database import Database
+from event_index import EventIndex
+from event_record import Event
+
+FRIDAY = date(2026, 5, 1)
+SUNDAY = date(2026, 5, 3)
+
+EVENTS = (
+    Event(id="1", name="Jazz Night", local_date="2026-05-02", venue="Blue Note", city="Boston",
+          segment="Music", url="https://e/1"),
+    Event(id="2", name="Celtics Game", local_date="2026-05-05", venue="Garden", city="Boston", segment="Sports"),
+    Event(id="3", name="Hamilton", local_date="2026-05-01", venue="Opera House", city="Boston",
+          segment="Arts & Theatre"),
+    Event(id="4", name="Rock Show", local_date=None, venue="Paradise", city="Boston", segment="Music"),
+)
+
+
+@pytest.fixture
+def assistant():
+    return Assistant(cities=["Boston", "New York"])
+
+
+def test_tokenize():
+    assert tokenize("What’s on in NEW YORK?") == ["what's", "on", "in", "new", "york"]
+    assert tokenize(None) == []
+
+
+@pytest.mark.parametrize("phrase, today, expected", [
+    ("today", FRIDAY, (FRIDAY, FRIDAY)),
+    ("tomorrow", FRIDAY, (date(2026, 5, 2), date(2026, 5, 2))),
+    ("this weekend", FRIDAY, (date(2026, 5, 2), date(2026, 5, 3))),
+    ("this weekend", SUNDAY, (SUNDAY, SUNDAY)),
+    ("next weekend", FRIDAY, (date(2026, 5, 9), date(2026, 5, 10))),
+    ("this week", FRIDAY, (FRIDAY, SUNDAY)),
+    ("next week", FRIDAY, (date(2026, 5, 4), date(2026, 5, 10))),
+    ("this month", FRIDAY, (FRIDAY, date(2026, 5, 31))),
+    ("next month", date(2026, 12, 15), (date(2027, 1, 1), date(2027, 1, 31))),
+    ("friday", FRIDAY, (FRIDAY, FRIDAY)),
+    ("monday", FRIDAY, (date(2026, 5, 4), date(2026, 5, 4))),
+])
+def test_date_range(phrase, today, expected):
+    assert date_range(phrase, today) == expected
+
+
+def test_trie_prefers_the_longest_match():
+    trie = PhraseTrie()
+    trie.add("live", "short")
+    trie.add("live music", "long")
+    trie.add("music", "word")
+    assert trie.scan(tokenize("any live music or live shows")) == [(1, 3, "long"), (4, 5, "short")]
+
+
+def test_trie_keeps_existing_values_when_asked():
+    trie = PhraseTrie()
+    trie.add("orange", "fruit")
+    trie.add("orange", "city", replace=False)
+    assert trie.scan(["orange"]) == [(0, 1, "fruit")]
+
+
+# ----------------------------
+# Parsing
+# ----------------------------
+def test_parse(assistant):
+    query = assistant.parse("How many concerts in New York this weekend?", FRIDAY)
+    assert query.intents == {"count"}
+    assert (query.category, query.city, query.date_phrase) == ("Music", "New York", "this weekend")
+    assert (query.start, query.end) == (date(2026, 5, 2), date(2026, 5, 3))
+    assert query.terms == []
+
+
+def test_parse_unknown_city_and_terms(assistant):
+    query = assistant.parse("jazz near springfield", FRIDAY)
+    assert query.city == "Springfield"
+    assert query.terms == ["jazz"]
+
+
+# ----------------------------
+# Answers
+# ----------------------------
+def test_small_talk(assistant):
+    assert assistant.reply("hello").startswith("Hi!")
+    assert "Save" in assistant.reply("how do I save an event?")
+    assert assistant.reply("thanks") == "You're welcome! 🎉"
+
+
+def test_needs_a_city(assistant):
+    assert assistant.reply("any concerts?").startswith("Search for a city first")
+
+
+def test_count_and_list(assistant):
+    assert assistant.reply("how many music events?", EVENTS, "Boston", FRIDAY) == \
+        "There are **2** music events in Boston."
+    answer = assistant.reply("concerts this weekend", EVENTS, "Boston", FRIDAY)
+    assert answer.splitlines() == [
+        "I found **1** music event in Boston this weekend:",
+        "- **[Jazz Night](https://e/1)** — 2026-05-02, Blue Note",
+    ]
+
+
+def test_next_skips_undated_events(assistant):
+    assert assistant.reply("next concert", EVENTS, "Boston", FRIDAY).startswith("Next up: **[Jazz Night]")
+
+
+def test_when_and_where(assistant):
+    assert assistant.reply("when is hamilton?", EVENTS, "Boston", FRIDAY) == \
+        "**Hamilton** — 2026-05-01, Opera House"
+    assert assistant.reply("when is it?", EVENTS, "Boston", FRIDAY).startswith("Which event?")
+
+
+def test_nothing_found(assistant):
+    assert assistant.reply("sports events tomorrow", EVENTS, "Boston", FRIDAY).startswith(
+        "I couldn't find any sports events in Boston tomorrow"
+    )
+
+
+def test_other_cities_come_from_the_index(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    try:
+        index = EventIndex(db)
+        index.upsert([Event(id="ny1", name="Broadway Jazz", local_date="2026-05-02", venue="Birdland",
+                            city="New York", segment="Music")])
+        assistant = Assistant(index, cities=[])
+        # New York is learned from the index, so it needs no "in"
+        answer = assistant.reply("jazz new york", EVENTS, "Boston", FRIDAY)
+        assert answer.startswith("I found **1** event matching “jazz” in New York:")
+        assert "Broadway Jazz" in answer
+        # Without an index, another city has no answers
+        assert Assistant(cities=[]).reply("jazz in Chicago", EVENTS, "Boston", FRIDAY).startswith(
+            "I couldn't find any"
+        )
+    finally:
+        db.close()
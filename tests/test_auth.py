@@ -0,0 +1,190 @@
+# tests/test_auth.py
+# scrypt hashes, session tokens and the legacy-password upgrade paths.
+import sqlite3
+import time
+
+import pytest
+
+import auth
+from auth import PasswordHasher, SessionStore, hash_password, is_hashed, token_key, verify_password
+from bulk import main as bulk_main
+from database import Database
+from eventure.repository import UserRepository
+from migrations import migrate
+
+FAST_N = 2 ** 8     # cheap scrypt cost so the suite stays quick
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    with db.connection() as conn:
+        migrate(conn)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def passwords():
+    hasher = PasswordHasher(n=FAST_N)
+    yield hasher
+    hasher.close()
+
+
+def add_user(db, username, password, legacy=0):
+    db.write(
+        "INSERT INTO users (username, email, password, password_legacy) VALUES (?, ?, ?, ?)",
+        (username, f"{username}@example.com", password, legacy)
+    )
+    return db.fetchone("SELECT id FROM users WHERE username=?", (username,))[0]
+
+
+# ----------------------------
+# Password hashes
+# ----------------------------
+def test_hash_round_trip():
+    stored = hash_password("s3cret", n=FAST_N)
+    assert is_hashed(stored)
+    assert stored.split("$")[1] == str(FAST_N)
+    assert verify_password("s3cret", stored)
+    assert not verify_password("wrong", stored)
+
+
+def test_hashes_are_salted():
+    assert hash_password("same", n=FAST_N) != hash_password("same", n=FAST_N)
+
+
+def test_plaintext_still_verifies():
+    assert not is_hashed("hunter2")
+    assert verify_password("hunter2", "hunter2")
+    assert not verify_password("hunter3", "hunter2")
+
+
+def test_malformed_hash_never_verifies():
+    assert not verify_password("x", "scrypt$not$a$valid$hash")
+
+
+def test_needs_rehash(passwords):
+    assert passwords.needs_rehash("plaintext")
+    assert not passwords.needs_rehash(passwords.hash("pw"))
+    assert passwords.needs_rehash(hash_password("pw", n=FAST_N * 2))
+
+
+def test_unknown_user_never_verifies(passwords):
+    assert passwords.verify("anything", None) is False
+
+
+# ----------------------------
+# Logins
+# ----------------------------
+def test_login_upgrades_legacy_password(db, passwords):
+    user_id = add_user(db, "ada", "plain", legacy=1)
+    users = UserRepository(db, passwords)
+
+    assert users.authenticate("ada", "wrong") is None
+    user = users.authenticate("ada", "plain")
+    assert user[:2] == (user_id, "ada")
+    db.submit_write("SELECT 1").result()     # the upgrade is queued on the writer
+
+    stored, legacy = db.fetchone("SELECT password, password_legacy FROM users WHERE id=?", (user_id,))
+    assert is_hashed(stored) and legacy == 0
+    assert users.authenticate("ada", "plain")[0] == user_id
+
+
+def test_create_stores_a_hash(db, passwords):
+    users = UserRepository(db, passwords)
+    assert users.create("bob", "bob@example.com", "pw")
+    assert not users.create("bob", "other@example.com", "pw")
+    assert is_hashed(db.fetchone("SELECT password FROM users WHERE username='bob'")[0])
+
+
+# ----------------------------
+# Legacy passwords
+# ----------------------------
+def test_migration_only_marks_plaintext(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "old.db"), isolation_level=None)
+    migrate(conn, target=8)
+    hashed = hash_password("pw", n=FAST_N)
+    conn.executemany(
+        "INSERT INTO users (username, email, password) VALUES (?, ?, ?)",
+        [("old", "old@example.com", "plain"), ("new", "new@example.com", hashed)]
+    )
+    migrate(conn, target=9)
+    rows = dict(conn.execute("SELECT username, password_legacy FROM users"))
+    assert rows == {"old": 1, "new": 0}
+    # Nothing was hashed on the way
+    assert conn.execute("SELECT password FROM users WHERE username='old'").fetchone()[0] == "plain"
+    conn.close()
+
+
+def test_bulk_rehash_upgrades_flagged_rows(db, capsys):
+    add_user(db, "one", "first", legacy=1)
+    add_user(db, "two", hash_password("second", n=FAST_N), legacy=1)
+    add_user(db, "three", "third")
+
+    bulk_main(["rehash", "users", "--db", db.path])
+
+    rows = {name: (password, legacy) for name, password, legacy in db.fetchall(
+        "SELECT username, password, password_legacy FROM users"
+    )}
+    assert is_hashed(rows["one"][0]) and verify_password("first", rows["one"][0])
+    assert rows["two"][1] == 0
+    # Not flagged: left for the next login
+    assert rows["three"] == ("third", 0)
+    assert "Hashed 1 legacy passwords" in capsys.readouterr().out
+
+
+# ----------------------------
+# Sessions
+# ----------------------------
+def test_session_round_trip(db):
+    user_id = add_user(db, "cy", "pw")
+    user = db.fetchone("SELECT id, username, email, created_at FROM users WHERE id=?", (user_id,))
+    sessions = SessionStore(db)
+
+    token = sessions.create(user)
+    assert sessions.validate(token) == tuple(user)
+    # Only the digest is stored
+    assert db.fetchone("SELECT token_hash FROM sessions")[0] == token_key(token)
+    assert token not in db.fetchone("SELECT token_hash FROM sessions")[0]
+
+    sessions.revoke(token)
+    assert sessions.validate(token) is None
+    assert db.fetchone("SELECT COUNT(*) FROM sessions")[0] == 0
+
+
+def test_session_seen_by_a_second_store(db):
+    user_id = add_user(db, "di", "pw")
+    user = db.fetchone("SELECT id, username, email, created_at FROM users WHERE id=?", (user_id,))
+    token = SessionStore(db).create(user)
+    assert SessionStore(db).validate(token) == tuple(user)
+
+
+def test_session_revoked_elsewhere_is_rechecked(db, monkeypatch):
+    user_id = add_user(db, "ed", "pw")
+    user = db.fetchone("SELECT id, username, email, created_at FROM users WHERE id=?", (user_id,))
+    app, api = SessionStore(db), SessionStore(db)
+    token = app.create(user)
+    api.revoke(token)
+
+    # Trusted from the cache until the recheck interval passes
+    assert app.validate(token) == tuple(user)
+    monkeypatch.setattr(auth, "SESSION_RECHECK", 0)
+    assert app.validate(token) is None
+
+
+def test_expired_session(db):
+    user_id = add_user(db, "fy", "pw")
+    user = db.fetchone("SELECT id, username, email, created_at FROM users WHERE id=?", (user_id,))
+    sessions = SessionStore(db, ttl=0.05)
+    token = sessions.create(user)
+    time.sleep(0.1)
+    assert sessions.validate(token) is None
+    assert SessionStore(db).validate(token) is None
+
+
+def test_invalid_tokens(db):
+    sessions = SessionStore(db)
+    assert sessions.validate(None) is None
+    assert sessions.validate("") is None
+    assert sessions.validate("not-a-token") is None
@@ -0,0 +1,154 @@
+# tests/test_bulk.py
+# Bulk import / export: formats, duplicate handling and index rebuilds.
+import csv
+import gzip
+import json
+import sqlite3
+
+import pytest
+
+from auth import is_hashed, verify_password
+from bulk import export_table, import_table, main
+from migrations import migrate
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "test.db"), isolation_level=None)
+    migrate(conn)
+    conn.executemany(
+        "INSERT INTO users (username, email, password) VALUES (?, ?, 'x')",
+        [("ann", "ann@x"), ("ben", "ben@x")]
+    )
+    yield conn
+    conn.close()
+
+
+def write_csv(path, header, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+
+def saved(conn):
+    return conn.execute(
+        "SELECT user_id, event_name, event_date FROM saved_events ORDER BY id"
+    ).fetchall()
+
+
+def index_names(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA index_list({table})")}
+
+
+def test_import_csv_counts_new_rows(conn, tmp_path):
+    path = write_csv(tmp_path / "s.csv", ["user_id", "event_name", "event_date"], [
+        (1, "A", "2026-06-01"),
+        (1, "A", "2026-06-01"),     # duplicate within the file
+        (2, "B", ""),               # empty cell -> NULL
+    ])
+    assert import_table(conn, "saved_events", path) == 2
+    assert saved(conn) == [(1, "A", "2026-06-01"), (2, "B", None)]
+
+
+def test_import_keeps_existing_rows_and_indexes(conn, tmp_path):
+    conn.execute("INSERT INTO saved_events (user_id, event_name, event_date) VALUES (1, 'A', '2026-06-01')")
+    conn.execute("INSERT INTO saved_events (user_id, event_name, event_date) VALUES (1, 'Undated', NULL)")
+    before = index_names(conn, "saved_events")
+    path = write_csv(tmp_path / "s.csv", ["user_id", "event_name", "event_date"], [
+        (1, "A", "2026-06-01"),     # already saved
+        (1, "Undated", ""),         # NULL dates never clash
+        (1, "C", "2026-06-02"),
+    ])
+    assert import_table(conn, "saved_events", path) == 2
+    assert saved(conn) == [
+        (1, "A", "2026-06-01"), (1, "Undated", None), (1, "Undated", None), (1, "C", "2026-06-02"),
+    ]
+    assert index_names(conn, "saved_events") == before
+
+
+def test_import_with_keep_indexes(conn, tmp_path):
+    conn.execute("INSERT INTO saved_events (user_id, event_name, event_date) VALUES (1, 'A', '2026-06-01')")
+    path = write_csv(tmp_path / "s.csv", ["user_id", "event_name", "event_date"], [
+        (1, "A", "2026-06-01"), (2, "B", "2026-06-01"),
+    ])
+    assert import_table(conn, "saved_events", path, keep_indexes=True) == 1
+
+
+def test_import_by_username(conn, tmp_path):
+    path = tmp_path / "s.jsonl.gz"
+    with gzip.open(path, "wt") as f:
+        for username, name in [("ann", "A"), ("nobody", "B"), ("ben", "C")]:
+            f.write(json.dumps({"username": username, "event_name": name}) + "\n")
+    assert import_table(conn, "saved_events", str(path)) == 2
+    assert [(u, n) for u, n, _ in saved(conn)] == [(1, "A"), (2, "C")]
+
+
+def test_import_drops_affected_profiles(conn, tmp_path):
+    conn.executemany("INSERT INTO user_profiles (user_id) VALUES (?)", [(1,), (2,)])
+    path = write_csv(tmp_path / "s.csv", ["user_id", "event_name"], [(1, "A")])
+    import_table(conn, "saved_events", path)
+    assert conn.execute("SELECT user_id FROM user_profiles").fetchall() == [(2,)]
+
+
+def test_import_hashes_plaintext_passwords(conn, tmp_path):
+    path = write_csv(tmp_path / "u.csv", ["username", "email", "password"], [
+        ("cat", "cat@x", "plain"),
+        ("ann", "dup@x", "ignored"),    # username taken
+    ])
+    assert import_table(conn, "users", path) == 1
+    (stored,) = conn.execute("SELECT password FROM users WHERE username='cat'").fetchone()
+    assert is_hashed(stored) and verify_password("plain", stored)
+
+
+def test_missing_column(conn, tmp_path):
+    path = write_csv(tmp_path / "s.csv", ["event_name"], [("A",)])
+    with pytest.raises(SystemExit, match="user_id"):
+        import_table(conn, "saved_events", path)
+
+
+def test_failed_import_rolls_back_and_resets_pragmas(conn, tmp_path):
+    path = tmp_path / "s.jsonl"
+    path.write_text('{"user_id": 1, "event_name": "A"}\n{"user_id": 2, "event_na\n')
+    with pytest.raises(json.JSONDecodeError):
+        import_table(conn, "saved_events", str(path))
+    assert saved(conn) == []
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1     # NORMAL
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] == -2000
+    assert "idx_saved_events_unique" in index_names(conn, "saved_events")
+
+
+@pytest.mark.parametrize("name", ["out.csv", "out.csv.gz", "out.jsonl", "out.parquet"])
+def test_export_import_round_trip(conn, tmp_path, name):
+    if name.endswith(".parquet"):
+        pytest.importorskip("pyarrow")
+    conn.executemany(
+        "INSERT INTO saved_events (user_id, event_name, event_date, event_venue) VALUES (?, ?, ?, ?)",
+        [(1, "A", "2026-06-01", "V"), (2, "B", None, None)]
+    )
+    path = str(tmp_path / name)
+    assert export_table(conn, "saved_events", path) == 2
+
+    conn.execute("DELETE FROM saved_events")
+    assert import_table(conn, "saved_events", path) == 2
+    assert conn.execute(
+        "SELECT user_id, event_name, event_date, event_venue FROM saved_events ORDER BY id"
+    ).fetchall() == [(1, "A", "2026-06-01", "V"), (2, "B", None, None)]
+
+
+def test_export_hides_passwords_unless_asked(conn, tmp_path):
+    path = tmp_path / "u.jsonl"
+    export_table(conn, "users", str(path))
+    assert "password" not in json.loads(path.read_text().splitlines()[0])
+    export_table(conn, "users", str(path), include_secrets=True)
+    assert json.loads(path.read_text().splitlines()[0])["password"] == "x"
+
+
+def test_cli(conn, tmp_path, capsys):
+    db_path = conn.execute("PRAGMA database_list").fetchone()[2]
+    path = str(tmp_path / "users.csv")
+    main(["export", "users", path, "--db", db_path])
+    assert "Exported 2 users rows" in capsys.readouterr().out
+    with pytest.raises(SystemExit):
+        main(["export", "users", "--db", db_path])
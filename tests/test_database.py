@@ -0,0 +1,102 @@
+# tests/test_database.py
+# Connection pool, explicit transactions and the batched writer.
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from database import Database, WriteBatcher
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    with db.connection() as conn:
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL)")
+    yield db
+    db.close()
+
+
+def count(db):
+    return db.fetchone("SELECT COUNT(*) FROM items")[0]
+
+
+def test_wal_mode(db):
+    assert db.fetchone("PRAGMA journal_mode")[0] == "wal"
+
+
+def test_transaction_commits_or_rolls_back(db):
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO items (name) VALUES ('a')")
+    with pytest.raises(RuntimeError):
+        with db.transaction() as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('b')")
+            raise RuntimeError("boom")
+    assert db.fetchall("SELECT name FROM items") == [("a",)]
+
+
+def test_connections_are_reused(db):
+    with db.connection() as first:
+        pass
+    with db.connection() as second:
+        assert second is first
+
+
+def test_write_returns_rowcount(db):
+    assert db.write("INSERT INTO items (name) VALUES (?)", ("a",)) == 1
+    assert db.write("INSERT OR IGNORE INTO items (name) VALUES (?)", ("a",)) == 0
+
+
+def test_failed_write_only_fails_itself(db):
+    batcher = WriteBatcher(db)
+    # One transaction for all three: the duplicate rolls back to its savepoint
+    batch = [("INSERT INTO items (name) VALUES (?)", (name,), Future()) for name in ("a", "a", "b")]
+    batcher._run_batch(batch)
+    first, duplicate, last = (future for _, _, future in batch)
+    assert first.result() == 1
+    with pytest.raises(sqlite3.IntegrityError):
+        duplicate.result()
+    assert last.result() == 1
+    assert count(db) == 2
+
+
+def test_writer_survives_non_sqlite_errors(db):
+    # An int over 64 bits raises OverflowError, not sqlite3.Error
+    with pytest.raises(OverflowError):
+        db.write("INSERT INTO items (name) VALUES (?)", (2 ** 70,))
+    assert db.write("INSERT INTO items (name) VALUES (?)", ("after",)) == 1
+
+
+def test_concurrent_writes_are_batched(db):
+    batches = []
+    batcher = WriteBatcher(db)
+    run_batch = batcher._run_batch
+
+    def counted(batch):
+        batches.append(len(batch))
+        run_batch(batch)
+
+    batcher._run_batch = counted
+
+    start = threading.Event()
+
+    def write(i):
+        start.wait()
+        return batcher.submit("INSERT INTO items (name) VALUES (?)", (f"n{i}",)).result()
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        results = [pool.submit(write, i) for i in range(200)]
+        start.set()
+        assert all(f.result() == 1 for f in results)
+    assert count(db) == 200
+    assert sum(batches) == 200
+    assert len(batches) < 200
+
+
+def test_lone_write_does_not_wait_for_company(db):
+    batcher = WriteBatcher(db, max_delay=0.5)
+    start = time.monotonic()
+    batcher.submit("INSERT INTO items (name) VALUES ('solo')", ()).result()
+    assert time.monotonic() - start < 0.25
@@ -0,0 +1,105 @@
+# tests/test_event_fetcher.py
+# Paginated fetches: concurrent pages and _links.next.
+import pytest
+
+from event_fetcher import iter_events, iter_records, next_link
+from provider_client import ProviderClient, ProviderError
+from stub_server import EVENTS_PATH, StubServer, sample_payload
+
+
+@pytest.fixture
+def client():
+    with ProviderClient(timeout=(1, 2), retries=0) as client:
+        yield client
+
+
+def linked_payload(city="New York", size=20, page=0, total=20):
+    # No page metadata, only a templated _links.next, as some endpoints return
+    payload = sample_payload(city, size, page, total)
+    del payload["page"]
+    if (page + 1) * size < total:
+        payload["_links"] = {"next": {
+            "href": f"{EVENTS_PATH}?city={city}&page={page + 1}&size={size}{{&sort}}",
+            "templated": True,
+        }}
+    return payload
+
+
+def ids(events):
+    return [event["id"] for event in events]
+
+
+# ----------------------------
+# Page metadata
+# ----------------------------
+def test_pages_arrive_in_order(client):
+    with StubServer(total=120) as stub:
+        events = list(iter_events(client, stub.url, {"city": "Boston"}, page_size=50))
+    assert ids(events) == [f"stub-{i}" for i in range(120)]
+    assert sorted(int(r["page"]) for r in stub.requests) == [0, 1, 2]
+    assert all(r["size"] == "50" and r["city"] == "Boston" for r in stub.requests)
+
+
+def test_max_pages(client):
+    with StubServer(total=500) as stub:
+        events = list(iter_events(client, stub.url, {}, max_pages=2, page_size=50))
+    assert len(events) == 100
+    assert len(stub.requests) == 2
+
+
+def test_deep_paging_limit(client):
+    with StubServer(total=5000) as stub:
+        list(iter_events(client, stub.url, {}, max_pages=100, page_size=200))
+    # size * page must stay under 1000
+    assert max(int(r["page"]) for r in stub.requests) == 4
+
+
+def test_failed_page_raises_after_the_rest(client):
+    class Failing(ProviderClient):
+        def get_json(self, url, params=None, before_attempt=None):
+            if params.get("page") == 1:
+                raise ProviderError("HTTP 500")
+            return super().get_json(url, params, before_attempt)
+
+    with Failing(retries=0) as failing, StubServer(total=150) as stub:
+        got = []
+        with pytest.raises(ProviderError, match="1 of 3 result pages failed"):
+            for event in iter_events(failing, stub.url, {}, page_size=50):
+                got.append(event)
+    assert len(got) == 100
+
+
+# ----------------------------
+# _links.next
+# ----------------------------
+def test_follows_next_links(client):
+    with StubServer(total=45, payload=linked_payload) as stub:
+        events = list(iter_events(client, stub.url, {"city": "Boston", "apikey": "k"}, page_size=20))
+    assert ids(events) == [f"stub-{i}" for i in range(45)]
+    assert [r["page"] for r in stub.requests] == ["0", "1", "2"]
+    # The key is re-attached and the template is dropped
+    assert all(r["apikey"] == "k" for r in stub.requests)
+    assert all("sort" not in r for r in stub.requests)
+
+
+def test_next_link_resolves_against_the_base_url():
+    data = {"_links": {"next": {"href": "/discovery/v2/events.json?page=2&size=20{&sort}"}}}
+    url, params = next_link("https://app.example.com/discovery/v2/events.json", {"apikey": "k"}, data)
+    assert url == "https://app.example.com/discovery/v2/events.json"
+    assert params == {"page": "2", "size": "20", "apikey": "k"}
+
+
+def test_next_link_never_sends_the_key_elsewhere():
+    data = {"_links": {"next": {"href": "https://evil.example.net/events?page=1"}}}
+    assert next_link("https://app.example.com/events", {"apikey": "k"}, data) is None
+
+
+def test_no_next_link():
+    assert next_link("https://app.example.com/events", {}, {"_links": {}}) is None
+    assert next_link("https://app.example.com/events", {}, {"_links": {"next": {}}}) is None
+
+
+def test_iter_records(client):
+    with StubServer(total=3) as stub:
+        records = list(iter_records(client, stub.url, {}))
+    assert [record.id for record in records] == ["stub-0", "stub-1", "stub-2"]
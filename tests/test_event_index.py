@@ -0,0 +1,95 @@
+# tests/test_event_index.py
+# Local FTS5 event index and its background ingestor.
+import logging
+from datetime import date
+
+import pytest
+
+import metrics
+from database import Database
+from event_index import EventIndex, IndexIngestor, fts_query
+from event_record import Event
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def index(db):
+    index = EventIndex(db)
+    index.upsert([
+        Event("e1", "Jazz Night", "2026-06-01", "Blue Note", city="Boston", segment="Music"),
+        Event("e2", "Jazzfest", "2026-06-05", "Harbor", city="boston", segment="Music"),
+        Event("e3", "Celtics Game", "2026-06-02", "Garden", city="Boston", segment="Sports"),
+        Event("e4", "Jazz Brunch", "2026-06-01", "Cafe", city="Austin", segment="Music"),
+    ])
+    return index
+
+
+def names(events):
+    return [event.name for event in events]
+
+
+def test_fts_query_quotes_terms():
+    assert fts_query("jazz night") == '"jazz" "night"*'
+    assert fts_query('a" OR "b') == '"a""" "OR" """b"*'
+    assert fts_query("   ") is None
+
+
+def test_keyword_prefix_and_city(index):
+    assert names(index.search(city="BOSTON ", keyword="jazz")) == ["Jazz Night", "Jazzfest"]
+    assert names(index.search(keyword="garden")) == ["Celtics Game"]
+
+
+def test_filters(index):
+    assert names(index.search(segments=["Sports"])) == ["Celtics Game"]
+    assert names(index.search(city="Boston", start_date=date(2026, 6, 2), end_date="2026-06-05")) == [
+        "Celtics Game", "Jazzfest",
+    ]
+
+
+def test_fts_syntax_in_keywords_is_harmless(index):
+    assert index.search(keyword='jazz" OR name:*') == []
+
+
+def test_upsert_updates_the_fts_row(index):
+    index.upsert([Event("e1", "Blues Night", "2026-06-01", "Blue Note", city="Boston")])
+    assert index.count() == 4
+    assert names(index.search(keyword="blues")) == ["Blues Night"]
+    assert "Jazz Night" not in names(index.search(keyword="jazz"))
+
+
+def test_round_trips_the_record(index):
+    (event,) = index.search(keyword="celtics")
+    assert event == Event("e3", "Celtics Game", "2026-06-02", "Garden", city="Boston", segment="Sports")
+
+
+def test_survives_vacuum(db, index):
+    db.write("DELETE FROM events WHERE event_id='e1'")
+    with db.connection() as conn:
+        conn.execute("VACUUM")
+    assert names(index.search(keyword="jazz")) == ["Jazz Brunch", "Jazzfest"]
+
+
+def test_ingestor(index):
+    ingestor = IndexIngestor(index)
+    ingestor.submit([Event("e5", "Opera Gala", "2026-07-01", "Opera House")])
+    ingestor.submit([])
+    ingestor.join()
+    assert names(index.search(keyword="opera")) == ["Opera Gala"]
+
+
+def test_ingest_errors_are_logged_and_counted(db, index, caplog):
+    ingestor = IndexIngestor(index)
+    before = metrics.REGISTRY.counters().get("index_ingest_errors", 0)
+    db.write("DROP TABLE events_fts")       # breaks the insert trigger
+    with caplog.at_level(logging.ERROR, logger="event_index"):
+        ingestor.submit([Event("e6", "Lost", "2026-07-01")])
+        ingestor.join()
+    assert "indexing 1 events failed" in caplog.text
+    assert metrics.REGISTRY.counters()["index_ingest_errors"] == before + 1
+    assert ingestor._thread.is_alive()
@@ -0,0 +1,75 @@
+# tests/test_event_record.py
+# Parsing Discovery API events into compact records.
+import dataclasses
+
+import pytest
+
+from event_record import Event, choose_image, events_from_json, events_to_json, parse_events, to_float
+
+RAW = {
+    "id": "G5v0Z9",
+    "name": "Jazz Night",
+    "url": "https://www.ticketmaster.com/event/G5v0Z9",
+    "dates": {"start": {"localDate": "2026-05-01", "localTime": "20:00:00"}},
+    "classifications": [{"segment": {"name": "Music"}, "genre": {"name": "Jazz"}}],
+    "images": [
+        {"url": "https://img/small.jpg", "width": 100, "height": 56},
+        {"url": "https://img/large.jpg", "width": 1024, "height": 576},
+        {"url": "https://img/medium.jpg", "width": 640, "height": 360},
+    ],
+    "_embedded": {"venues": [{
+        "id": "KovZ1", "name": "Blue Note", "city": {"name": "Boston"},
+        "location": {"latitude": "42.35", "longitude": "-71.06"},
+    }]},
+}
+
+
+def test_from_api():
+    event = Event.from_api(RAW)
+    assert event == Event(
+        id="G5v0Z9", name="Jazz Night", local_date="2026-05-01", venue="Blue Note",
+        venue_id="KovZ1", city="Boston", lat=42.35, lon=-71.06, segment="Music",
+        image_url="https://img/medium.jpg", url="https://www.ticketmaster.com/event/G5v0Z9",
+    )
+
+
+def test_from_api_with_missing_parts():
+    event = Event.from_api({"name": "Bare", "url": "https://e/1", "_embedded": {"venues": []}, "classifications": []})
+    assert event.id == "https://e/1"
+    assert (event.local_date, event.venue, event.city, event.lat, event.segment, event.image_url) == (None,) * 6
+    assert Event.from_api({}).name == "No Name"
+
+
+def test_records_are_compact_and_immutable():
+    event = Event.from_api(RAW)
+    assert not hasattr(event, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        event.name = "Other"
+    assert hash(event) == hash(Event.from_api(RAW))
+
+
+def test_to_float():
+    assert to_float("1.5") == 1.5
+    assert to_float(None) is None
+    assert to_float("n/a") is None
+
+
+@pytest.mark.parametrize("images, expected", [
+    (None, None),
+    ([], None),
+    # Nothing sized: take the first
+    ([{"url": "a"}, {"url": "b"}], "a"),
+    # Nothing big enough: take the largest
+    ([{"url": "a", "width": 100, "height": 50}, {"url": "b", "width": 200, "height": 100}], "b"),
+    # A variant without a height only has to be wide enough
+    ([{"url": "a", "width": 2048}, {"url": "b", "width": 400}], "b"),
+    # Wide but too short doesn't count
+    ([{"url": "a", "width": 400, "height": 100}, {"url": "b", "width": 800, "height": 450}], "b"),
+])
+def test_choose_image(images, expected):
+    assert choose_image(images) == expected
+
+
+def test_json_round_trip():
+    events = parse_events([RAW, {"id": "2", "name": "Other"}])
+    assert events_from_json(events_to_json(events)) == tuple(events)
@@ -0,0 +1,82 @@
+# tests/test_geo.py
+# Venue de-duplication, radius queries and zoom-level clustering.
+import random
+
+import pytest
+
+from event_record import Event
+from geo import MAX_ZOOM, VenueGeoStore, haversine_km, venue_store
+
+BOSTON = (42.3601, -71.0589)
+CAMBRIDGE = (42.3736, -71.1097)
+NEW_YORK = (40.7128, -74.0060)
+
+
+def event(id, venue_id, lat, lon, venue="Venue"):
+    return Event(id=id, name=f"Event {id}", venue=venue, venue_id=venue_id, lat=lat, lon=lon)
+
+
+@pytest.fixture
+def store():
+    return VenueGeoStore.from_events([
+        event("1", "v-boston", *BOSTON),
+        event("2", "v-boston", *BOSTON),
+        event("3", "v-cambridge", *CAMBRIDGE),
+        event("4", None, *NEW_YORK),
+        event("5", "v-nowhere", None, None),
+    ])
+
+
+def test_haversine():
+    assert haversine_km(*BOSTON, *BOSTON) == 0
+    assert haversine_km(*BOSTON, *NEW_YORK) == pytest.approx(306, abs=2)
+
+
+def test_venues_are_deduplicated(store):
+    assert sorted(store.venues) == ["40.71280,-74.00600", "v-boston", "v-cambridge"]
+    assert store.venues["v-boston"].event_count == 2
+
+
+def test_within_is_nearest_first(store):
+    assert [v.id for v in store.within(*BOSTON, 10)] == ["v-boston", "v-cambridge"]
+    assert [v.id for v in store.within(*CAMBRIDGE, 1)] == ["v-cambridge"]
+    assert [v.id for v in store.within(*BOSTON, 5000)][-1] == "40.71280,-74.00600"
+
+
+def test_within_matches_a_full_scan():
+    rng = random.Random(3)
+    events = [event(str(i), str(i), 42 + rng.uniform(-1, 1), -71 + rng.uniform(-1, 1)) for i in range(500)]
+    store = VenueGeoStore.from_events(events)
+    for radius in (1, 10, 40, 400):
+        expected = {e.venue_id for e in events if haversine_km(42.1, -71.2, e.lat, e.lon) <= radius}
+        assert {v.id for v in store.within(42.1, -71.2, radius)} == expected
+
+
+def test_clusters_keep_event_counts(store):
+    for zoom in (0, 5, MAX_ZOOM):
+        assert sum(point["events"] for point in store.clusters(zoom)) == 4
+    # Whole world in a handful of cells vs. every venue apart
+    assert len(store.clusters(0)) == 1
+    assert len(store.clusters(MAX_ZOOM)) == 3
+    boston = next(p for p in store.clusters(7) if p["events"] == 3)
+    # Weighted by events: twice as close to Boston as to Cambridge
+    assert boston["lat"] == pytest.approx((2 * BOSTON[0] + CAMBRIDGE[0]) / 3)
+
+
+def test_clusters_are_rebuilt_after_new_venues(store):
+    assert len(store.clusters(MAX_ZOOM)) == 3
+    store.add_event(event("6", "v-new", 10.0, 10.0))
+    assert len(store.clusters(MAX_ZOOM)) == 4
+
+
+def test_map_points_stay_under_the_limit(store):
+    assert len(store.map_points()) == 3
+    points = store.map_points(max_points=2)
+    assert 0 < len(points) <= 2
+    assert sum(point["events"] for point in points) == 4
+
+
+def test_venue_store_is_memoized():
+    events = (event("1", "v", *BOSTON),)
+    assert venue_store(events) is venue_store(tuple(events))
+    assert venue_store(events) is not venue_store((event("2", "v", *BOSTON),))
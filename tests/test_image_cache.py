@@ -0,0 +1,147 @@
+# tests/test_image_cache.py
+# Content-addressed thumbnails: URLs, de-duplication, eviction and failures.
+import os
+import time
+from io import BytesIO
+
+import pytest
+
+import image_cache
+from database import Database
+from image_cache import STATIC_URL, ThumbnailCache, make_thumbnail, static_url
+from migrations import migrate
+from stub_server import StubServer
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    with db.connection() as conn:
+        migrate(conn)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def make_cache(db, tmp_path, monkeypatch):
+    # No Pillow conversion, so file sizes are the downloaded sizes
+    monkeypatch.setattr(image_cache, "make_thumbnail", lambda data, size: None)
+    downloads = {}
+    caches = []
+
+    def make(**kwargs):
+        cache = ThumbnailCache(db, str(tmp_path / "static" / "thumbs"), static_dir=str(tmp_path / "static"), **kwargs)
+        cache._download = lambda url: (downloads[url], "image/png")
+        caches.append(cache)
+        return cache
+
+    make.downloads = downloads
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+# ----------------------------
+# Static URLs
+# ----------------------------
+def test_static_url(tmp_path):
+    static = tmp_path / "static"
+    assert static_url(str(static), str(static)) == STATIC_URL
+    assert static_url(str(static / "thumbs" / "x"), str(static)) == f"{STATIC_URL}/thumbs/x"
+    with pytest.raises(ValueError):
+        static_url(str(tmp_path / "elsewhere"), str(static))
+
+
+# ----------------------------
+# Cache
+# ----------------------------
+def test_url_for_downloads_in_the_background(make_cache):
+    cache = make_cache()
+    make_cache.downloads["https://img/a.png"] = b"A" * 10
+    assert cache.url_for(None) is None
+    assert cache.url_for("https://img/a.png") is None
+    wait_until(lambda: cache.url_for("https://img/a.png") is not None)
+    url = cache.url_for("https://img/a.png")
+    assert url.startswith(f"{STATIC_URL}/thumbs/") and url.endswith(".png")
+
+
+def test_identical_artwork_is_stored_once(make_cache):
+    cache = make_cache()
+    make_cache.downloads.update({"https://img/a.png": b"same", "https://img/b.png": b"same"})
+    assert cache.fetch("https://img/a.png") == cache.fetch("https://img/b.png")
+    assert len(os.listdir(cache.directory)) == 1
+
+
+def test_other_processes_see_cached_files(make_cache):
+    make_cache.downloads["https://img/a.png"] = b"A"
+    filename = make_cache().fetch("https://img/a.png")
+    assert make_cache().url_for("https://img/a.png").endswith(filename)
+
+
+def test_deleted_files_are_fetched_again(make_cache):
+    cache = make_cache()
+    make_cache.downloads["https://img/a.png"] = b"A"
+    filename = cache.fetch("https://img/a.png")
+    os.remove(os.path.join(cache.directory, filename))
+    assert cache.url_for("https://img/a.png") is None
+    wait_until(lambda: os.path.exists(os.path.join(cache.directory, filename)))
+
+
+def test_least_recently_used_files_are_evicted(make_cache, db):
+    cache = make_cache(max_bytes=250)
+    for name in "abc":
+        make_cache.downloads[f"https://img/{name}.png"] = name.encode() * 100
+    cache.fetch("https://img/a.png")
+    cache.fetch("https://img/b.png")
+    db.write("UPDATE image_cache SET last_access=0 WHERE url='https://img/a.png'")
+    cache.fetch("https://img/c.png")
+    # 300 bytes > 250: evicted down to 90% of the budget, oldest first
+    assert [row[0] for row in db.fetchall("SELECT url FROM image_cache ORDER BY url")] == [
+        "https://img/b.png", "https://img/c.png"
+    ]
+    assert len(os.listdir(cache.directory)) == 2
+    assert cache.url_for("https://img/a.png") is None
+
+
+def test_failures_are_not_retried_right_away(make_cache):
+    cache = make_cache()
+    calls = []
+
+    def broken(url):
+        calls.append(url)
+        raise ValueError("not an image")
+
+    cache._download = broken
+    cache.url_for("https://img/x.png")
+    wait_until(lambda: "https://img/x.png" in cache._failed)
+    assert cache.url_for("https://img/x.png") is None
+    time.sleep(0.05)
+    assert calls == ["https://img/x.png"]
+
+
+def test_download_rejects_non_images(db, tmp_path):
+    cache = ThumbnailCache(db, str(tmp_path / "static" / "thumbs"), static_dir=str(tmp_path / "static"))
+    try:
+        with StubServer() as stub:
+            with pytest.raises(ValueError, match="not an image"):
+                cache._download(stub.url)
+    finally:
+        cache.close()
+
+
+def test_make_thumbnail():
+    Image = pytest.importorskip("PIL.Image")
+    buffer = BytesIO()
+    Image.new("RGB", (1024, 576), "red").save(buffer, "PNG")
+    thumb = make_thumbnail(buffer.getvalue(), (300, 200))
+    assert Image.open(BytesIO(thumb)).size == (300, 200)
+    assert Image.open(BytesIO(thumb)).format == "JPEG"
+    assert make_thumbnail(b"not an image") is None
@@ -0,0 +1,73 @@
+# tests/test_lru.py
+# The shared LRU cache with optional expiry.
+import threading
+import time
+
+from lru import LRUCache
+
+
+def test_get_set_and_eviction_order():
+    cache = LRUCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert len(cache) == 2
+
+
+def test_set_returns_the_value():
+    assert LRUCache(1).set("a", [1]) == [1]
+
+
+def test_ttl_and_explicit_expiry():
+    cache = LRUCache(4, ttl=60)
+    cache.set("fresh", 1)
+    cache.set("stale", 2, expires_at=time.time() - 1)
+    assert cache.get("fresh") == 1
+    assert cache.get("stale", "missing") == "missing"
+    assert cache.expires_at("fresh") > time.time()
+    assert cache.expires_at("stale") == 0.0
+    assert cache.expires_at("missing") == 0.0
+
+
+def test_no_ttl_never_expires():
+    cache = LRUCache(1)
+    cache.set("k", 1)
+    assert cache.expires_at("k") is None
+
+
+def test_falsy_values_are_cached():
+    cache = LRUCache(2)
+    calls = []
+    compute = lambda: calls.append(1) or 0
+    assert cache.get_or_compute("zero", compute) == 0
+    assert cache.get_or_compute("zero", compute) == 0
+    assert calls == [1]
+
+
+def test_pop_and_clear():
+    cache = LRUCache(2)
+    cache.set("a", 1)
+    assert cache.pop("a") == 1
+    assert cache.pop("a", "gone") == "gone"
+    cache.set("b", 2)
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_concurrent_use_keeps_the_bound():
+    cache = LRUCache(50)
+
+    def worker(offset):
+        for i in range(2000):
+            cache.set(offset + i % 100, i)
+            cache.get(offset + (i * 7) % 100)
+
+    threads = [threading.Thread(target=worker, args=(n * 1000,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache) == 50
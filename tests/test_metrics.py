@@ -0,0 +1,108 @@
+# tests/test_metrics.py
+# Stage histograms, counters and the Prometheus endpoint.
+import logging
+import threading
+
+import pytest
+import requests
+
+import metrics
+from metrics import BUCKETS, Histogram, Registry, timed
+
+
+@pytest.fixture
+def registry():
+    return Registry()
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram()
+    for value in (0.0001, 0.002, 0.002, 0.3, 20.0):
+        histogram.observe(value)
+    assert histogram.count == 5
+    assert histogram.total == pytest.approx(20.3041)
+    assert histogram.max == 20.0
+    # 0.002 lands in the 0.0025 bucket; 20 s is past the last bound
+    assert histogram.counts[BUCKETS.index(0.0025)] == 2
+    assert histogram.counts[-1] == 1
+    assert histogram.quantile(0.5) == 0.0025
+    assert histogram.quantile(1.0) == 20.0
+    assert Histogram().quantile(0.5) == 0.0
+
+
+def test_timed_as_context_manager_and_decorator(registry):
+    @timed("work", registry)
+    def work():
+        return 42
+
+    with timed("block", registry):
+        pass
+    assert work() == 42
+    assert work() == 42
+    counts = {row["stage"]: row["count"] for row in registry.snapshot()}
+    assert counts == {"block": 1, "work": 2}
+
+
+def test_timed_is_reentrant_and_thread_safe(registry):
+    timer = timed("nested", registry)
+
+    @timer
+    def recurse(n):
+        return 0 if n == 0 else 1 + recurse(n - 1)
+
+    threads = [threading.Thread(target=recurse, args=(5,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert registry.snapshot()[0]["count"] == 8 * 6
+
+
+def test_counters_with_labels(registry):
+    registry.count("upstream_responses", status=200)
+    registry.count("upstream_responses", status=200)
+    registry.count("upstream_responses", status=429)
+    registry.count("slow_queries", 3)
+    assert registry.counters() == {
+        "slow_queries": 3,
+        'upstream_responses{status="200"}': 2,
+        'upstream_responses{status="429"}': 1,
+    }
+
+
+def test_render_prometheus(registry):
+    registry.observe("db_query", 0.002)
+    registry.observe("db_query", 0.2)
+    registry.count("provider_errors", provider='we"ird')
+    text = registry.render_prometheus()
+    assert "# TYPE eventure_stage_seconds histogram" in text
+    assert 'eventure_stage_seconds_bucket{stage="db_query",le="0.0025"} 1' in text
+    assert 'eventure_stage_seconds_bucket{stage="db_query",le="+Inf"} 2' in text
+    assert 'eventure_stage_seconds_count{stage="db_query"} 2' in text
+    assert "# TYPE eventure_provider_errors_total counter" in text
+    assert 'eventure_provider_errors_total{provider="we\\"ird"} 1' in text
+    assert text.endswith("\n")
+
+
+def test_slow_queries_are_counted_and_logged(caplog, monkeypatch):
+    monkeypatch.setattr(metrics, "REGISTRY", Registry())
+    with caplog.at_level(logging.WARNING, logger="metrics"):
+        metrics.record_query("SELECT  *\n FROM events", 0.001)
+        metrics.record_query("SELECT  *\n FROM events", metrics.SLOW_QUERY_SECONDS)
+    assert metrics.REGISTRY.counters() == {"slow_queries": 1}
+    assert [r.getMessage() for r in caplog.records] == ["slow query (50.0 ms): SELECT * FROM events"]
+
+
+def test_serve(registry):
+    registry.count("hits")
+    server = metrics.serve(0, host="127.0.0.1", registry=registry)
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        response = requests.get(f"{base}/metrics", timeout=5)
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("text/plain")
+        assert "eventure_hits_total 1" in response.text
+        assert requests.get(f"{base}/other", timeout=5).status_code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
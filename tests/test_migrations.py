@@ -0,0 +1,189 @@
+# tests/test_migrations.py
+# Versioned migrations, applied step by step to databases in older states.
+import sqlite3
+
+import pytest
+
+import migrations
+from migrations import LATEST_VERSION, current_version, migrate, share_links_v10
+
+# event_finder.db as the original db.py created it, plus the category
+# column the old check.py script added by hand
+BASELINE = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT UNIQUE NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    password TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE saved_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    event_name TEXT,
+    event_date TEXT,
+    event_venue TEXT,
+    event_url TEXT,
+    saved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY(user_id) REFERENCES users(id)
+);
+ALTER TABLE saved_events ADD COLUMN category TEXT;
+"""
+
+# The event index as first shipped: keyed on the implicit rowid
+EVENT_INDEX_V1 = """
+CREATE TABLE events (
+    event_id TEXT PRIMARY KEY, name TEXT NOT NULL, local_date TEXT, venue TEXT,
+    city TEXT, segment TEXT, url TEXT, latitude REAL, longitude REAL,
+    payload TEXT NOT NULL, updated_at REAL NOT NULL
+);
+CREATE INDEX idx_events_city_date ON events(city, local_date);
+CREATE VIRTUAL TABLE events_fts USING fts5(name, venue, content='events', content_rowid='rowid');
+CREATE TRIGGER events_ai AFTER INSERT ON events BEGIN
+    INSERT INTO events_fts(rowid, name, venue) VALUES (new.rowid, new.name, new.venue);
+END;
+"""
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "test.db"), isolation_level=None)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def baseline(conn):
+    conn.executescript(BASELINE)
+    conn.executemany("INSERT INTO users (id, username, email, password) VALUES (?, ?, ?, ?)", [
+        (1, "alice", "a@x", "plain-password"),
+        (2, "bob", "b@x", "scrypt$16384$8$1$c2FsdA$aGFzaA"),
+    ])
+    conn.executemany(
+        "INSERT INTO saved_events (user_id, event_name, event_date, event_venue, event_url, category) "
+        "VALUES (?, ?, ?, ?, ?, ?)", [
+            (1, "Jazz Night", "2026-05-01", "Hall", "https://e/1", "Music"),
+            (1, "Jazz Night", "2026-05-01", "Hall", "https://e/1", "Music"),
+            (1, "Someday", "N/A", "Venue Not Available", "#", None),
+            (2, "Match", "2026-05-02", "Stadium", "https://e/2", "Sports"),
+        ]
+    )
+    return conn
+
+
+def tables(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+
+
+def indexes(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA index_list({table})")}
+
+
+# ----------------------------
+# Fresh and baseline databases
+# ----------------------------
+def test_fresh_database(conn):
+    assert current_version(conn) == 0
+    assert migrate(conn) == LATEST_VERSION
+    assert {"users", "saved_events", "user_profiles", "search_log", "api_quota",
+            "image_cache", "sessions"} <= tables(conn)
+    # The event index is created by event_index.EventIndex, not migrated into being
+    assert "events" not in tables(conn)
+
+
+def test_migrate_stops_at_target(conn):
+    assert migrate(conn, target=3) == 3
+    assert "user_profiles" not in tables(conn)
+    assert migrate(conn) == LATEST_VERSION
+
+
+def test_migrate_is_idempotent(baseline):
+    migrate(baseline)
+    before = baseline.execute("SELECT * FROM saved_events ORDER BY id").fetchall()
+    assert migrate(baseline) == LATEST_VERSION
+    assert baseline.execute("SELECT * FROM saved_events ORDER BY id").fetchall() == before
+
+
+def test_baseline_keeps_data_and_drops_duplicate_saves(baseline):
+    assert migrate(baseline) == LATEST_VERSION
+    assert baseline.execute(
+        "SELECT user_id, event_name, category FROM saved_events ORDER BY id"
+    ).fetchall() == [(1, "Jazz Night", "Music"), (1, "Someday", None), (2, "Match", "Sports")]
+    assert {"idx_saved_events_unique", "idx_saved_events_user_saved_at",
+            "idx_saved_events_event_day", "idx_saved_events_user_event_day"} <= indexes(baseline, "saved_events")
+    with pytest.raises(sqlite3.IntegrityError):
+        baseline.execute("INSERT INTO saved_events (user_id, event_name, event_date) VALUES (1, 'Jazz Night', '2026-05-01')")
+
+
+def test_migration_9_only_flags_plaintext_passwords(baseline):
+    migrate(baseline)
+    assert baseline.execute("SELECT id, password, password_legacy FROM users ORDER BY id").fetchall() == [
+        (1, "plain-password", 1),
+        (2, "scrypt$16384$8$1$c2FsdA$aGFzaA", 0),
+    ]
+    # New rows default to hashed
+    baseline.execute("INSERT INTO users (username, email, password) VALUES ('carol', 'c@x', 'scrypt$x')")
+    assert baseline.execute("SELECT password_legacy FROM users WHERE username='carol'").fetchone() == (0,)
+
+
+def test_migration_10_types_dates_and_backfills_share_links(baseline):
+    migrate(baseline)
+    rows = baseline.execute(
+        "SELECT event_name, event_date, event_url, event_day, share_whatsapp, share_twitter, reminded_at "
+        "FROM saved_events ORDER BY id"
+    ).fetchall()
+    assert [row[3] for row in rows] == ["2026-05-01", None, "2026-05-02"]
+    for name, day, url, _, whatsapp, tweet, reminded_at in rows:
+        assert (whatsapp, tweet) == share_links_v10(name, day, url)
+        assert reminded_at is None
+    assert rows[0][4] == "https://wa.me/?text=Check%20out%20this%20event%3A%20Jazz%20Night%20on%202026-05-01.%20https%3A//e/1"
+
+    # event_day follows later writes to event_date
+    baseline.execute("UPDATE saved_events SET event_date='2026-07-04T20:00:00' WHERE event_name='Someday'")
+    assert baseline.execute("SELECT event_day FROM saved_events WHERE event_name='Someday'").fetchone() == ("2026-07-04",)
+
+
+def test_failed_migration_rolls_back(baseline, monkeypatch):
+    def broken(conn):
+        conn.execute("CREATE TABLE half_done (x)")
+        raise RuntimeError("boom")
+
+    steps = list(migrations.MIGRATIONS)
+    steps[3] = (4, "broken", broken)
+    monkeypatch.setattr(migrations, "MIGRATIONS", steps)
+    with pytest.raises(RuntimeError):
+        migrate(baseline)
+    assert current_version(baseline) == 3
+    assert "half_done" not in tables(baseline)
+    assert not baseline.in_transaction
+
+
+# ----------------------------
+# Event index (migration 11)
+# ----------------------------
+
+def test_event_index_is_rekeyed(conn):
+    migrate(conn, target=10)
+    conn.executescript(EVENT_INDEX_V1)
+    conn.executemany(
+        "INSERT INTO events (event_id, name, venue, city, payload, updated_at) VALUES (?, ?, ?, ?, '{}', 0)",
+        [("e1", "Jazz Night", "Blue Note", "boston"), ("e2", "Rock Show", "Garden", "boston")]
+    )
+
+    assert migrate(conn) == LATEST_VERSION
+    assert conn.execute("SELECT id, event_id FROM events ORDER BY id").fetchall() == [(1, "e1"), (2, "e2")]
+    assert conn.execute(
+        "SELECT e.event_id FROM events_fts JOIN events e ON e.id = events_fts.rowid WHERE events_fts MATCH 'jazz'"
+    ).fetchall() == [("e1",)]
+    assert not conn.execute("SELECT 1 FROM sqlite_master WHERE name='events_v1'").fetchone()
+    # The new triggers keep the FTS table in step
+    conn.execute("UPDATE events SET name='Blues Night' WHERE event_id='e1'")
+    conn.execute("DELETE FROM events WHERE event_id='e2'")
+    assert conn.execute("SELECT rowid FROM events_fts WHERE events_fts MATCH 'blues'").fetchall() == [(1,)]
+    assert conn.execute("SELECT rowid FROM events_fts WHERE events_fts MATCH 'rock'").fetchall() == []
+    conn.execute("INSERT INTO events_fts(events_fts) VALUES ('integrity-check')")
+
+
+def test_rekey_without_an_event_index(conn):
+    assert migrate(conn) == LATEST_VERSION
+    assert current_version(conn) == LATEST_VERSION
@@ -0,0 +1,120 @@
+# tests/test_prefetch.py
+# Search popularity log and the prefetch scheduler.
+import json
+import time
+
+import pytest
+
+from database import Database
+from migrations import migrate
+from prefetch import PrefetchScheduler, log_search, popular_searches, prune_search_log
+from provider_client import ProviderError
+from rate_limit import RateLimited
+from search_cache import SearchCache, normalize_params
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    with db.connection() as conn:
+        migrate(conn)
+    yield db
+    db.close()
+
+
+class FakeProviders:
+    """Stands in for providers.FederatedSearch; `fail` maps city -> error."""
+
+    def __init__(self, fail=None):
+        self.fail = fail or {}
+        self.searched = []
+
+    def search(self, params):
+        self.searched.append(params["city"])
+        if params["city"] in self.fail:
+            raise self.fail[params["city"]]
+        return [f"event in {params['city']}"]
+
+
+def log_city(db, city, times=1):
+    params = {"city": city, "apikey": "secret"}
+    for _ in range(times):
+        log_search(db, normalize_params(params), params)
+
+
+def flush(db):
+    db.submit_write("SELECT 1").result()
+
+
+def test_log_search_never_stores_the_key(db):
+    log_city(db, "Boston")
+    flush(db)
+    (params,) = db.fetchone("SELECT params FROM search_log")
+    assert json.loads(params) == {"city": "Boston"}
+
+
+def test_popular_searches_by_frequency(db):
+    log_city(db, "Boston", 3)
+    log_city(db, "Austin", 5)
+    log_city(db, "Denver", 1)
+    flush(db)
+    ranked = popular_searches(db, limit=2)
+    assert [(params["city"], hits) for _, params, hits in ranked] == [("Austin", 5), ("Boston", 3)]
+
+
+def test_prune_search_log(db):
+    log_city(db, "Boston")
+    flush(db)
+    prune_search_log(db, window=60, now=time.time() + 120)
+    flush(db)
+    assert db.fetchone("SELECT COUNT(*) FROM search_log")[0] == 0
+
+
+def test_refreshes_only_what_is_due(db):
+    log_city(db, "Boston", 2)
+    log_city(db, "Austin")
+    flush(db)
+    cache = SearchCache(ttl=100)
+    cache.set(normalize_params({"city": "Austin"}), ("cached",))
+    providers = FakeProviders()
+    scheduler = PrefetchScheduler(db, cache, providers)
+
+    assert scheduler.run_once() == 1
+    assert providers.searched == ["Boston"]
+    assert cache.get(normalize_params({"city": "Boston"})) == ("event in Boston",)
+    # Now fresh: nothing left to do
+    assert scheduler.run_once() == 0
+
+
+def test_one_failing_search_does_not_stop_the_pass(db):
+    log_city(db, "Boston", 3)
+    log_city(db, "Nowhere", 2)
+    log_city(db, "Austin", 1)
+    flush(db)
+    providers = FakeProviders(fail={"Nowhere": ProviderError("HTTP 500")})
+    scheduler = PrefetchScheduler(db, SearchCache(ttl=100), providers)
+    assert scheduler.run_once() == 2
+    assert providers.searched == ["Boston", "Nowhere", "Austin"]
+
+
+def test_out_of_budget_ends_the_pass(db):
+    log_city(db, "Boston", 2)
+    log_city(db, "Austin", 1)
+    flush(db)
+    providers = FakeProviders(fail={"Boston": RateLimited("budget exhausted")})
+    scheduler = PrefetchScheduler(db, SearchCache(ttl=100), providers)
+    assert scheduler.run_once() == 0
+    assert providers.searched == ["Boston"]
+
+
+def test_background_thread(db):
+    log_city(db, "Boston")
+    flush(db)
+    cache = SearchCache(ttl=100)
+    scheduler = PrefetchScheduler(db, cache, FakeProviders(), interval=0.01).start()
+    deadline = time.monotonic() + 5
+    while cache.expires_at(normalize_params({"city": "Boston"})) == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    scheduler.stop()
+    assert cache.get(normalize_params({"city": "Boston"})) == ("event in Boston",)
+    assert not scheduler._thread.is_alive()
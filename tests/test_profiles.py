@@ -0,0 +1,117 @@
+# tests/test_profiles.py
+# Incremental preference profiles and their cache.
+import pytest
+
+from database import Database
+from eventure.repository import SavedEventRepository
+from migrations import migrate
+from profiles import ProfileStore, UserProfile, normalized_weights
+
+USER = 1
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    with db.connection() as conn:
+        migrate(conn)
+        conn.execute("INSERT INTO users (id, username, email, password) VALUES (?, 'alice', 'a@x', 'x')", (USER,))
+    yield db
+    db.close()
+
+
+def save(db, store, name, category=None, venue=None, event_id=None, city=None):
+    # What Services.save_event does: the row first, then the profile
+    SavedEventRepository(db).save(USER, name, "2030-01-01", venue, "#", category, event_id)
+    store.record_save(USER, name, event_id, category, venue, city)
+
+
+def stored(db):
+    row = db.fetchone(
+        "SELECT user_id, categories, venues, cities, saved_ids, saved_names FROM user_profiles WHERE user_id=?",
+        (USER,)
+    )
+    return None if row is None else UserProfile.from_row(row)
+
+
+# ----------------------------
+# Profile
+# ----------------------------
+def test_normalized_weights():
+    assert normalized_weights({}) == {}
+    assert normalized_weights({"Music": 4, "Sports": 1}) == {"Music": 1.0, "Sports": 0.25}
+
+
+def test_profile_add_and_round_trip():
+    profile = UserProfile(USER)
+    profile.add("Jazz", "e1", "Music", "Hall", "Paris")
+    profile.add("Rock", "e2", "Music", None, "PARIS")
+    profile.add("Match", None, "Sports")
+    assert profile.top_categories(1) == ["Music"]
+    assert profile.category_weights() == {"Music": 1.0, "Sports": 0.5}
+    assert profile.cities == {"paris": 2}
+
+    copy = UserProfile.from_row(profile.to_row())
+    assert copy.categories == profile.categories
+    assert copy.venues == profile.venues
+    assert copy.cities == profile.cities
+    assert copy.saved_ids == {"e1", "e2"}
+    assert copy.saved_names == {"Jazz", "Rock", "Match"}
+
+
+# ----------------------------
+# Store
+# ----------------------------
+def test_get_builds_from_saved_events(db):
+    SavedEventRepository(db).save(USER, "Jazz", "2030-01-01", "Hall", "#", "Music", "e1")
+    profile = ProfileStore(db).get(USER)
+    assert profile.categories == {"Music": 1}
+    assert profile.saved_ids == {"e1"}
+    # ... and stores it, so the next process doesn't rebuild it
+    assert stored(db).categories == {"Music": 1}
+
+
+def test_get_for_a_user_without_saves(db):
+    profile = ProfileStore(db).get(USER)
+    assert profile.top_categories() == []
+    assert profile.saved_names == set()
+
+
+def test_record_save_is_incremental(db):
+    store = ProfileStore(db)
+    save(db, store, "Jazz", "Music", "Hall", "e1")
+    save(db, store, "Rock", "Music", "Arena", "e2", city="Paris")
+    profile = store.get(USER)
+    assert profile.categories == {"Music": 2}
+    assert profile.venues == {"Hall": 1, "Arena": 1}
+    assert profile.cities == {"paris": 1}
+    assert stored(db).saved_ids == {"e1", "e2"}
+
+
+def test_two_stores_never_lose_updates(db):
+    # Two processes (say the app and the API) with their own caches
+    app, api = ProfileStore(db), ProfileStore(db)
+    save(db, app, "Jazz", "Music")
+    save(db, api, "Match", "Sports")
+    save(db, app, "Rock", "Music")
+    assert stored(db).categories == {"Music": 2, "Sports": 1}
+    assert stored(db).saved_names == {"Jazz", "Match", "Rock"}
+
+
+def test_forget_drops_the_cached_copy(db):
+    app, api = ProfileStore(db), ProfileStore(db)
+    save(db, app, "Jazz", "Music")
+    assert api.get(USER).categories == {"Music": 1}
+    save(db, app, "Match", "Sports")
+    # api still serves its cached copy until it expires or is forgotten
+    assert api.get(USER).categories == {"Music": 1}
+    api.forget(USER)
+    assert api.get(USER).categories == {"Music": 1, "Sports": 1}
+
+
+def test_cache_expires_after_ttl(db):
+    app, api = ProfileStore(db), ProfileStore(db, ttl=0)
+    save(db, app, "Jazz", "Music")
+    api.get(USER)
+    save(db, app, "Match", "Sports")
+    assert api.get(USER).categories == {"Music": 1, "Sports": 1}
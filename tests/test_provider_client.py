@@ -0,0 +1,131 @@
+# tests/test_provider_client.py
+# ProviderClient against the local Discovery stub (stub_server.py).
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from provider_client import MAX_BACKOFF, ProviderClient, ProviderError, parse_retry_after
+from stub_server import StubServer
+
+
+@pytest.fixture
+def client():
+    # Tiny backoff so retries without Retry-After don't slow the suite
+    with ProviderClient(timeout=(1, 2), backoff=0.001) as client:
+        yield client
+
+
+# ----------------------------
+# Retry-After parsing
+# ----------------------------
+def test_retry_after_seconds():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("0") == 0.0
+    assert parse_retry_after("-5") == 0.0
+
+
+def test_retry_after_http_date():
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 < parse_retry_after(format_datetime(when, usegmt=True)) <= 30
+
+
+def test_retry_after_past_date_is_zero():
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_retry_after_missing_or_garbage():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("") is None
+    assert parse_retry_after("soon") is None
+
+
+# ----------------------------
+# Sync client
+# ----------------------------
+def test_get_json(client):
+    with StubServer(total=3) as stub:
+        data = client.get_json(stub.url, params={"city": "Boston", "size": 3})
+    assert [e["id"] for e in data["_embedded"]["events"]] == ["stub-0", "stub-1", "stub-2"]
+    assert stub.requests == [{"city": "Boston", "size": "3"}]
+
+
+def test_retries_429_then_succeeds(client):
+    script = [(429, {"Retry-After": "0"}, {}), (429, {"Retry-After": "0"}, {})]
+    with StubServer(script=script) as stub:
+        data = client.get_json(stub.url)
+    assert data["page"]["totalElements"] == 20
+    assert len(stub.requests) == 3
+
+
+@pytest.mark.parametrize("status", [500, 502, 503, 504])
+def test_retries_5xx(client, status):
+    with StubServer(script=[(status, {}, {"fault": "oops"})]) as stub:
+        client.get_json(stub.url)
+    assert len(stub.requests) == 2
+
+
+def test_waits_for_retry_after(client):
+    with StubServer(script=[(503, {"Retry-After": "0.3"}, {})]) as stub:
+        start = time.monotonic()
+        client.get_json(stub.url)
+    assert time.monotonic() - start >= 0.3
+
+
+def test_retry_after_is_capped():
+    client = ProviderClient()
+    assert client._next_delay(0, 3600) == MAX_BACKOFF
+
+
+def test_gives_up_after_retries(client):
+    with StubServer(script=[(503, {"Retry-After": "0"}, {})] * 4) as stub:
+        with pytest.raises(ProviderError, match="after 4 attempts") as info:
+            client.get_json(stub.url)
+    assert len(stub.requests) == client.retries + 1
+    assert info.value.__cause__.status == 503
+
+
+def test_client_error_is_not_retried(client):
+    with StubServer(script=[(401, {}, {"fault": "bad key"})]) as stub:
+        with pytest.raises(ProviderError) as info:
+            client.get_json(stub.url)
+    assert info.value.status == 401
+    assert len(stub.requests) == 1
+
+
+def test_connection_error_is_retried_then_gives_up(client):
+    with StubServer() as stub:
+        url = stub.url
+    # The stub is stopped: every attempt fails to connect
+    with pytest.raises(ProviderError, match="Giving up"):
+        client.get_json(url)
+
+
+# ----------------------------
+# Async client
+# ----------------------------
+def test_aget_json_retries(client):
+    with StubServer(script=[(429, {"Retry-After": "0"}, {}), (500, {}, {})]) as stub:
+        data = asyncio.run(client.aget_json(stub.url, params={"page": 0}))
+    assert data["page"]["number"] == 0
+    assert len(stub.requests) == 3
+
+
+def test_aget_json_gives_up(client):
+    with StubServer(script=[(502, {"Retry-After": "0"}, {})] * 4) as stub:
+        with pytest.raises(ProviderError, match="after 4 attempts"):
+            asyncio.run(client.aget_json(stub.url))
+    assert len(stub.requests) == 4
+
+
+def test_aget_json_runs_concurrently(client):
+    async def fetch_all(url):
+        return await asyncio.gather(*(client.aget_json(url) for _ in range(5)))
+
+    with StubServer(delay=0.2) as stub:
+        start = time.monotonic()
+        results = asyncio.run(fetch_all(stub.url))
+    assert len(results) == 5
+    assert time.monotonic() - start < 0.8
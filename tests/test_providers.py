@@ -0,0 +1,172 @@
+# tests/test_providers.py
+# Federated search: merging, de-duplication, deadlines and partial results.
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from event_record import Event
+from provider_client import ProviderError
+from providers import (
+    FederatedSearch, JsonlProvider, LocalDatasetProvider, Provider, SearchFilters,
+    build_providers, dedupe_key,
+)
+
+
+class ListProvider(Provider):
+
+    def __init__(self, name, events, delay=0.0, error=None, deadline=1.0):
+        self.name = name
+        self.events = events
+        self.delay = delay
+        self.error = error
+        self.deadline = deadline
+
+    def search(self, params):
+        time.sleep(self.delay)
+        yield from self.events
+        if self.error is not None:
+            raise self.error
+
+
+def event(id, name, date="2026-05-01", venue="Hall", city="Paris", segment="Music"):
+    return Event(id=id, name=name, local_date=date, venue=venue, city=city, segment=segment)
+
+
+@pytest.fixture
+def federated():
+    searches = []
+
+    def make(*providers):
+        search = FederatedSearch(providers)
+        searches.append(search)
+        return search
+
+    yield make
+    for search in searches:
+        search.close()
+
+
+# ----------------------------
+# Filters and keys
+# ----------------------------
+def test_dedupe_key_ignores_case_and_punctuation():
+    a = event("1", "The Band!", venue="Main Hall")
+    b = event("2", "the  band", venue="main-hall")
+    assert dedupe_key(a) == dedupe_key(b)
+    assert dedupe_key(a) != dedupe_key(event("3", "The Band", date="2026-05-02"))
+
+
+def test_search_filters():
+    filters = SearchFilters({
+        "city": "Paris", "keyword": "jazz", "classificationName": "Music",
+        "startDateTime": "2026-05-01T00:00:00Z", "endDateTime": "2026-05-31T23:59:59Z",
+    })
+    assert filters.matches(event("1", "Jazz Night"))
+    assert not filters.matches(event("2", "Rock Night"))
+    assert not filters.matches(event("3", "Jazz Night", segment="Sports"))
+    assert not filters.matches(event("4", "Jazz Night", date="2026-06-01"))
+    assert not filters.matches(event("5", "Jazz Night", date=None))
+
+
+def test_local_dataset_provider():
+    dataset = {"paris": [{"name": "Jazz Night", "date": "2026-05-01", "venue": "Hall", "category": "Music"}]}
+    provider = LocalDatasetProvider(dataset)
+    found = provider.search({"city": "PARIS"})
+    assert [e.name for e in found] == ["Jazz Night"]
+    assert found[0].city == "Paris"
+    assert provider.search({"city": "Lyon"}) == []
+
+
+def test_jsonl_provider_skips_bad_lines_and_reloads(tmp_path):
+    path = tmp_path / "events.jsonl"
+    path.write_text(json.dumps({"id": "1", "name": "A", "city": "Paris", "extra": 1}) + "\nnot json\n")
+    provider = JsonlProvider(str(path))
+    assert [e.name for e in provider.search({"city": "paris"})] == ["A"]
+
+    path.write_text(json.dumps({"id": "2", "name": "B", "city": "Paris"}) + "\n")
+    # Make sure the mtime moves even on coarse-grained filesystems
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+    assert [e.name for e in provider.search({"city": "paris"})] == ["B"]
+
+
+def test_jsonl_provider_missing_file(tmp_path):
+    assert JsonlProvider(str(tmp_path / "nope.jsonl")).search({"city": "paris"}) == []
+
+
+def test_build_providers_rejects_unknown_names():
+    with pytest.raises(ValueError, match="nope"):
+        build_providers(["local", "nope"], client=None, url="")
+    assert [p.name for p in build_providers(["local"], client=None, url="")] == ["local"]
+
+
+# ----------------------------
+# Fan-out and merge
+# ----------------------------
+def test_merges_and_dedupes(federated):
+    search = federated(
+        ListProvider("a", [event("a1", "Jazz"), event("a2", "Rock")]),
+        ListProvider("b", [event("b1", "jazz"), event("b2", "Folk")]),
+    )
+    names = sorted(e.name for e in search.search({}))
+    assert names in (["Folk", "Jazz", "Rock"], ["Folk", "Rock", "jazz"])
+
+
+def test_slow_provider_is_left_behind(federated):
+    search = federated(
+        ListProvider("fast", [event("1", "Fast")]),
+        ListProvider("slow", [event("2", "Slow")], delay=1.0, deadline=0.1),
+    )
+    seen = []
+    start = time.monotonic()
+    with pytest.raises(ProviderError, match="slow timed out"):
+        for item in search.search({}):
+            seen.append(item.name)
+    assert time.monotonic() - start < 0.9
+    assert seen == ["Fast"]
+
+
+def test_failed_provider_keeps_partial_results(federated):
+    search = federated(
+        ListProvider("good", [event("1", "Good")]),
+        ListProvider("bad", [event("2", "Partial")], error=ProviderError("HTTP 500")),
+    )
+    seen = []
+    with pytest.raises(ProviderError, match="bad: HTTP 500"):
+        for item in search.search({}):
+            seen.append(item.name)
+    assert sorted(seen) == ["Good", "Partial"]
+
+
+def test_unexpected_error_is_reported_as_provider_error(federated):
+    search = federated(ListProvider("broken", [], error=KeyError("oops")))
+    with pytest.raises(ProviderError, match="broken"):
+        list(search.search({}))
+
+
+def test_early_stop_cancels_stragglers(federated):
+    produced = []
+    release = threading.Event()
+
+    class Endless(Provider):
+        name = "endless"
+        deadline = 5.0
+
+        def search(self, params):
+            for i in range(1000):
+                produced.append(i)
+                yield event(str(i), f"E{i}")
+                release.wait(0.01)
+
+    search = federated(Endless())
+    results = search.search({})
+    next(results)
+    results.close()
+    time.sleep(0.1)
+    count = len(produced)
+    time.sleep(0.1)
+    assert len(produced) <= count + 1
+    assert count < 1000
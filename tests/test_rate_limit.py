@@ -0,0 +1,171 @@
+# tests/test_rate_limit.py
+# The SQLite token bucket / daily quota and the keyed client on top of it.
+import asyncio
+import math
+import time
+
+import pytest
+
+from database import Database
+from migrations import migrate
+from provider_client import ProviderClient
+from rate_limit import PRIORITY_BACKGROUND, KeyedClient, RateLimited, SharedRateLimiter, key_id
+from stub_server import StubServer
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    with db.connection() as conn:
+        migrate(conn)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def client():
+    with ProviderClient(timeout=(1, 2), backoff=0.001) as client:
+        yield client
+
+
+def day_counts(db):
+    return dict(db.fetchall("SELECT key_id, day_count FROM api_quota"))
+
+
+# ----------------------------
+# Limiter
+# ----------------------------
+def test_requires_a_key(db):
+    with pytest.raises(ValueError):
+        SharedRateLimiter(db, ["", None])
+
+
+def test_burst_then_wait(db):
+    limiter = SharedRateLimiter(db, ["k1"], per_second=1.0, burst=3)
+    assert [limiter.try_acquire()[0] for _ in range(3)] == ["k1"] * 3
+    key, wait = limiter.try_acquire()
+    assert key is None
+    assert 0 < wait <= 1.0
+
+
+def test_bucket_refills(db):
+    limiter = SharedRateLimiter(db, ["k1"], per_second=50.0, burst=1)
+    assert limiter.try_acquire()[0] == "k1"
+    assert limiter.try_acquire()[0] is None
+    time.sleep(0.05)
+    assert limiter.try_acquire()[0] == "k1"
+
+
+def test_daily_quota(db):
+    limiter = SharedRateLimiter(db, ["k1"], per_day=2)
+    limiter.acquire()
+    limiter.acquire()
+    assert limiter.try_acquire() == (None, math.inf)
+    with pytest.raises(RateLimited):
+        limiter.acquire()
+    assert limiter.remaining_today() == 0
+
+
+def test_processes_share_the_budget(db):
+    # Two limiters over one database stand in for two processes
+    first = SharedRateLimiter(db, ["k1"], per_second=0.01, burst=2)
+    second = SharedRateLimiter(db, ["k1"], per_second=0.01, burst=2)
+    assert first.try_acquire()[0] == "k1"
+    assert second.try_acquire()[0] == "k1"
+    assert first.try_acquire()[0] is None
+    assert day_counts(db) == {key_id("k1"): 2}
+
+
+def test_background_leaves_a_reserve_for_users(db):
+    limiter = SharedRateLimiter(db, ["k1"], per_second=0.01, burst=5, background_reserve=0.2)
+    # Background calls stop while one token of the burst is still left
+    assert [limiter.try_acquire(PRIORITY_BACKGROUND)[0] for _ in range(4)] == ["k1"] * 4
+    assert limiter.try_acquire(PRIORITY_BACKGROUND)[0] is None
+    assert limiter.try_acquire()[0] == "k1"
+
+
+def test_acquire_timeout(db):
+    limiter = SharedRateLimiter(db, ["k1"], per_second=0.01, burst=1)
+    limiter.acquire()
+    start = time.monotonic()
+    with pytest.raises(RateLimited):
+        limiter.acquire(timeout=0.1)
+    assert time.monotonic() - start < 1
+
+
+def test_rotates_to_the_least_used_key(db):
+    limiter = SharedRateLimiter(db, ["k1", "k2"], per_second=0.01, burst=5)
+    keys = [limiter.acquire() for _ in range(4)]
+    assert sorted(keys) == ["k1", "k1", "k2", "k2"]
+
+
+def test_avoided_key_is_a_last_resort(db):
+    limiter = SharedRateLimiter(db, ["k1", "k2"], per_second=0.01, burst=1)
+    assert limiter.acquire(avoid=("k1",)) == "k2"
+    # k2 is out of tokens now, so the avoided key still goes
+    assert limiter.acquire(avoid=("k1",)) == "k1"
+
+
+def test_remaining_never_shows_the_key(db):
+    limiter = SharedRateLimiter(db, ["secret-key-1234"])
+    limiter.acquire()
+    (entry,) = limiter.remaining()
+    assert entry["key"] == "…1234"
+    assert entry["today"] == limiter.per_day - 1
+
+
+# ----------------------------
+# Keyed client
+# ----------------------------
+def test_every_attempt_takes_a_token(db, client):
+    limiter = SharedRateLimiter(db, ["k1"])
+    keyed = KeyedClient(client, limiter)
+    with StubServer(script=[(503, {"Retry-After": "0"}, {})]) as stub:
+        keyed.get_json(stub.url, params={"city": "Boston"})
+    assert [r["apikey"] for r in stub.requests] == ["k1", "k1"]
+    assert stub.requests[0]["city"] == "Boston"
+    assert day_counts(db) == {key_id("k1"): 2}
+
+
+def test_token_is_taken_after_the_backoff(db, client, monkeypatch):
+    limiter = SharedRateLimiter(db, ["k1"])
+    acquired = []
+    acquire = limiter.acquire
+
+    def timed_acquire(*args, **kwargs):
+        acquired.append(time.monotonic())
+        return acquire(*args, **kwargs)
+
+    monkeypatch.setattr(limiter, "acquire", timed_acquire)
+    with StubServer(script=[(503, {"Retry-After": "0.3"}, {})]) as stub:
+        KeyedClient(client, limiter).get_json(stub.url)
+    assert len(acquired) == 2
+    assert acquired[1] - acquired[0] >= 0.3
+
+
+def test_429_moves_to_another_key(db, client):
+    limiter = SharedRateLimiter(db, ["k1", "k2"])
+    with StubServer(script=[(429, {"Retry-After": "0"}, {})]) as stub:
+        KeyedClient(client, limiter).get_json(stub.url)
+    first, second = (r["apikey"] for r in stub.requests)
+    assert first != second
+
+
+def test_background_client_gives_up_when_out_of_budget(db, client):
+    limiter = SharedRateLimiter(db, ["k1"], per_second=0.01, burst=1)
+    limiter.acquire()
+    keyed = KeyedClient(client, limiter, PRIORITY_BACKGROUND, timeout=0.05)
+    with StubServer() as stub:
+        with pytest.raises(RateLimited):
+            keyed.get_json(stub.url)
+    assert stub.requests == []
+
+
+def test_aget_json_goes_through_the_limiter(db, client):
+    limiter = SharedRateLimiter(db, ["k1", "k2"])
+    keyed = KeyedClient(client, limiter)
+    with StubServer(script=[(429, {"Retry-After": "0"}, {})]) as stub:
+        data = asyncio.run(keyed.aget_json(stub.url, params={"page": 0}))
+    assert data["page"]["totalElements"] == 20
+    assert len({r["apikey"] for r in stub.requests}) == 2
+    assert sum(day_counts(db).values()) == 2
@@ -0,0 +1,90 @@
+# tests/test_recommender.py
+# Vectorized scoring and top-k selection over the event frame.
+from datetime import date
+
+import numpy as np
+import pytest
+
+from event_record import Event
+from recommender import (
+    CATEGORY_WEIGHT, KEYWORD_WEIGHT, NOT_SAVED_WEIGHT, RECENCY_WEIGHT, VENUE_WEIGHT,
+    events_frame, recommend, score_events, top_k,
+)
+
+TODAY = date(2026, 5, 1)
+
+
+def frame_of(*events):
+    return events_frame([Event(**event) for event in events])
+
+
+@pytest.fixture
+def frame():
+    return frame_of(
+        {"id": "1", "name": "Jazz Night", "local_date": "2026-05-01", "segment": "Music", "venue": "Hall"},
+        {"id": "2", "name": "Derby", "local_date": "2026-06-30", "segment": "Sports", "venue": "Stadium"},
+        {"id": "3", "name": "Jazz Brunch", "local_date": None, "segment": "Music", "venue": "Cafe"},
+        {"id": "4", "name": "Old Show", "local_date": "2026-04-01", "segment": "Arts", "venue": "Hall"},
+    )
+
+
+def test_events_frame_columns(frame):
+    assert list(frame["id"]) == ["1", "2", "3", "4"]
+    assert list(frame["name_lower"]) == ["jazz night", "derby", "jazz brunch", "old show"]
+    assert frame["day"].isna().tolist() == [False, False, True, False]
+
+
+def test_score_components(frame):
+    scores = score_events(
+        frame, {"Music": 1.0, "Sports": 0.5}, saved_names={"Derby"}, keyword="JAZZ",
+        today=TODAY, venue_weights={"Hall": 1.0}
+    )
+    assert scores == pytest.approx([
+        # category + venue + not saved + keyword + recency (today: full boost)
+        CATEGORY_WEIGHT + VENUE_WEIGHT + NOT_SAVED_WEIGHT + KEYWORD_WEIGHT + RECENCY_WEIGHT,
+        # half-weight category, already saved, too far out for a boost
+        CATEGORY_WEIGHT * 0.5,
+        # undated: no recency boost
+        CATEGORY_WEIGHT + NOT_SAVED_WEIGHT + KEYWORD_WEIGHT,
+        # in the past: no recency boost
+        VENUE_WEIGHT + NOT_SAVED_WEIGHT,
+    ])
+
+
+def test_recency_boost_fades(frame):
+    soon = frame_of({"id": "1", "name": "A", "local_date": "2026-05-08"})
+    scores = score_events(soon, {}, saved_names=(), today=TODAY)
+    assert scores == pytest.approx([NOT_SAVED_WEIGHT + RECENCY_WEIGHT * 0.5])
+
+
+def test_saved_ids_count_as_saved(frame):
+    scores = score_events(frame, {}, saved_names=(), today=TODAY, saved_ids={"2"})
+    assert scores[1] == 0
+    assert scores[0] > 0
+
+
+def test_empty_frame():
+    empty = events_frame([])
+    assert len(score_events(empty, {"Music": 1.0}, ())) == 0
+    assert len(recommend(empty, {"Music": 1.0}, ())) == 0
+
+
+def test_top_k_orders_and_breaks_ties_by_position():
+    scores = np.array([1.0, 3.0, 0.0, 3.0, 2.0, -1.0])
+    assert top_k(scores, 3).tolist() == [1, 3, 4]
+    assert top_k(scores, 10).tolist() == [1, 3, 4, 0]
+    assert top_k(np.zeros(3)).tolist() == []
+
+
+def test_top_k_matches_a_full_sort():
+    rng = np.random.default_rng(7)
+    scores = rng.integers(0, 5, size=500).astype(float)
+    expected = sorted(np.flatnonzero(scores > 0), key=lambda i: (-scores[i], i))[:20]
+    assert top_k(scores, 20).tolist() == expected
+
+
+def test_recommend(frame):
+    picks = recommend(frame, {"Music": 1.0}, saved_names={"Jazz Night"}, k=2, today=TODAY)
+    assert list(picks["id"]) == ["3", "1"]
+    assert list(picks.columns[-1:]) == ["score"]
+    assert picks["score"].is_monotonic_decreasing
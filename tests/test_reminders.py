@@ -0,0 +1,92 @@
+# tests/test_reminders.py
+# Reminder windows, the mark-due batch job and share links.
+from datetime import date, datetime, timezone
+
+import pytest
+
+from database import Database
+from eventure.repository import SavedEventRepository
+from migrations import migrate
+from reminders import fill_share_links, mark_due, reminder_window, run_once, share_links, utc_today
+
+TODAY = date(2026, 6, 1)
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    with db.connection() as conn:
+        migrate(conn)
+    db.write("INSERT INTO users (username, email, password) VALUES ('u1', 'u1@x', 'pw')")
+    db.write("INSERT INTO users (username, email, password) VALUES ('u2', 'u2@x', 'pw')")
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def saved(db):
+    repo = SavedEventRepository(db)
+    for user_id, name, day in [
+        (1, "Yesterday", "2026-05-31"),
+        (1, "Today", "2026-06-01"),
+        (1, "Tomorrow", "2026-06-01T20:00:00"),
+        (1, "Later", "2026-06-03"),
+        (1, "Undated", "N/A"),
+        (2, "Other user", "2026-06-02"),
+    ]:
+        repo.save(user_id, name, day, "Venue", f"https://example.com/{name}")
+    return repo
+
+
+def test_utc_today():
+    assert utc_today() == datetime.now(timezone.utc).date()
+
+
+def test_reminder_window():
+    assert reminder_window(TODAY) == ("2026-06-01", "2026-06-02")
+    assert reminder_window(TODAY, days=3) == ("2026-06-01", "2026-06-04")
+
+
+def test_upcoming_is_per_user_and_in_window(saved):
+    assert saved.upcoming(1, TODAY) == [("Today", "2026-06-01"), ("Tomorrow", "2026-06-01")]
+    assert saved.upcoming(2, TODAY) == [("Other user", "2026-06-02")]
+
+
+def test_mark_due_marks_each_row_once(db, saved):
+    due = mark_due(db, TODAY, now=1000.0)
+    assert sorted(name for _, name, _ in due) == ["Other user", "Today", "Tomorrow"]
+    assert mark_due(db, TODAY) == []
+    # The next day only picks up what wasn't marked yet
+    assert [name for _, name, _ in mark_due(db, date(2026, 6, 2))] == ["Later"]
+    assert db.fetchone("SELECT reminded_at FROM saved_events WHERE event_name='Today'")[0] == 1000.0
+    assert db.fetchone("SELECT reminded_at FROM saved_events WHERE event_name='Undated'")[0] is None
+
+
+def test_share_links():
+    whatsapp, tweet = share_links("Jazz & Blues", "2026-06-01", "https://example.com/e?id=1")
+    assert whatsapp.startswith("https://wa.me/?text=Check%20out%20this%20event%3A%20Jazz%20%26%20Blues")
+    assert tweet.startswith("https://twitter.com/intent/tweet?text=")
+    assert "&" not in whatsapp.partition("?")[2]
+
+
+def test_saves_store_share_links(db, saved):
+    row = db.fetchone("SELECT share_whatsapp, share_twitter FROM saved_events WHERE event_name='Today'")
+    assert row == share_links("Today", "2026-06-01", "https://example.com/Today")
+
+
+def test_fill_share_links_for_bulk_rows(db, saved):
+    db.write("""
+        INSERT INTO saved_events (user_id, event_name, event_date, event_url)
+        VALUES (1, 'Imported', '2026-07-01', 'https://example.com/i')
+    """)
+    assert saved.list(1)[0][4:] == share_links("Imported", "2026-07-01", "https://example.com/i")
+    assert fill_share_links(db, batch=1) == 1
+    assert fill_share_links(db) == 0
+    row = db.fetchone("SELECT share_whatsapp, share_twitter FROM saved_events WHERE event_name='Imported'")
+    assert row == share_links("Imported", "2026-07-01", "https://example.com/i")
+
+
+def test_run_once(db, saved):
+    assert run_once(db, TODAY) == 3
+    assert run_once(db, TODAY) == 0
+
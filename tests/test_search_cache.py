@@ -0,0 +1,111 @@
+# tests/test_search_cache.py
+# Cache keys and the TTL + LRU search cache, in memory and on SQLite.
+import json
+
+import pytest
+
+from database import Database
+from search_cache import SearchCache, normalize_params
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    yield db
+    db.close()
+
+
+def wait_for_writes(db):
+    # Writes are fire and forget; one more write queues behind them
+    db.write("SELECT 1")
+
+
+# ----------------------------
+# Keys
+# ----------------------------
+def test_equivalent_searches_share_a_key():
+    a = normalize_params({"city": "  New   York ", "keyword": "Jazz", "apikey": "k1",
+                          "startDateTime": "2026-05-01T00:00:00Z", "page": 0})
+    b = normalize_params({"page": 0, "keyword": "jazz", "city": "new york", "apikey": "k2",
+                          "startDateTime": "2026-05-01T12:30:00Z", "endDateTime": ""})
+    assert a == b
+    assert json.loads(a) == {"city": "new york", "keyword": "jazz", "page": 0, "startDateTime": "2026-05-01"}
+
+
+def test_different_searches_differ():
+    assert normalize_params({"city": "Boston"}) != normalize_params({"city": "Boston", "keyword": "jazz"})
+    assert normalize_params({"city": "Boston", "page": 0}) != normalize_params({"city": "Boston", "page": 1})
+
+
+# ----------------------------
+# In memory
+# ----------------------------
+def test_hit_miss_and_stats():
+    cache = SearchCache()
+    assert cache.get("k") is None
+    cache.set("k", [1, 2])
+    assert cache.get("k") == [1, 2]
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1}
+
+
+def test_entries_expire():
+    cache = SearchCache(ttl=0)
+    cache.set("k", [1])
+    assert cache.get("k") is None
+    assert cache.expires_at("k") == 0
+
+
+def test_least_recently_used_is_evicted():
+    cache = SearchCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_expires_at_does_not_count_as_a_hit():
+    cache = SearchCache(ttl=60)
+    cache.set("k", 1)
+    assert cache.expires_at("k") > 0
+    assert cache.stats()["hits"] == 0
+
+
+# ----------------------------
+# SQLite persistence
+# ----------------------------
+def test_entries_are_shared_through_sqlite(db):
+    writer = SearchCache(db=db)
+    writer.set("k", {"events": [1, 2]})
+    wait_for_writes(db)
+
+    # A second process starts with an empty memory cache
+    reader = SearchCache(db=db)
+    assert reader.get("k") == {"events": [1, 2]}
+    assert reader.expires_at("k") == pytest.approx(writer.expires_at("k"))
+
+
+def test_stale_rows_are_ignored_and_pruned(db):
+    SearchCache(ttl=0, db=db).set("old", [1])
+    wait_for_writes(db)
+    assert SearchCache(db=db).get("old") is None
+
+    SearchCache(db=db).set("new", [2])
+    wait_for_writes(db)
+    assert [row[0] for row in db.fetchall("SELECT cache_key FROM search_cache")] == ["new"]
+
+
+def test_custom_serializers(db):
+    cache = SearchCache(db=db, dumps=lambda v: json.dumps(sorted(v)), loads=lambda s: set(json.loads(s)))
+    cache.set("k", {3, 1})
+    wait_for_writes(db)
+    assert SearchCache(db=db, loads=lambda s: set(json.loads(s))).get("k") == {1, 3}
+
+
+def test_clear(db):
+    cache = SearchCache(db=db)
+    cache.set("k", [1])
+    cache.clear()
+    assert cache.get("k") is None
+    assert db.fetchone("SELECT COUNT(*) FROM search_cache") == (0,)
@@ -0,0 +1,116 @@
+# tests/test_search_service.py
+# Where search results come from: cache, upstream, partial or offline.
+from datetime import date
+
+import pytest
+
+from database import Database
+from event_index import EventIndex, IndexIngestor
+from event_record import Event
+from eventure.search_service import (
+    SOURCE_CACHE, SOURCE_OFFLINE, SOURCE_PARTIAL, SOURCE_UPSTREAM, SearchService, build_params,
+)
+from migrations import migrate
+from provider_client import ProviderError
+from search_cache import SearchCache
+from singleflight import SingleFlight
+
+
+class FakeProviders:
+    """Stands in for providers.FederatedSearch."""
+
+    def __init__(self, events=(), error=None):
+        self.events = list(events)
+        self.error = error
+        self.calls = 0
+
+    def search(self, params):
+        self.calls += 1
+        yield from self.events
+        if self.error is not None:
+            raise self.error
+
+
+def event(id, name, segment="Music"):
+    return Event(id=id, name=name, local_date="2026-05-01", venue="Hall", city="Boston", segment=segment)
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    with db.connection() as conn:
+        migrate(conn)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def make_service(db):
+    index = EventIndex(db)
+    ingestor = IndexIngestor(index)
+
+    def make(providers):
+        return SearchService(db, SearchCache(), providers, index, ingestor, SingleFlight())
+
+    make.ingestor = ingestor
+    make.index = index
+    return make
+
+
+def test_build_params():
+    assert build_params("Boston") == {
+        "city": "Boston", "sort": "relevance,asc", "segmentName": "Music,Sports,Arts & Theatre",
+    }
+    params = build_params("Boston", "jazz", "Music", date(2026, 5, 1), date(2026, 5, 2))
+    assert params["classificationName"] == "Music"
+    assert (params["startDateTime"], params["endDateTime"]) == ("2026-05-01T00:00:00Z", "2026-05-02T23:59:59Z")
+    # A half-open window is ignored
+    assert "startDateTime" not in build_params("Boston", start_date=date(2026, 5, 1))
+
+
+def test_upstream_then_cache(make_service, db):
+    providers = FakeProviders([event("1", "Jazz Night")])
+    service = make_service(providers)
+    events, source = service.search("Boston")
+    assert source == SOURCE_UPSTREAM
+    assert [e.name for e in events] == ["Jazz Night"]
+
+    assert service.search("boston ") == (events, SOURCE_CACHE)
+    assert providers.calls == 1
+    # Both searches are logged for the prefetch worker
+    assert db.fetchone("SELECT COUNT(*) FROM search_log") == (2,)
+
+
+def test_complete_results_reach_the_offline_index(make_service):
+    service = make_service(FakeProviders([event("1", "Jazz Night")]))
+    service.search("Boston")
+    make_service.ingestor.join()
+    events, source = service.search("Boston", offline_only=True)
+    assert source == SOURCE_OFFLINE
+    assert [e.name for e in events] == ["Jazz Night"]
+
+
+def test_partial_results_are_served_but_not_cached(make_service):
+    providers = FakeProviders([event("1", "Jazz Night")], error=ProviderError("ticketmaster timed out"))
+    service = make_service(providers)
+    events, source = service.search("Boston")
+    assert source == SOURCE_PARTIAL
+    assert [e.name for e in events] == ["Jazz Night"]
+
+    service.search("Boston")
+    assert providers.calls == 2
+
+
+def test_total_failure_falls_back_to_the_index(make_service):
+    make_service.index.upsert([event("old", "Indexed Show")])
+    service = make_service(FakeProviders(error=ProviderError("HTTP 503")))
+    events, source = service.search("Boston")
+    assert source == SOURCE_OFFLINE
+    assert [e.name for e in events] == ["Indexed Show"]
+
+
+def test_local_uses_the_default_segments(make_service):
+    make_service.index.upsert([event("1", "Jazz", "Music"), event("2", "Expo", "Miscellaneous")])
+    service = make_service(FakeProviders())
+    assert [e.name for e in service.local("Boston")] == ["Jazz"]
+    assert [e.name for e in service.local("Boston", category="Miscellaneous")] == ["Expo"]
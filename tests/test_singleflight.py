@@ -0,0 +1,125 @@
+# tests/test_singleflight.py
+# Coalescing of concurrent identical fetches.
+import threading
+
+import pytest
+
+from singleflight import SharedFetch, SingleFlight
+
+
+def gated(items, gate, calls):
+    # A produce() that blocks until the test opens the gate
+    def produce():
+        calls.append(1)
+        gate.wait(5)
+        yield from items
+    return produce
+
+
+# ----------------------------
+# SharedFetch
+# ----------------------------
+def test_shared_fetch_streams_to_every_reader():
+    shared = SharedFetch()
+    shared.append(1)
+    shared.append(2)
+    shared.finish()
+    assert list(shared) == [1, 2]
+    assert list(shared) == [1, 2]
+    assert shared.result() == (1, 2)
+
+
+def test_shared_fetch_raises_after_partial_items():
+    shared = SharedFetch()
+    shared.append("a")
+    shared.finish(RuntimeError("boom"))
+    seen = []
+    with pytest.raises(RuntimeError):
+        for item in shared:
+            seen.append(item)
+    assert seen == ["a"]
+    with pytest.raises(RuntimeError):
+        shared.result()
+
+
+def test_reader_waits_for_items():
+    shared = SharedFetch()
+    out = []
+    reader = threading.Thread(target=lambda: out.extend(shared))
+    reader.start()
+    shared.append("x")
+    shared.finish()
+    reader.join(5)
+    assert out == ["x"]
+
+
+# ----------------------------
+# SingleFlight
+# ----------------------------
+def test_identical_fetches_share_one_produce():
+    flight = SingleFlight()
+    gate, calls = threading.Event(), []
+    first = flight.fetch("k", gated([1, 2, 3], gate, calls))
+    second = flight.fetch("k", gated([9], gate, calls))
+    assert first is second
+    assert flight.in_flight() == 1
+    gate.set()
+    assert first.result() == (1, 2, 3)
+    assert calls == [1]
+    assert (flight.started, flight.joined) == (1, 1)
+
+
+def test_different_keys_fetch_separately():
+    flight = SingleFlight()
+    a = flight.fetch("a", lambda: iter([1]))
+    b = flight.fetch("b", lambda: iter([2]))
+    assert a.result() == (1,)
+    assert b.result() == (2,)
+    assert flight.started == 2
+
+
+def test_key_is_released_after_completion():
+    flight = SingleFlight()
+    flight.fetch("k", lambda: iter([1])).result()
+    again = flight.fetch("k", lambda: iter([2]))
+    assert again.result() == (2,)
+    assert flight.started == 2
+    assert flight.joined == 0
+
+
+def test_on_complete_runs_once_before_release():
+    flight = SingleFlight()
+    seen = []
+    done = threading.Event()
+
+    def on_complete(result):
+        # The key is still held while the result is cached
+        seen.append((result, flight.in_flight()))
+        done.set()
+
+    flight.fetch("k", lambda: iter([1, 2]), on_complete).result()
+    assert done.wait(5)
+    assert seen == [((1, 2), 1)]
+
+
+def test_on_complete_skipped_on_error():
+    flight = SingleFlight()
+    seen = []
+
+    def produce():
+        yield 1
+        raise RuntimeError("upstream down")
+
+    shared = flight.fetch("k", produce, seen.append)
+    with pytest.raises(RuntimeError):
+        shared.result()
+    assert seen == []
+
+
+def test_failing_on_complete_still_serves_the_result():
+    flight = SingleFlight()
+
+    def on_complete(result):
+        raise OSError("cache unavailable")
+
+    assert flight.fetch("k", lambda: iter([1]), on_complete).result() == (1,)